@@ -51,6 +51,14 @@ def add_arguments(parser):
                                                     "connections")
     parser.add_argument("-g", "--graph", help="path to the file containing the"
                                               " network graph object")
+    parser.add_argument("--graph-cache", help="path to the folder in which "
+                                              "the network graphs built from "
+                                              "the input files are cached")
+    parser.add_argument("--travel-time-matrix",
+                        help="shuttle travel times are the shortest travel "
+                             "times computed once from the network graph "
+                             "(cached in --graph-cache)",
+                        action="store_true")
     parser.add_argument("-o", "--output", help="path to the directory that "
                                                "will contain simulation "
                                                "results")
@@ -182,10 +190,15 @@ def main():
         data_reader = ShuttleDataReader(requests_file_path, vehicles_file_path,
                                         graph_from_json_file_path,
                                         vehicles_end_time=100000)
-        g = data_reader.get_json_graph()
+        g = data_reader.get_json_graph(cache_folder=args.graph_cache)
+
+        travel_time_matrix = data_reader.get_travel_time_matrix(
+            cache_folder=args.graph_cache) if args.travel_time_matrix \
+            else None
 
         splitter = OneLegSplitter()
-        dispatcher = ShuttleHubSimpleNetworkDispatcher(g, hub_location="100")
+        dispatcher = ShuttleHubSimpleNetworkDispatcher(
+            g, hub_location="100", travel_time_matrix=travel_time_matrix)
 
     elif args.type == "fixed":
         logger.info("FixedLine")
@@ -225,7 +238,8 @@ def main():
         else:
             logger.info("Generate network graph...")
             g = data_reader.get_network_graph(
-                available_connections=available_connections)
+                available_connections=available_connections,
+                cache_folder=args.graph_cache)
             g_path = "../../../../donnees_de_mobilite/data/stl/stl/20191101_4pm/" \
                      "bus_network_graph_20191101_4pm.json"
 
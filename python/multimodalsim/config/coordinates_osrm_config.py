@@ -1,6 +1,7 @@
 from multimodalsim.config.config import Config
 
 import os
+from typing import Optional
 
 
 class CoordinatesOSRMConfig(Config):
@@ -14,3 +15,30 @@ class CoordinatesOSRMConfig(Config):
     @property
     def url(self) -> str:
         return self._config_parser["parameters"]["url"]
+
+    @property
+    def max_workers(self) -> int:
+        return self._config_parser.getint("parameters", "max_workers",
+                                          fallback=8)
+
+    @property
+    def cache_size(self) -> int:
+        return self._config_parser.getint("parameters", "cache_size",
+                                          fallback=1024)
+
+    @property
+    def segment_cache_size(self) -> int:
+        return self._config_parser.getint("parameters", "segment_cache_size",
+                                          fallback=100000)
+
+    @property
+    def cache_folder(self) -> Optional[str]:
+        cache_folder = self._config_parser.get("parameters", "cache_folder",
+                                               fallback="")
+        return cache_folder if len(cache_folder) > 0 else None
+
+    @property
+    def timeout(self) -> Optional[float]:
+        timeout = self._config_parser.get("parameters", "timeout",
+                                          fallback="")
+        return float(timeout) if len(timeout) > 0 else None
@@ -49,3 +49,8 @@ class OptimizationConfig(Config):
     def termination_waiting_time(self) -> float:
         return float(self._config_parser["asynchronous"][
                          "termination_waiting_time"])
+
+    @property
+    def nb_workers(self) -> int:
+        return self._config_parser.getint("asynchronous", "nb_workers",
+                                          fallback=1)
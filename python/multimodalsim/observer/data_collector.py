@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import Future
 from typing import Optional
 
 import pandas as pd
@@ -72,6 +73,9 @@ class StandardDataCollector(DataCollector):
             self.__collect_vehicles_data(vehicle)
         elif hasattr(current_event, "vehicle"):
             self.__collect_vehicles_data(current_event.vehicle)
+        elif hasattr(current_event, "vehicles"):
+            for vehicle in current_event.vehicles:
+                self.__collect_vehicles_data(vehicle)
 
         self.__collect_events_data()
 
@@ -115,9 +119,14 @@ class StandardDataCollector(DataCollector):
         lon = vehicle.position.lon if vehicle.position is not None else stop_lon
         lat = vehicle.position.lat if vehicle.position is not None else stop_lat
 
-        polylines = vehicle.polylines \
-            if vehicle.polylines is not None and len(vehicle.polylines) > 0 \
-            else None
+        # The polylines may still be computed in the background (see
+        # Coordinates.submit_polylines). In that case, their Future is
+        # observed and it is only awaited when the observations are converted
+        # to a DataFrame.
+        polylines = vehicle.pending_polylines
+        if not isinstance(polylines, Future) \
+                and (polylines is None or len(polylines) == 0):
+            polylines = None
 
         mode = vehicle.mode if vehicle.mode is not None else ""
 
@@ -418,6 +427,8 @@ class DataContainer:
 
     def __convert_obs_table_to_df(self, table_name):
 
+        self.__resolve_futures(table_name)
+
         self.__observations_tables_dfs[table_name] = \
             pd.DataFrame(self.__observations_tables[table_name])
         self.__observations_tables_dfs[table_name].columns = \
@@ -426,6 +437,14 @@ class DataContainer:
 
         self.__updated_dfs[table_name] = True
 
+    def __resolve_futures(self, table_name):
+        """Replace the observed values that are Futures (e.g., the polylines
+        of the vehicles) by their result."""
+        for obs_dict in self.__observations_tables[table_name]:
+            for key, value in obs_dict.items():
+                if isinstance(value, Future):
+                    obs_dict[key] = value.result()
+
     def __convert_row_dict_to_df(self, table_name, row_dict):
 
         df_columns = [self.__dfs_columns[table_name][x]
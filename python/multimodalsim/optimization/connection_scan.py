@@ -0,0 +1,290 @@
+import bisect
+import logging
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionScan:
+    """The ``ConnectionScan`` class finds the earliest arrival at a stop of a
+    public transit network with the Connection Scan Algorithm. The network is
+    given by its stop times, i.e., the nodes (stop_id, trip_id, arrival_time,
+    departure_time) of the network graph built by ``GTFSReader``, in the
+    order of the stops of each trip. Two consecutive stop times of a trip form
+    a connection, and the connections are sorted by departure time once, when
+    the object is created.
+
+    The departure times of the connections are also indexed by departure
+    stop, and the arrival times by arrival stop. A search only scans the
+    connections that depart between the first departure that the passenger
+    can board at the origin (or at a stop connected to it) and the last
+    departure of a connection that reaches the destination before the due
+    time of the trip, and it stops as soon as no connection can arrive
+    earlier at the destination. A passenger can board a vehicle at a
+    stop (or at a stop connected to it) only if the vehicle departs at least
+    freeze_interval after the passenger arrived at the stop.
+        Properties
+        ----------
+        freeze_interval: float
+            Minimum time between the arrival at a stop and the departure from
+            the same stop (or from a connected stop) of another vehicle.
+    """
+
+    def __init__(self, stop_times: Iterable[tuple],
+                 available_connections: Optional[dict] = None,
+                 freeze_interval: float = 5) -> None:
+        self.__available_connections = available_connections \
+            if available_connections is not None else {}
+        self.__freeze_interval = freeze_interval
+
+        self.__stop_times_by_trip_id = {}
+        for stop_time in stop_times:
+            self.__stop_times_by_trip_id.setdefault(stop_time[1], []).append(
+                stop_time)
+
+        connections = []
+        for trip_id, trip_stop_times in self.__stop_times_by_trip_id.items():
+            for position in range(len(trip_stop_times) - 1):
+                connections.append((trip_stop_times[position][3], trip_id,
+                                    position))
+        # The sort is stable, so the connections of a trip that depart at the
+        # same time stay in the order of the stops of the trip.
+        connections.sort(key=lambda x: x[0])
+
+        self.__departure_times = []
+        self.__arrival_times = []
+        self.__departure_stop_ids = []
+        self.__arrival_stop_ids = []
+        self.__trip_ids = []
+        self.__positions = []
+        for departure_time, trip_id, position in connections:
+            departure_stop_time = \
+                self.__stop_times_by_trip_id[trip_id][position]
+            arrival_stop_time = \
+                self.__stop_times_by_trip_id[trip_id][position + 1]
+            self.__departure_times.append(departure_time)
+            self.__arrival_times.append(arrival_stop_time[2])
+            self.__departure_stop_ids.append(departure_stop_time[0])
+            self.__arrival_stop_ids.append(arrival_stop_time[0])
+            self.__trip_ids.append(trip_id)
+            self.__positions.append(position)
+
+        self.__departure_times_by_stop_id = {}
+        self.__arrival_times_by_stop_id = {}
+        self.__last_departure_times_by_stop_id = {}
+        self.__build_stop_index()
+
+    @property
+    def freeze_interval(self) -> float:
+        return self.__freeze_interval
+
+    def find_earliest_arrival_path(self, origin_stop_id: str,
+                                   destination_stop_id: str,
+                                   ready_time: float,
+                                   due_time: float) -> list[tuple]:
+        """Find the path that arrives the earliest at the destination stop.
+
+        Input:
+          -origin_stop_id: The stop where the passenger is at ready_time.
+          -destination_stop_id: The stop to reach.
+          -ready_time: The time from which the passenger can depart.
+          -due_time: The time before which the passenger must arrive.
+
+        Output:
+          -path: The stop times visited by the passenger, from the boarding
+           of the first vehicle to the alighting of the last one, or an empty
+           list if the destination cannot be reached before due_time.
+        """
+        return self.find_earliest_arrival_paths(
+            origin_stop_id, {destination_stop_id: due_time},
+            ready_time)[destination_stop_id]
+
+    def find_earliest_arrival_paths(
+            self, origin_stop_id: str,
+            due_time_by_destination_stop_id: dict[str, float],
+            ready_time: float) -> dict[str, list[tuple]]:
+        """Find the paths that arrive the earliest at several destination
+        stops from the same origin stop with a single scan of the
+        connections.
+
+        Input:
+          -origin_stop_id: The stop where the passenger is at ready_time.
+          -due_time_by_destination_stop_id: A dictionary associating with
+           each stop to reach the time before which it must be reached.
+          -ready_time: The time from which the passenger can depart.
+
+        Output:
+          -path_by_destination_stop_id: A dictionary associating with each
+           destination stop the stop times visited by the passenger, from the
+           boarding of the first vehicle to the alighting of the last one, or
+           an empty list if the destination cannot be reached before its due
+           time.
+        """
+
+        # Last departure time from which the arrival at one of the
+        # destinations can still be improved. The destinations that no
+        # connection reaches before their due time are left out.
+        last_departure_time_by_stop_id = {}
+        for stop_id, due_time in due_time_by_destination_stop_id.items():
+            if stop_id != origin_stop_id:
+                last_departure_time = self.__get_last_departure_time(
+                    stop_id, due_time)
+                if last_departure_time is not None:
+                    last_departure_time_by_stop_id[stop_id] = \
+                        last_departure_time
+        last_departure_time = max(last_departure_time_by_stop_id.values(),
+                                  default=None)
+
+        # Time from which the passenger can board a vehicle at each stop.
+        boarding_time_by_stop_id = {origin_stop_id: ready_time}
+        for stop_id in self.__available_connections.get(origin_stop_id, []):
+            if stop_id != origin_stop_id:
+                boarding_time_by_stop_id[stop_id] = \
+                    ready_time + self.__freeze_interval
+        first_departure_time = self.__get_first_departure_time(
+            boarding_time_by_stop_id)
+
+        # Connections by which the passenger boards and alights from the last
+        # vehicle taken to reach each stop.
+        ride_by_stop_id = {}
+        boarding_connection_by_trip_id = {}
+
+        arrival_time_by_destination_stop_id = {}
+        ride_by_destination_stop_id = {}
+
+        departure_times = self.__departure_times
+        trip_ids = self.__trip_ids
+        first_connection = \
+            bisect.bisect_left(departure_times, first_departure_time) \
+            if last_departure_time is not None \
+            and first_departure_time is not None else len(departure_times)
+        for connection in range(first_connection, len(departure_times)):
+            departure_time = departure_times[connection]
+            if departure_time > last_departure_time:
+                break
+
+            trip_id = trip_ids[connection]
+            if trip_id not in boarding_connection_by_trip_id:
+                boarding_time = boarding_time_by_stop_id.get(
+                    self.__departure_stop_ids[connection])
+                if boarding_time is None or boarding_time > departure_time:
+                    continue
+                boarding_connection_by_trip_id[trip_id] = connection
+
+            arrival_stop_id = self.__arrival_stop_ids[connection]
+            arrival_time = self.__arrival_times[connection]
+            ride = (boarding_connection_by_trip_id[trip_id], connection)
+
+            if arrival_stop_id in last_departure_time_by_stop_id:
+                due_time = due_time_by_destination_stop_id[arrival_stop_id]
+                best_arrival_time = arrival_time_by_destination_stop_id.get(
+                    arrival_stop_id)
+                if arrival_time <= due_time and (
+                        best_arrival_time is None
+                        or arrival_time < best_arrival_time):
+                    arrival_time_by_destination_stop_id[arrival_stop_id] = \
+                        arrival_time
+                    ride_by_destination_stop_id[arrival_stop_id] = ride
+                    last_departure_time_by_stop_id[arrival_stop_id] = \
+                        arrival_time
+                    last_departure_time = max(
+                        last_departure_time_by_stop_id.values())
+
+            self.__update_boarding_time(
+                arrival_stop_id, arrival_time + self.__freeze_interval, ride,
+                boarding_time_by_stop_id, ride_by_stop_id)
+
+        path_by_destination_stop_id = {}
+        for stop_id in due_time_by_destination_stop_id:
+            path_by_destination_stop_id[stop_id] = \
+                self.__get_path(ride_by_destination_stop_id[stop_id],
+                                ride_by_stop_id) \
+                if stop_id in ride_by_destination_stop_id else []
+
+        return path_by_destination_stop_id
+
+    def __build_stop_index(self):
+        for connection in range(len(self.__departure_times)):
+            self.__departure_times_by_stop_id.setdefault(
+                self.__departure_stop_ids[connection], []).append(
+                self.__departure_times[connection])
+
+        connections_by_arrival_stop_id = {}
+        for connection in range(len(self.__departure_times)):
+            connections_by_arrival_stop_id.setdefault(
+                self.__arrival_stop_ids[connection], []).append(connection)
+
+        for stop_id, connections in connections_by_arrival_stop_id.items():
+            connections.sort(key=lambda x: self.__arrival_times[x])
+            # The connections were sorted by departure time, so the
+            # departure times of each stop are already sorted. For the
+            # arrivals, the latest departure among the connections that
+            # arrive at the stop before each arrival time is kept.
+            arrival_times = []
+            last_departure_times = []
+            last_departure_time = None
+            for connection in connections:
+                departure_time = self.__departure_times[connection]
+                if last_departure_time is None \
+                        or departure_time > last_departure_time:
+                    last_departure_time = departure_time
+                arrival_times.append(self.__arrival_times[connection])
+                last_departure_times.append(last_departure_time)
+            self.__arrival_times_by_stop_id[stop_id] = arrival_times
+            self.__last_departure_times_by_stop_id[stop_id] = \
+                last_departure_times
+
+    def __get_first_departure_time(self, boarding_time_by_stop_id):
+        """Return the first departure time of a connection that can be
+        boarded at one of the stops, or None if there is none."""
+        first_departure_time = None
+        for stop_id, boarding_time in boarding_time_by_stop_id.items():
+            departure_times = self.__departure_times_by_stop_id.get(stop_id,
+                                                                    [])
+            index = bisect.bisect_left(departure_times, boarding_time)
+            if index < len(departure_times) and (
+                    first_departure_time is None
+                    or departure_times[index] < first_departure_time):
+                first_departure_time = departure_times[index]
+
+        return first_departure_time
+
+    def __get_last_departure_time(self, stop_id, due_time):
+        """Return the last departure time of a connection that arrives at
+        the stop before due_time, or None if there is none."""
+        arrival_times = self.__arrival_times_by_stop_id.get(stop_id, [])
+        index = bisect.bisect_right(arrival_times, due_time)
+        if index == 0:
+            return None
+
+        return min(self.__last_departure_times_by_stop_id[stop_id][index - 1],
+                   due_time)
+
+    def __update_boarding_time(self, stop_id, boarding_time, ride,
+                               boarding_time_by_stop_id, ride_by_stop_id):
+        connected_stop_ids = self.__available_connections.get(stop_id, [])
+        for connected_stop_id in [stop_id, *connected_stop_ids]:
+            if connected_stop_id in boarding_time_by_stop_id \
+                    and boarding_time_by_stop_id[connected_stop_id] \
+                    <= boarding_time:
+                continue
+            boarding_time_by_stop_id[connected_stop_id] = boarding_time
+            ride_by_stop_id[connected_stop_id] = ride
+
+    def __get_path(self, destination_ride, ride_by_stop_id):
+        rides = [destination_ride]
+        boarding_stop_id = self.__departure_stop_ids[destination_ride[0]]
+        while boarding_stop_id in ride_by_stop_id:
+            ride = ride_by_stop_id[boarding_stop_id]
+            rides.append(ride)
+            boarding_stop_id = self.__departure_stop_ids[ride[0]]
+
+        path = []
+        for boarding_connection, alighting_connection in reversed(rides):
+            trip_stop_times = self.__stop_times_by_trip_id[
+                self.__trip_ids[boarding_connection]]
+            path.extend(trip_stop_times[
+                self.__positions[boarding_connection]:
+                self.__positions[alighting_connection] + 2])
+
+        return path
@@ -0,0 +1,165 @@
+import logging
+import multiprocessing as mp
+from multiprocessing.connection import Connection
+from queue import Queue
+from typing import Optional
+
+import multimodalsim.optimization.dispatcher as dispatcher_module
+import multimodalsim.optimization.optimization as optimization_module
+import multimodalsim.optimization.state as state_module
+from multimodalsim.optimization.state_serializer import StateSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchWorker:
+    """The ``DispatchWorker`` class manages a long-lived process that
+    dispatches the states it receives through a pipe. The dispatcher is sent
+    to the process only once, when the process is started. The states and the
+    optimization results are sent through the pipe in the compact binary
+    format of ``StateSerializer``.
+        Properties
+        ----------
+        process: multiprocessing.Process
+            The process in which the dispatcher runs. It is None until the
+            worker is started.
+    """
+
+    def __init__(self, dispatcher: 'dispatcher_module.Dispatcher') -> None:
+        self.__dispatcher = dispatcher
+        self.__process = None
+        self.__connection = None
+        self.__serializer = StateSerializer()
+
+    @property
+    def process(self) -> Optional[mp.Process]:
+        return self.__process
+
+    def is_alive(self) -> bool:
+        return self.__process is not None and self.__process.is_alive()
+
+    def start(self) -> None:
+        """Start the process of the worker. If the worker was already
+        started (e.g., its process was killed because the optimization
+        exceeded the time limit), the previous process is discarded."""
+        self.__close_connection()
+
+        parent_connection, child_connection = mp.Pipe()
+        # The process is not daemonic, so that the dispatcher can start
+        # processes of its own (e.g., FixedLineDispatcher with nb_processes
+        # greater than 1). It must therefore be stopped explicitly (see
+        # Optimization.close).
+        self.__process = mp.Process(target=DispatchWorker.run,
+                                    args=(self.__dispatcher,
+                                          child_connection))
+        self.__process.start()
+        child_connection.close()
+        self.__connection = parent_connection
+
+    def dispatch(self, state: 'state_module.State') \
+            -> Optional['optimization_module.OptimizationResult']:
+        """Send the state to the process of the worker and wait for the
+        optimization result. None is returned if the dispatch failed or if the
+        process was terminated before returning a result."""
+        optimization_result = None
+        try:
+            self.__connection.send_bytes(
+                self.__serializer.serialize_state(state))
+            optimization_result = \
+                self.__serializer.deserialize_optimization_result(
+                    self.__connection.recv_bytes())
+        except (EOFError, OSError):
+            logger.warning("The dispatch worker stopped before returning an "
+                           "optimization result.")
+
+        return optimization_result
+
+    def stop(self) -> None:
+        """Ask the process of the worker to stop and wait for it."""
+        if self.is_alive():
+            try:
+                self.__connection.send_bytes(b"")
+            except OSError:
+                pass
+            self.__process.join()
+        self.__close_connection()
+        self.__process = None
+
+    @staticmethod
+    def run(dispatcher: 'dispatcher_module.Dispatcher',
+            connection: Connection) -> None:
+        """Main loop of the process of the worker: dispatch each state
+        received until an empty message is received."""
+        serializer = StateSerializer()
+        while True:
+            try:
+                data = connection.recv_bytes()
+            except EOFError:
+                # The connection of the simulation was closed.
+                break
+            if len(data) == 0:
+                break
+
+            try:
+                state = serializer.deserialize_state(data)
+                optimization_result = dispatcher.dispatch(state)
+            except Exception:
+                logger.exception("Dispatch failed.")
+                optimization_result = None
+
+            connection.send_bytes(
+                serializer.serialize_optimization_result(optimization_result))
+
+        connection.close()
+
+    def __close_connection(self):
+        if self.__connection is not None:
+            self.__connection.close()
+            self.__connection = None
+
+
+class DispatchWorkerPool:
+    """The ``DispatchWorkerPool`` class owns a fixed number of
+    ``DispatchWorker`` objects that are reused from one asynchronous
+    optimization to the next. The workers are started the first time they
+    are acquired and restarted if their process is no longer alive.
+        Properties
+        ----------
+        nb_workers: int
+            Number of workers of the pool.
+    """
+
+    def __init__(self, dispatcher: 'dispatcher_module.Dispatcher',
+                 nb_workers: int = 1) -> None:
+        if nb_workers < 1:
+            raise ValueError("The parameter nb_workers must be greater than "
+                             "or equal to 1.")
+
+        self.__workers = [DispatchWorker(dispatcher)
+                          for _ in range(nb_workers)]
+
+        self.__idle_workers = Queue()
+        for worker in self.__workers:
+            self.__idle_workers.put(worker)
+
+    @property
+    def nb_workers(self) -> int:
+        return len(self.__workers)
+
+    def acquire(self) -> DispatchWorker:
+        """Return an idle worker whose process is alive. Block until a worker
+        is available."""
+        worker = self.__idle_workers.get()
+        if not worker.is_alive():
+            worker.start()
+
+        return worker
+
+    def release(self, worker: DispatchWorker) -> None:
+        """Make the worker available for the next optimizations."""
+        self.__idle_workers.put(worker)
+
+    def close(self) -> None:
+        """Stop the processes of all the workers."""
+        for worker in self.__workers:
+            worker.stop()
@@ -64,7 +64,10 @@ class Dispatcher:
         This method can be overridden to return only the legs and the routes
         that should be optimized based on your needs (see, for example,
         ShuttleSimpleDispatcher). It is possible to return empty lists if we do
-        not want to optimize for this event.
+        not want to optimize for this event. The trips, legs and routes that
+        were modified since the previous optimization are available through
+        state.modified_trips, state.modified_legs and state.modified_routes,
+        respectively.
 
         Input:
           -state: An object of type State that corresponds to a partial deep
@@ -352,6 +355,30 @@ class OptimizedRoutePlan:
         if self.__next_stops is None:
             self.__next_stops = []
 
+        return self.insert_next_stop(len(self.__next_stops), stop_id,
+                                     arrival_time, departure_time, lon, lat,
+                                     cumulative_distance, legs_to_board,
+                                     legs_to_alight)
+
+    def insert_next_stop(self, index: int, stop_id: str | int,
+                         arrival_time: float,
+                         departure_time: Optional[float] = None,
+                         lon: Optional[float] = None,
+                         lat: Optional[float] = None,
+                         cumulative_distance: Optional[float] = None,
+                         legs_to_board: Optional[list['request.Leg']] = None,
+                         legs_to_alight: Optional[list['request.Leg']] = None)\
+            -> list[Stop]:
+        """Insert a stop in the list of next stops of the route plan before
+        the stop at position index (see append_next_stop for the other
+        parameters).
+            Parameters:
+                index: int
+                    Position of the new stop in the list of next stops.
+        """
+        if self.__next_stops is None:
+            self.__next_stops = []
+
         if departure_time is None:
             departure_time = arrival_time
 
@@ -365,7 +392,7 @@ class OptimizedRoutePlan:
         if legs_to_alight is not None:
             self.__assign_legs_to_alight_to_stop(legs_to_alight, stop)
 
-        self.__next_stops.append(stop)
+        self.__next_stops.insert(index, stop)
 
         return self.__next_stops
 
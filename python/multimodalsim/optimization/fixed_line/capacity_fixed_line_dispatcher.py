@@ -0,0 +1,90 @@
+import logging
+from typing import Optional
+
+from multimodalsim.optimization.fixed_line.fixed_line_dispatcher import \
+    FixedLineDispatcher
+from multimodalsim.optimization.fixed_line.load_profile import LoadProfile
+from multimodalsim.optimization.fixed_line.timetable_index import \
+    TimetableIndex
+from multimodalsim.simulator.vehicle import Route
+import multimodalsim.simulator.request as request
+
+logger = logging.getLogger(__name__)
+
+
+class CapacityFixedLineDispatcher(FixedLineDispatcher):
+    """The ``CapacityFixedLineDispatcher`` class assigns each leg to the
+    route that has the earliest arrival time at the destination of the leg
+    among the routes whose vehicle has enough free seats between the origin
+    and the destination of the leg.
+
+    The legs are assigned one after the other, in the order of the selected
+    next legs. The number of passengers on board each route between each
+    stop and the next one is kept in a LoadProfile, which is built from the
+    stops of the route the first time the route is considered and updated
+    when a leg is assigned to the route, so that checking and assigning a
+    leg take O(log(nb_stops)) operations. A leg that cannot be assigned to
+    any route is left unassigned until the next optimization.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+
+    def _get_optimal_route_indexes(
+            self, selected_next_legs: list['request.Leg'],
+            selected_routes: list[Route],
+            current_time: float) -> list[Optional[int]]:
+        timetable_index = TimetableIndex(selected_routes)
+        load_profile_by_route_index = {}
+
+        optimal_route_indexes = []
+        for leg in selected_next_legs:
+            optimal_route_index = None
+            for _, route_index, origin_position, destination_position \
+                    in timetable_index.find_arrivals(
+                        leg.origin.label, leg.destination.label, current_time,
+                        leg.trip.ready_time, leg.trip.due_time):
+                route = selected_routes[route_index]
+                if route_index not in load_profile_by_route_index:
+                    load_profile_by_route_index[route_index] = \
+                        self.__create_load_profile(route)
+                load_profile = load_profile_by_route_index[route_index]
+
+                if load_profile.get_max_load(
+                        origin_position, destination_position) \
+                        + leg.nb_passengers <= route.vehicle.capacity:
+                    load_profile.add_load(origin_position,
+                                          destination_position,
+                                          leg.nb_passengers)
+                    optimal_route_index = route_index
+                    break
+
+            if optimal_route_index is None:
+                logger.debug("Leg {} cannot be assigned to any route."
+                             .format(leg.id))
+            optimal_route_indexes.append(optimal_route_index)
+
+        return optimal_route_indexes
+
+    def __create_load_profile(self, route):
+        # Load when the vehicle departs from the current stop (or, if it is
+        # between two stops, the load since its last departure).
+        load = sum(leg.nb_passengers for leg in route.onboard_legs)
+        if route.current_stop is not None:
+            load += self.__get_nb_passengers(
+                route.current_stop.passengers_to_board
+                + route.current_stop.boarding_passengers)
+            load -= self.__get_nb_passengers(
+                route.current_stop.passengers_to_alight
+                + route.current_stop.alighting_passengers)
+
+        loads = [load]
+        for stop in route.next_stops:
+            load += self.__get_nb_passengers(stop.passengers_to_board) \
+                - self.__get_nb_passengers(stop.passengers_to_alight)
+            loads.append(load)
+
+        return LoadProfile(loads)
+
+    def __get_nb_passengers(self, trips):
+        return sum(trip.nb_passengers for trip in trips)
@@ -0,0 +1,167 @@
+from typing import Iterable, Optional
+
+import numpy as np
+
+import multimodalsim.simulator.vehicle as vehicle_module
+from multimodalsim.optimization.fixed_line.timetable_index import \
+    TimetableIndex
+
+
+class DenseTimetable:
+    """The ``DenseTimetable`` class stores the stops of a set of routes in
+    dense NumPy arrays so that the route that arrives the earliest at the
+    destination of each leg can be found for many legs at once, with array
+    operations instead of Python loops.
+
+    Each stop id is associated with a row (stop-label -> row map) of three
+    arrays of shape (number of stop ids, number of routes): the departure
+    time, the arrival time and the position in the route of the stop with
+    that id. The times of the stops that a route does not serve are infinite.
+
+    A route that serves a stop more than once cannot be stored in such
+    arrays. These routes are kept in a ``TimetableIndex``, whose results are
+    combined with those of the arrays, so the optimal routes are the same as
+    with a ``TimetableIndex`` of all the routes.
+        Properties
+        ----------
+        routes: list of Route
+            The routes, in the order used by the route indexes.
+    """
+
+    # Maximum number of elements of the (legs x routes) arrays built when
+    # the optimal routes of the legs are searched.
+    MAX_CHUNK_ELEMENTS = 1 << 22
+
+    def __init__(self, routes: Iterable['vehicle_module.Route']) -> None:
+        self.__routes = list(routes)
+
+        row_by_stop_id = {}
+        dense_route_indexes = []
+        dense_stops = []
+        loop_route_indexes = []
+        for route_index, route in enumerate(self.__routes):
+            stops = [(0, route.current_stop)] \
+                if route.current_stop is not None else []
+            stops.extend(enumerate(route.next_stops, 1))
+            stop_ids = [stop.location.label for _, stop in stops]
+            if len(set(stop_ids)) < len(stop_ids):
+                loop_route_indexes.append(route_index)
+                continue
+            for stop_id in stop_ids:
+                row_by_stop_id.setdefault(stop_id, len(row_by_stop_id))
+            dense_route_indexes.append(route_index)
+            dense_stops.append(stops)
+
+        # The last row corresponds to the stop ids that are not served.
+        nb_rows = len(row_by_stop_id) + 1
+        self.__row_by_stop_id = row_by_stop_id
+        self.__departure_times = np.full(
+            (nb_rows, len(dense_route_indexes)), np.inf)
+        self.__arrival_times = np.full(
+            (nb_rows, len(dense_route_indexes)), np.inf)
+        self.__positions = np.full((nb_rows, len(dense_route_indexes)), -1,
+                                   dtype=np.int64)
+        for column, stops in enumerate(dense_stops):
+            for position, stop in stops:
+                row = row_by_stop_id[stop.location.label]
+                self.__departure_times[row, column] = stop.departure_time
+                self.__arrival_times[row, column] = stop.arrival_time
+                self.__positions[row, column] = position
+
+        self.__dense_route_indexes = np.array(dense_route_indexes,
+                                              dtype=np.int64)
+        self.__loop_route_indexes = loop_route_indexes
+        self.__loop_timetable_index = TimetableIndex(
+            [self.__routes[route_index] for route_index in loop_route_indexes])
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_DenseTimetable__routes"] = None
+        return state
+
+    @property
+    def routes(self) -> Optional[list['vehicle_module.Route']]:
+        return self.__routes
+
+    def find_earliest_arrival_route_indexes(
+            self, leg_queries: list[tuple]) -> list[Optional[int]]:
+        """Find the route that arrives the earliest at the destination stop
+        of each leg (see TimetableIndex.find_earliest_arrival).
+
+        Input:
+          -leg_queries: A list of tuples (origin_stop_id,
+           destination_stop_id, current_time, ready_time, due_time).
+
+        Output:
+          -optimal_route_indexes: The position in routes of the optimal
+           route of each leg, or None if no route satisfies the constraints
+           of the leg.
+        """
+
+        nb_columns = max(self.__departure_times.shape[1], 1)
+        chunk_size = max(self.MAX_CHUNK_ELEMENTS // nb_columns, 1)
+
+        optimal_route_indexes = []
+        for first_query in range(0, len(leg_queries), chunk_size):
+            optimal_route_indexes.extend(self.__find_chunk_route_indexes(
+                leg_queries[first_query:first_query + chunk_size]))
+
+        return optimal_route_indexes
+
+    def __find_chunk_route_indexes(self, leg_queries):
+        missing_row = len(self.__row_by_stop_id)
+        origin_rows = np.array(
+            [self.__row_by_stop_id.get(leg_query[0], missing_row)
+             for leg_query in leg_queries], dtype=np.int64)
+        destination_rows = np.array(
+            [self.__row_by_stop_id.get(leg_query[1], missing_row)
+             for leg_query in leg_queries], dtype=np.int64)
+        current_times, ready_times, due_times = (
+            np.array([leg_query[i] for leg_query in leg_queries],
+                     dtype=float)[:, np.newaxis] for i in range(2, 5))
+
+        departure_times = self.__departure_times[origin_rows]
+        arrival_times = self.__arrival_times[destination_rows]
+        feasible = (departure_times > current_times) \
+            & (departure_times >= ready_times) \
+            & (arrival_times <= due_times) \
+            & (departure_times < arrival_times) \
+            & (self.__positions[origin_rows]
+               < self.__positions[destination_rows])
+        feasible_arrival_times = np.where(feasible, arrival_times, np.inf)
+
+        # argmin returns the first minimum, i.e., the first route in routes
+        # among those that arrive the earliest.
+        nb_legs = len(leg_queries)
+        if feasible_arrival_times.shape[1] > 0:
+            columns = np.argmin(feasible_arrival_times, axis=1)
+            earliest_arrival_times = \
+                feasible_arrival_times[np.arange(nb_legs), columns]
+            route_indexes = self.__dense_route_indexes[columns]
+        else:
+            earliest_arrival_times = np.full(nb_legs, np.inf)
+            route_indexes = np.zeros(nb_legs, dtype=np.int64)
+
+        optimal_route_indexes = []
+        for leg_query, arrival_time, route_index in zip(
+                leg_queries, earliest_arrival_times.tolist(),
+                route_indexes.tolist()):
+            optimal_route_index = route_index \
+                if arrival_time != np.inf else None
+
+            if len(self.__loop_route_indexes) > 0:
+                loop_earliest_arrival = \
+                    self.__loop_timetable_index.find_earliest_arrival(
+                        *leg_query)
+                if loop_earliest_arrival is not None:
+                    loop_arrival_time, loop_route_index = \
+                        loop_earliest_arrival
+                    loop_route_index = \
+                        self.__loop_route_indexes[loop_route_index]
+                    if (loop_arrival_time, loop_route_index) \
+                            < (arrival_time, route_index):
+                        optimal_route_index = loop_route_index
+
+            optimal_route_indexes.append(optimal_route_index)
+
+        return optimal_route_indexes
@@ -1,8 +1,14 @@
 import logging
-from typing import Tuple
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple, Optional, Union
 
 from multimodalsim.optimization.dispatcher import OptimizedRoutePlan, \
     Dispatcher
+from multimodalsim.optimization.fixed_line.dense_timetable import \
+    DenseTimetable
+from multimodalsim.optimization.fixed_line.timetable_index import \
+    TimetableIndex
 from multimodalsim.optimization.state import State
 from multimodalsim.simulator.vehicle import Route
 import multimodalsim.simulator.request as request
@@ -12,9 +18,43 @@ logger = logging.getLogger(__name__)
 
 class FixedLineDispatcher(Dispatcher):
 
-    def __init__(self) -> None:
+    TIMETABLE_CLASS_BY_BACKEND = {
+        "index": TimetableIndex,
+        "numpy": DenseTimetable
+    }
+
+    def __init__(self, nb_processes: int = 1, chunk_size: int = 10000,
+                 backend: str = "index") -> None:
+        """
+        Parameters:
+            nb_processes: int
+                Number of processes in which the optimal routes of the legs
+                are searched. If nb_processes is greater than 1 and there are
+                more than chunk_size legs to optimize, the legs are split in
+                chunks of chunk_size legs that are processed in a pool of
+                processes. Otherwise, the legs are processed in the current
+                process. Since a daemonic process cannot start processes,
+                nb_processes is ignored (with a warning) if the dispatcher
+                runs in a daemonic process.
+            chunk_size: int
+                Number of legs in a chunk.
+            backend: str
+                Data structure in which the optimal routes of the legs are
+                searched: "index" for a TimetableIndex (one search per leg)
+                or "numpy" for a DenseTimetable (array operations on the
+                legs of a chunk). Both return the same optimal routes.
+        """
         super().__init__()
 
+        if backend not in self.TIMETABLE_CLASS_BY_BACKEND:
+            raise ValueError("The parameter backend must be one of: {}"
+                             .format(", ".join(
+                                 self.TIMETABLE_CLASS_BY_BACKEND)))
+
+        self.__nb_processes = nb_processes
+        self.__chunk_size = chunk_size
+        self.__backend = backend
+
     def prepare_input(self, state: State) \
             -> Tuple[list['request.Leg'], list[Route]]:
         """Before optimizing, we extract the legs and the routes that we want
@@ -36,14 +76,26 @@ class FixedLineDispatcher(Dispatcher):
                  state: State) -> list[OptimizedRoutePlan]:
         """Each selected next leg is assigned to the optimal route. The optimal
         route is the one that has the earliest arrival time at destination
-        (i.e. leg.destination)."""
+        (i.e. leg.destination). The stops of the selected routes are indexed
+        by stop id once (see TimetableIndex and DenseTimetable), so that the
+        optimal route of a leg is found without going through all the routes.
 
-        optimized_route_plans = []
-        for leg in selected_next_legs:
-            optimal_route = self.__find_optimal_route_for_leg(
-                leg, selected_routes, current_time)
+        The capacity of the vehicles is ignored (see
+        CapacityFixedLineDispatcher), so the search for the optimal route of
+        each leg is independent of the other legs. The searches can therefore
+        be done in parallel (see nb_processes): the results are merged in the
+        order of the legs, so they are identical to those of a search in the
+        current process."""
+
+        selected_routes = list(selected_routes)
+        optimal_route_indexes = self._get_optimal_route_indexes(
+            selected_next_legs, selected_routes, current_time)
 
-            if optimal_route is not None:
+        optimized_route_plans = []
+        for leg, optimal_route_index in zip(selected_next_legs,
+                                            optimal_route_indexes):
+            if optimal_route_index is not None:
+                optimal_route = selected_routes[optimal_route_index]
                 optimized_route_plan = OptimizedRoutePlan(optimal_route)
 
                 # Use the current and next stops of the route.
@@ -54,53 +106,84 @@ class FixedLineDispatcher(Dispatcher):
 
         return optimized_route_plans
 
-    def __find_optimal_route_for_leg(self, leg, selected_routes, current_time):
-
-        origin_stop_id = leg.origin.label
-        destination_stop_id = leg.destination.label
-
-        optimal_route = None
-        earliest_arrival_time = None
-        for route in selected_routes:
-            origin_departure_time, destination_arrival_time = \
-                self.__get_origin_departure_time_and_destination_arrival_time(
-                    route, origin_stop_id, destination_stop_id)
-
-            if origin_departure_time is not None \
-                    and origin_departure_time > current_time \
-                    and origin_departure_time >= leg.trip.ready_time \
-                    and destination_arrival_time is not None \
-                    and destination_arrival_time <= leg.trip.due_time \
-                    and (earliest_arrival_time is None
-                         or destination_arrival_time < earliest_arrival_time):
-                earliest_arrival_time = destination_arrival_time
-                optimal_route = route
-
-        return optimal_route
-
-    def __get_origin_departure_time_and_destination_arrival_time(
-            self, route, origin_stop_id, destination_stop_id):
-        origin_stop = self.__get_stop_by_stop_id(origin_stop_id, route)
-        destination_stop = self.__get_stop_by_stop_id(destination_stop_id,
-                                                      route)
-
-        origin_departure_time = None
-        destination_arrival_time = None
-        if origin_stop is not None and destination_stop is not None \
-                and origin_stop.departure_time < destination_stop.arrival_time:
-            origin_departure_time = origin_stop.departure_time
-            destination_arrival_time = destination_stop.arrival_time
-
-        return origin_departure_time, destination_arrival_time
-
-    def __get_stop_by_stop_id(self, stop_id, route):
-        found_stop = None
-        if route.current_stop is not None and stop_id \
-                == route.current_stop.location.label:
-            found_stop = route.current_stop
-
-        for stop in route.next_stops:
-            if stop_id == stop.location.label:
-                found_stop = stop
-
-        return found_stop
+    def _get_optimal_route_indexes(
+            self, selected_next_legs: list['request.Leg'],
+            selected_routes: list[Route],
+            current_time: float) -> list[Optional[int]]:
+        """Find the optimal route of each leg.
+
+        Input:
+          -selected_next_legs: The legs to assign.
+          -selected_routes: The routes to which the legs can be assigned.
+          -current_time: The time of the optimization.
+
+        Output:
+          -optimal_route_indexes: The position in selected_routes of the
+           optimal route of each leg, or None if the leg cannot be assigned
+           to any route.
+        """
+
+        timetable_index = \
+            self.TIMETABLE_CLASS_BY_BACKEND[self.__backend](selected_routes)
+
+        leg_queries = [(leg.origin.label, leg.destination.label,
+                        current_time, leg.trip.ready_time, leg.trip.due_time)
+                       for leg in selected_next_legs]
+
+        use_pool = self.__nb_processes > 1 \
+            and len(leg_queries) > self.__chunk_size
+        if use_pool and mp.current_process().daemon:
+            logger.warning("The dispatcher runs in a daemonic process, so "
+                           "nb_processes ({}) is ignored and the legs are "
+                           "processed in the current process."
+                           .format(self.__nb_processes))
+            use_pool = False
+
+        if use_pool:
+            optimal_route_indexes = self.__find_optimal_route_indexes_in_pool(
+                timetable_index, leg_queries)
+        else:
+            optimal_route_indexes = _find_optimal_route_indexes(
+                leg_queries, timetable_index)
+
+        return optimal_route_indexes
+
+    def __find_optimal_route_indexes_in_pool(self, timetable_index,
+                                             leg_queries):
+        chunks = [leg_queries[first_query:first_query + self.__chunk_size]
+                  for first_query in range(0, len(leg_queries),
+                                           self.__chunk_size)]
+
+        # The timetable index is sent once to each process of the pool, and
+        # map returns the results of the chunks in the order of the chunks.
+        with ProcessPoolExecutor(
+                max_workers=min(self.__nb_processes, len(chunks)),
+                initializer=_initialize_process,
+                initargs=(timetable_index,)) as executor:
+            optimal_route_indexes = []
+            for chunk_route_indexes in executor.map(
+                    _find_optimal_route_indexes, chunks):
+                optimal_route_indexes.extend(chunk_route_indexes)
+
+        return optimal_route_indexes
+
+
+# Timetable index of the current process of the pool used by
+# FixedLineDispatcher.
+_process_timetable_index = None
+
+
+def _initialize_process(
+        timetable_index: Union[TimetableIndex, DenseTimetable]) -> None:
+    global _process_timetable_index
+    _process_timetable_index = timetable_index
+
+
+def _find_optimal_route_indexes(
+        leg_queries: list[tuple],
+        timetable_index: Optional[Union[TimetableIndex,
+                                        DenseTimetable]] = None) \
+        -> list[Optional[int]]:
+    timetable_index = _process_timetable_index if timetable_index is None \
+        else timetable_index
+    return timetable_index.find_earliest_arrival_route_indexes(leg_queries)
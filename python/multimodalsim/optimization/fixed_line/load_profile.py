@@ -0,0 +1,130 @@
+from typing import Iterable
+
+
+class LoadProfile:
+    """The ``LoadProfile`` class stores the number of passengers on board a
+    vehicle between each stop of its route and the next one, in a segment
+    tree, so that the maximum load over consecutive stops can be queried and
+    the load over consecutive stops can be increased in O(log(nb_stops))
+    operations.
+
+    The load at position p is the load of the vehicle when it departs from
+    the stop at position p of the route (0 for the current stop, 1 for the
+    first next stop, etc.). A passenger who boards at position i and alights
+    at position j is therefore on board at the positions i to j - 1.
+        Properties
+        ----------
+        nb_stops: int
+            Number of positions of the profile.
+    """
+
+    def __init__(self, loads: Iterable[int]) -> None:
+        loads = list(loads)
+        self.__nb_stops = len(loads)
+
+        # The leaves of the tree are at the positions size to 2 * size - 1.
+        self.__height = max(len(loads) - 1, 0).bit_length()
+        self.__size = 1 << self.__height
+        self.__max_loads = [0] * (2 * self.__size)
+        self.__max_loads[self.__size:self.__size + len(loads)] = loads
+        for node in range(self.__size - 1, 0, -1):
+            self.__max_loads[node] = max(self.__max_loads[2 * node],
+                                         self.__max_loads[2 * node + 1])
+
+        # Load added to all the positions of the subtree of each internal
+        # node that has not been added to its children yet.
+        self.__pending_loads = [0] * self.__size
+
+    @property
+    def nb_stops(self) -> int:
+        return self.__nb_stops
+
+    def get_max_load(self, first_position: int, last_position: int) -> int:
+        """Get the maximum load at the positions first_position to
+        last_position - 1.
+
+        Input:
+          -first_position: The first position of the range.
+          -last_position: The position after the last position of the range.
+
+        Output:
+          -max_load: The maximum load over the range, or 0 if the range is
+           empty.
+        """
+        if first_position >= last_position:
+            return 0
+
+        first_leaf = first_position + self.__size
+        last_leaf = last_position + self.__size
+        self.__push(first_leaf)
+        self.__push(last_leaf - 1)
+
+        max_load = None
+        while first_leaf < last_leaf:
+            if first_leaf & 1:
+                max_load = self.__max_loads[first_leaf] if max_load is None \
+                    else max(max_load, self.__max_loads[first_leaf])
+                first_leaf += 1
+            if last_leaf & 1:
+                last_leaf -= 1
+                max_load = self.__max_loads[last_leaf] if max_load is None \
+                    else max(max_load, self.__max_loads[last_leaf])
+            first_leaf >>= 1
+            last_leaf >>= 1
+
+        return max_load
+
+    def add_load(self, first_position: int, last_position: int,
+                 load: int) -> None:
+        """Add load to the loads at the positions first_position to
+        last_position - 1.
+
+        Input:
+          -first_position: The first position of the range.
+          -last_position: The position after the last position of the range.
+          -load: The number of passengers to add (or to remove if negative).
+        """
+        if first_position >= last_position:
+            return
+
+        first_leaf = first_position + self.__size
+        last_leaf = last_position + self.__size
+        self.__push(first_leaf)
+        self.__push(last_leaf - 1)
+
+        node, last_node = first_leaf, last_leaf
+        while node < last_node:
+            if node & 1:
+                self.__apply(node, load)
+                node += 1
+            if last_node & 1:
+                last_node -= 1
+                self.__apply(last_node, load)
+            node >>= 1
+            last_node >>= 1
+
+        self.__update_ancestors(first_leaf)
+        self.__update_ancestors(last_leaf - 1)
+
+    def __apply(self, node, load):
+        self.__max_loads[node] += load
+        if node < self.__size:
+            self.__pending_loads[node] += load
+
+    def __push(self, leaf):
+        # Add the pending loads of the ancestors of the leaf to their
+        # children, from the root to the leaf.
+        for shift in range(self.__height, 0, -1):
+            node = leaf >> shift
+            if self.__pending_loads[node] != 0:
+                self.__apply(2 * node, self.__pending_loads[node])
+                self.__apply(2 * node + 1, self.__pending_loads[node])
+                self.__pending_loads[node] = 0
+
+    def __update_ancestors(self, leaf):
+        node = leaf >> 1
+        while node > 0:
+            self.__max_loads[node] = max(self.__max_loads[2 * node],
+                                         self.__max_loads[2 * node + 1]) \
+                + self.__pending_loads[node]
+            node >>= 1
@@ -0,0 +1,187 @@
+import bisect
+from typing import Iterable, Iterator, Optional
+
+import multimodalsim.simulator.vehicle as vehicle_module
+
+
+class TimetableIndex:
+    """The ``TimetableIndex`` class indexes the stops of a set of routes by
+    stop id so that the route that arrives the earliest at a destination
+    stop from an origin stop can be found without going through all the
+    stops of all the routes.
+
+    For each stop id, the index contains the list of the
+    (departure_time, route_index, position) of the stops with that id sorted
+    by departure time, and the list of the (arrival_time, route_index,
+    position) sorted by arrival time, where route_index is the position of
+    the route in routes and position is the position of the stop in the route
+    (0 for the current stop, 1 for the first next stop, etc.).
+
+    The index is read-only once created. When it is pickled (e.g., to be
+    sent to worker processes), the routes themselves are left out: only
+    find_earliest_arrival_route_index can be used on the copy.
+        Properties
+        ----------
+        routes: list of Route
+            The indexed routes.
+    """
+
+    def __init__(self, routes: Iterable['vehicle_module.Route']) -> None:
+        self.__routes = list(routes)
+
+        departures_by_stop_id = {}
+        arrivals_by_stop_id = {}
+        for route_index, route in enumerate(self.__routes):
+            stops = [route.current_stop] if route.current_stop is not None \
+                else [None]
+            stops.extend(route.next_stops)
+            for position, stop in enumerate(stops):
+                if stop is None:
+                    continue
+                stop_id = stop.location.label
+                departures_by_stop_id.setdefault(stop_id, []).append(
+                    (stop.departure_time, route_index, position))
+                arrivals_by_stop_id.setdefault(stop_id, []).append(
+                    (stop.arrival_time, route_index, position))
+
+        self.__departures_by_stop_id = {}
+        for stop_id, departures in departures_by_stop_id.items():
+            departures.sort()
+            self.__departures_by_stop_id[stop_id] = (
+                [departure[0] for departure in departures], departures)
+
+        self.__arrivals_by_stop_id = {}
+        for stop_id, arrivals in arrivals_by_stop_id.items():
+            arrivals.sort()
+            self.__arrivals_by_stop_id[stop_id] = (
+                [arrival[0] for arrival in arrivals], arrivals)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_TimetableIndex__routes"] = None
+        return state
+
+    @property
+    def routes(self) -> Optional[list['vehicle_module.Route']]:
+        return self.__routes
+
+    def find_earliest_arrival_route(
+            self, origin_stop_id: str, destination_stop_id: str,
+            current_time: float, ready_time: float,
+            due_time: float) -> Optional['vehicle_module.Route']:
+        """Find the route that arrives the earliest at the destination stop
+        after a departure from the origin stop (see
+        find_earliest_arrival_route_index)."""
+        route_index = self.find_earliest_arrival_route_index(
+            origin_stop_id, destination_stop_id, current_time, ready_time,
+            due_time)
+        return self.__routes[route_index] if route_index is not None \
+            else None
+
+    def find_earliest_arrival_route_indexes(
+            self, leg_queries: list[tuple]) -> list[Optional[int]]:
+        """Apply find_earliest_arrival_route_index to each (origin_stop_id,
+        destination_stop_id, current_time, ready_time, due_time) tuple of
+        leg_queries."""
+        return [self.find_earliest_arrival_route_index(*leg_query)
+                for leg_query in leg_queries]
+
+    def find_earliest_arrival_route_index(
+            self, origin_stop_id: str, destination_stop_id: str,
+            current_time: float, ready_time: float,
+            due_time: float) -> Optional[int]:
+        """Find the route that arrives the earliest at the destination stop
+        after a departure from the origin stop (see find_earliest_arrival)."""
+        earliest_arrival = self.find_earliest_arrival(
+            origin_stop_id, destination_stop_id, current_time, ready_time,
+            due_time)
+        return earliest_arrival[1] if earliest_arrival is not None else None
+
+    def find_earliest_arrival(
+            self, origin_stop_id: str, destination_stop_id: str,
+            current_time: float, ready_time: float,
+            due_time: float) -> Optional[tuple[float, int]]:
+        """Find the route that arrives the earliest at the destination stop
+        after a departure from the origin stop.
+
+        Input:
+          -origin_stop_id: The stop where the route is boarded.
+          -destination_stop_id: The stop where the route is alighted.
+          -current_time: The departure from the origin stop must be strictly
+           after current_time.
+          -ready_time: The departure from the origin stop must be at or after
+           ready_time.
+          -due_time: The arrival at the destination stop must be at or before
+           due_time.
+
+        Output:
+          -earliest_arrival: A tuple (arrival_time, route_index), where
+           route_index is the position in routes of the route that arrives
+           the earliest at the destination stop, or None if no route
+           satisfies the constraints. If several routes arrive at the same
+           time, the first one in routes is returned.
+        """
+
+        for arrival_time, route_index, _, _ in self.find_arrivals(
+                origin_stop_id, destination_stop_id, current_time,
+                ready_time, due_time):
+            return arrival_time, route_index
+
+        return None
+
+    def find_arrivals(
+            self, origin_stop_id: str, destination_stop_id: str,
+            current_time: float, ready_time: float,
+            due_time: float) -> Iterator[tuple[float, int, int, int]]:
+        """Iterate over the routes that arrive at the destination stop after
+        a departure from the origin stop, from the earliest arrival to the
+        latest one (see find_earliest_arrival for the constraints).
+
+        Input:
+          -origin_stop_id: The stop where the route is boarded.
+          -destination_stop_id: The stop where the route is alighted.
+          -current_time: The current time.
+          -ready_time: The ready time of the leg.
+          -due_time: The due time of the leg.
+
+        Output:
+          -arrivals: The tuples (arrival_time, route_index, origin_position,
+           destination_position) of the routes that satisfy the constraints,
+           where origin_position and destination_position are the positions
+           in the route of the stops where the route is boarded and alighted.
+           Each route is yielded at most once, and the routes that arrive at
+           the same time are yielded in the order of routes.
+        """
+
+        if origin_stop_id not in self.__departures_by_stop_id \
+                or destination_stop_id not in self.__arrivals_by_stop_id:
+            return
+
+        departure_times, departures = \
+            self.__departures_by_stop_id[origin_stop_id]
+        first_departure = max(bisect.bisect_right(departure_times,
+                                                  current_time),
+                              bisect.bisect_left(departure_times, ready_time))
+
+        # The earliest position of the origin stop in each route that serves
+        # it late enough.
+        origin_by_route_index = {}
+        for departure_time, route_index, position \
+                in departures[first_departure:]:
+            if route_index not in origin_by_route_index \
+                    or position < origin_by_route_index[route_index][1]:
+                origin_by_route_index[route_index] = (departure_time,
+                                                      position)
+
+        arrival_times, arrivals = \
+            self.__arrivals_by_stop_id[destination_stop_id]
+        last_arrival = bisect.bisect_right(arrival_times, due_time)
+
+        # The arrivals are sorted by time, then by route index, so the first
+        # arrival after the origin stop of each route is the one yielded.
+        for arrival_time, route_index, position in arrivals[:last_arrival]:
+            origin = origin_by_route_index.get(route_index)
+            if origin is not None and origin[1] < position \
+                    and origin[0] < arrival_time:
+                yield arrival_time, route_index, origin[1], position
+                del origin_by_route_index[route_index]
@@ -3,7 +3,8 @@ from typing import Optional, Union
 
 from multimodalsim.config.optimization_config import OptimizationConfig
 import multimodalsim.optimization.dispatcher as dispatcher_module
-from multimodalsim.optimization.splitter import Splitter, OneLegSplitter
+import multimodalsim.optimization.dispatch_worker as dispatch_worker_module
+import multimodalsim.optimization.splitter as splitter_module
 import multimodalsim.state_machine.state_machine as state_machine
 import multimodalsim.optimization.state as state_module
 import multimodalsim.simulator.request as request
@@ -34,13 +35,14 @@ class Optimization:
         """
 
     def __init__(self, dispatcher: 'dispatcher_module.Dispatcher',
-                 splitter: Optional[Splitter] = None,
+                 splitter: Optional['splitter_module.Splitter'] = None,
                  freeze_interval: Optional[float] = None,
                  environment_statistics_extractor:
                  Optional[EnvironmentStatisticsExtractor] = None,
                  config: Optional[str | OptimizationConfig] = None) -> None:
         self.__dispatcher = dispatcher
-        self.__splitter = OneLegSplitter() if splitter is None else splitter
+        self.__splitter = splitter_module.OneLegSplitter() \
+            if splitter is None else splitter
 
         if environment_statistics_extractor is None:
             # Use default EnvironmentStatisticsExtractor
@@ -54,6 +56,8 @@ class Optimization:
 
         self.__state = None
 
+        self.__dispatch_worker_pool = None
+
         self.__load_config(config, freeze_interval)
 
     @property
@@ -83,6 +87,13 @@ class Optimization:
             -> list['request.Leg']:
         return self.__splitter.split(trip, state)
 
+    def split_batch(
+            self, trips: list['request.Trip'],
+            state: Union[
+                'state_module.State', 'environment_module.Environment']) \
+            -> list[list['request.Leg']]:
+        return self.__splitter.split_batch(trips, state)
+
     def dispatch(self, state: 'state_module.State') -> 'OptimizationResult':
         return self.__dispatcher.dispatch(state)
 
@@ -93,7 +104,7 @@ class Optimization:
         return True
 
     @property
-    def splitter(self) -> Splitter:
+    def splitter(self) -> 'splitter_module.Splitter':
         return self.__splitter
 
     @property
@@ -109,6 +120,24 @@ class Optimization:
     def config(self) -> OptimizationConfig:
         return self.__config
 
+    @property
+    def dispatch_worker_pool(
+            self) -> 'dispatch_worker_module.DispatchWorkerPool':
+        """Pool of the worker processes in which the dispatcher runs when
+        the optimization is asynchronous. The pool is created the first time
+        it is accessed."""
+        if self.__dispatch_worker_pool is None:
+            self.__dispatch_worker_pool = \
+                dispatch_worker_module.DispatchWorkerPool(
+                    self.__dispatcher, self.__config.nb_workers)
+        return self.__dispatch_worker_pool
+
+    def close(self) -> None:
+        """Stop the worker processes of the asynchronous optimization, if
+        any."""
+        if self.__dispatch_worker_pool is not None:
+            self.__dispatch_worker_pool.close()
+
     def __load_config(self, config, freeze_interval):
         if isinstance(config, str):
             self.__config = OptimizationConfig(config)
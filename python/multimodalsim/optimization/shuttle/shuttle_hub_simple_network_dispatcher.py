@@ -1,12 +1,14 @@
 import logging
 
 from itertools import cycle
-from typing import Tuple
+from typing import Tuple, Optional
 
 import networkx as nx
 
 from multimodalsim.optimization.dispatcher import Dispatcher, \
     OptimizedRoutePlan
+from multimodalsim.optimization.shuttle.travel_time_matrix import \
+    TravelTimeMatrix
 from multimodalsim.optimization.state import State
 from multimodalsim.simulator.vehicle import Route
 import multimodalsim.simulator.request as request
@@ -16,7 +18,9 @@ logger = logging.getLogger(__name__)
 
 class ShuttleHubSimpleNetworkDispatcher(Dispatcher):
 
-    def __init__(self, network: nx.Graph, hub_location: str = "0") -> None:
+    def __init__(self, network: nx.Graph, hub_location: str = "0",
+                 travel_time_matrix: Optional[TravelTimeMatrix] = None) \
+            -> None:
         """
         Parameters:
             network: networkx Graph
@@ -27,11 +31,17 @@ class ShuttleHubSimpleNetworkDispatcher(Dispatcher):
             hub_location: string
                 Label of the hub, i.e., the initial and final location of all
                 the vehicles.
+            travel_time_matrix: TravelTimeMatrix or None
+                The travel times between the locations of the network (see
+                ShuttleDataReader.get_travel_time_matrix). If None, the travel
+                times are the lengths of the edges of the network, so the
+                network must be complete.
         """
         super().__init__()
 
         self.__network = network
         self.__hub_location = hub_location
+        self.__travel_time_matrix = travel_time_matrix
 
     def prepare_input(self, state: State) \
             -> Tuple[list['request.Leg'], list[Route]]:
@@ -96,7 +106,8 @@ class ShuttleHubSimpleNetworkDispatcher(Dispatcher):
         to the sum of the departure time of the previous stop and the travel
         time determined from the graph network. More precisely, the travel time
         corresponds to the "length" of an edge between the nodes associated
-        with the origin stop and the destination stop.
+        with the origin stop and the destination stop (or to the shortest
+        travel time between them if a travel time matrix is used).
         """
 
         route_plan = OptimizedRoutePlan(route)
@@ -110,8 +121,8 @@ class ShuttleHubSimpleNetworkDispatcher(Dispatcher):
         #   -location: leg origin
         #   -arrival and departure time: current time + distance between hub
         #   and leg origin
-        hub_to_origin_travel_time = self.__network.get_edge_data(
-            route.current_stop.location.label, leg.origin.label)["length"]
+        hub_to_origin_travel_time = self.__get_travel_time(
+            route.current_stop.location.label, leg.origin.label)
         first_stop_time = current_time + hub_to_origin_travel_time
         origin_lon = self.__network.nodes[leg.origin.label]["lon"]
         origin_lat = self.__network.nodes[leg.origin.label]["lat"]
@@ -122,8 +133,8 @@ class ShuttleHubSimpleNetworkDispatcher(Dispatcher):
         #   -location: leg destination
         #   -arrival and departure time: departure time of the previous stop
         #   + distance between leg origin and leg destination
-        origin_to_destination_travel_time = self.__network.get_edge_data(
-            leg.origin.label, leg.destination.label)["length"]
+        origin_to_destination_travel_time = self.__get_travel_time(
+            leg.origin.label, leg.destination.label)
         second_stop_time = first_stop_time + origin_to_destination_travel_time
         destination_lon = self.__network.nodes[leg.destination.label]["lon"]
         destination_lat = self.__network.nodes[leg.destination.label]["lat"]
@@ -134,8 +145,8 @@ class ShuttleHubSimpleNetworkDispatcher(Dispatcher):
         #   -location: hub
         #   -arrival time: departure time of the previous stop + distance
         #   between leg origin and leg destination
-        destination_to_hub_travel_time = self.__network.get_edge_data(
-            leg.destination.label, self.__hub_location)["length"]
+        destination_to_hub_travel_time = self.__get_travel_time(
+            leg.destination.label, self.__hub_location)
         last_stop_time = second_stop_time + destination_to_hub_travel_time
         hub_lon = self.__network.nodes[self.__hub_location]["lon"]
         hub_lat = self.__network.nodes[self.__hub_location]["lat"]
@@ -146,3 +157,8 @@ class ShuttleHubSimpleNetworkDispatcher(Dispatcher):
 
         return route_plan
 
+    def __get_travel_time(self, origin, destination):
+        if self.__travel_time_matrix is not None:
+            return self.__travel_time_matrix.get_travel_time(origin,
+                                                             destination)
+        return self.__network.get_edge_data(origin, destination)["length"]
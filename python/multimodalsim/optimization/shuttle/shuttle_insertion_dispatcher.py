@@ -0,0 +1,502 @@
+import logging
+import math
+from typing import Tuple, Optional
+
+import networkx as nx
+import numpy as np
+
+from multimodalsim.optimization.dispatcher import Dispatcher, \
+    OptimizedRoutePlan
+from multimodalsim.optimization.shuttle.travel_time_matrix import \
+    TravelTimeMatrix
+from multimodalsim.optimization.state import State
+from multimodalsim.simulator.vehicle import Route
+from multimodalsim.state_machine.status import VehicleStatus
+import multimodalsim.simulator.request as request
+
+logger = logging.getLogger(__name__)
+
+
+class ShuttleInsertionDispatcher(Dispatcher):
+
+    def __init__(self, network: nx.Graph,
+                 travel_time_matrix: Optional[TravelTimeMatrix] = None) \
+            -> None:
+        """
+        Parameters:
+            network: networkx Graph
+                A graph in which the nodes correspond to locations and have
+                the attributes "lon" and "lat", and the edges have an
+                attribute "length" that represents the time it takes to
+                travel between the locations of the two associated nodes.
+            travel_time_matrix: TravelTimeMatrix or None
+                The travel times between the locations of the network (see
+                ShuttleDataReader.get_travel_time_matrix). If None, the
+                shortest travel times are computed from the network.
+        """
+        super().__init__()
+
+        self.__network = network
+        self.__travel_time_matrix = travel_time_matrix \
+            if travel_time_matrix is not None \
+            else TravelTimeMatrix.from_shortest_paths(network)
+
+    @property
+    def travel_time_matrix(self) -> TravelTimeMatrix:
+        return self.__travel_time_matrix
+
+    def prepare_input(self, state: State) \
+            -> Tuple[list['request.Leg'], list[Route]]:
+        """Before optimizing, we extract the legs and the routes that we want
+        to be considered by the optimization algorithm. For the
+        ShuttleInsertionDispatcher, we want to keep only the legs that have
+        not been assigned to any route yet and the routes of all the vehicles
+        that are not complete, wherever they are.
+        """
+
+        selected_next_legs = state.non_assigned_next_legs
+
+        selected_routes = [
+            route for route in state.route_by_vehicle_id.values()
+            if route.vehicle.status != VehicleStatus.COMPLETE
+            and (route.current_stop is not None
+                 or len(route.next_stops) > 0)]
+
+        return selected_next_legs, selected_routes
+
+    def optimize(self, selected_next_legs: list['request.Leg'],
+                 selected_routes: list[Route], current_time: float,
+                 state: State) -> list[OptimizedRoutePlan]:
+        """Each non assigned next leg is inserted, in order, in the route of
+        the vehicle that minimizes the additional travel time. The origin of
+        the leg is inserted after any stop of the route that has not been
+        left yet, and the destination is inserted after the origin, so that:
+          - the vehicle leaves the origin at or after the ready time of the
+            leg and arrives at the destination at or before its due time;
+          - the passengers already assigned to the route still arrive at
+            their destination at or before their due time (or, if they were
+            already late, not later than planned);
+          - the number of passengers on board never exceeds the capacity of
+            the vehicle.
+        The vehicle waits at a stop until it is planned to leave it, so a
+        delay caused by an insertion is absorbed by the waiting times of the
+        following stops.
+
+        The stops of all the routes are stored in padded NumPy arrays (one
+        row per route), so that all the insertion positions of a leg in all
+        the routes are evaluated at once. A leg that cannot be inserted in
+        any route is left unassigned until the next optimization.
+        """
+
+        route_schedules = [RouteSchedule(route, current_time,
+                                         self.__travel_time_matrix)
+                           for route in selected_routes]
+        schedule_arrays = _ScheduleArrays(
+            route_schedules, self.__travel_time_matrix.travel_times)
+
+        modified_route_indexes = []
+        for leg in selected_next_legs:
+            insertion = self.__find_best_insertion(leg, schedule_arrays)
+            if insertion is None:
+                logger.debug("Leg {} cannot be inserted in any route."
+                             .format(leg.id))
+                continue
+
+            route_index, pickup_position, dropoff_position = insertion
+            route_schedules[route_index].insert(leg, pickup_position,
+                                                dropoff_position)
+            schedule_arrays.update(route_index)
+            if route_index not in modified_route_indexes:
+                modified_route_indexes.append(route_index)
+
+        return [route_schedules[route_index].create_route_plan(
+            self.__network) for route_index in modified_route_indexes]
+
+    def __find_best_insertion(self, leg, schedule_arrays):
+        travel_times = self.__travel_time_matrix.travel_times
+        origin_row = self.__travel_time_matrix.get_index(leg.origin.label)
+        destination_row = self.__travel_time_matrix.get_index(
+            leg.destination.label)
+        origin_to_destination = float(travel_times[origin_row,
+                                                   destination_row])
+
+        # The routes are evaluated in groups of routes with about the same
+        # number of stops, so that the arrays of the short routes (e.g., of
+        # the idle vehicles) are not padded to the length of the longest
+        # route.
+        insertions = []
+        size_classes = np.ceil(np.log2(schedule_arrays.nb_stops))
+        for size_class in np.unique(size_classes):
+            route_indexes = np.flatnonzero(size_classes == size_class)
+            insertions.extend(self.__get_best_insertions(
+                leg, origin_row, destination_row, origin_to_destination,
+                schedule_arrays, route_indexes))
+        if len(insertions) == 0:
+            return None
+
+        _, route_index, pickup_position, dropoff_position = min(insertions)
+
+        return int(route_index), int(pickup_position), int(dropoff_position)
+
+    def __get_best_insertions(self, leg, origin_row, destination_row,
+                              origin_to_destination, schedule_arrays,
+                              route_indexes):
+        # Return the best insertion of each kind (same position or split) in
+        # the routes route_indexes as (cost, route_index, pickup_position,
+        # dropoff_position).
+        travel_times = self.__travel_time_matrix.travel_times
+        nb_passengers = leg.nb_passengers
+
+        nb_stops = schedule_arrays.nb_stops[route_indexes]
+        width = int(nb_stops.max())
+        rows = schedule_arrays.rows[route_indexes, :width]
+        next_rows = schedule_arrays.next_rows[route_indexes, :width]
+        departures = schedule_arrays.departures[route_indexes, :width]
+        cumulative_times = schedule_arrays.cumulative_times[route_indexes,
+                                                            :width + 1]
+        next_travel_times = schedule_arrays.next_travel_times[route_indexes,
+                                                              :width]
+        margins = schedule_arrays.margins[route_indexes, :width + 1]
+        loads = schedule_arrays.loads[route_indexes, :width]
+        capacities = schedule_arrays.capacities[route_indexes]
+
+        positions = np.arange(width)
+        not_last = positions < (nb_stops - 1)[:, np.newaxis]
+
+        to_origin = travel_times[rows, origin_row]
+        to_destination = travel_times[rows, destination_row]
+        origin_to_next = np.where(not_last,
+                                  travel_times[origin_row, next_rows], 0)
+        destination_to_next = np.where(
+            not_last, travel_times[destination_row, next_rows], 0)
+
+        # The padding of the departures and of the loads is infinite, so
+        # that no leg is picked up after the last stop of a route.
+        origin_departures = np.maximum(departures + to_origin,
+                                       leg.trip.ready_time)
+        pickup_feasible = \
+            (origin_departures + origin_to_destination <= leg.trip.due_time) \
+            & (loads + nb_passengers <= capacities[:, np.newaxis])
+
+        # Minimum margin (latest arrival - cumulative travel time) of the
+        # stops after each position.
+        suffix_margins = np.minimum.accumulate(
+            margins[:, ::-1], axis=1)[:, ::-1]
+
+        # Origin and destination inserted after the same stop i.
+        same_shifts = origin_departures + origin_to_destination \
+            + destination_to_next - cumulative_times[:, 1:]
+        same_feasible = pickup_feasible \
+            & (~not_last | (same_shifts <= suffix_margins[:, 1:]))
+        same_costs = np.where(
+            same_feasible,
+            to_origin + origin_to_destination + destination_to_next
+            - next_travel_times, np.inf)
+
+        # Origin inserted after the stop i and destination after the stop
+        # j > i. The pickup shifts the arrival times of the stops i + 1 to j
+        # to max(arrival, pickup_shift + cumulative_time), and the dropoff
+        # shifts the stops after j in the same way. Only the pairs (route,
+        # i) for which the stop i + 1 is still on time are evaluated.
+        pickup_shifts = origin_departures + origin_to_next \
+            - cumulative_times[:, 1:]
+        pair_routes, pickup_positions = np.nonzero(
+            pickup_feasible & not_last & (pickup_shifts <= margins[:, 1:]))
+        pair_shifts = pickup_shifts[pair_routes, pickup_positions]
+        after_pickup = positions > pickup_positions[:, np.newaxis]
+        range_margins = np.minimum.accumulate(
+            np.where(after_pickup, margins[pair_routes, :width], np.inf),
+            axis=1)
+        range_loads = np.maximum.accumulate(
+            np.where(positions >= pickup_positions[:, np.newaxis],
+                     loads[pair_routes], -np.inf), axis=1)
+        dropoff_arrivals = np.maximum(
+            departures[pair_routes],
+            pair_shifts[:, np.newaxis] + cumulative_times[pair_routes,
+                                                          :width]) \
+            + to_destination[pair_routes]
+        dropoff_shifts = np.maximum(
+            pair_shifts[:, np.newaxis],
+            dropoff_arrivals + destination_to_next[pair_routes]
+            - cumulative_times[pair_routes, 1:])
+        split_feasible = after_pickup \
+            & (pair_shifts[:, np.newaxis] <= range_margins) \
+            & (dropoff_arrivals <= leg.trip.due_time) \
+            & (~not_last[pair_routes]
+               | (dropoff_shifts <= suffix_margins[pair_routes, 1:])) \
+            & (range_loads + nb_passengers
+               <= capacities[pair_routes, np.newaxis])
+        split_costs = np.where(
+            split_feasible,
+            (to_origin + origin_to_next - next_travel_times)[
+                pair_routes, pickup_positions][:, np.newaxis]
+            + (to_destination + destination_to_next
+               - next_travel_times)[pair_routes],
+            np.inf)
+
+        insertions = []
+        route_position = np.unravel_index(np.argmin(same_costs),
+                                          same_costs.shape)
+        if np.isfinite(same_costs[route_position]):
+            insertions.append((same_costs[route_position],
+                               route_indexes[route_position[0]],
+                               route_position[1], route_position[1]))
+        if split_costs.size > 0:
+            pair, dropoff_position = np.unravel_index(
+                np.argmin(split_costs), split_costs.shape)
+            if np.isfinite(split_costs[pair, dropoff_position]):
+                insertions.append((split_costs[pair, dropoff_position],
+                                   route_indexes[pair_routes[pair]],
+                                   pickup_positions[pair], dropoff_position))
+
+        return insertions
+
+
+class RouteSchedule:
+    """The ``RouteSchedule`` class stores the stops of a route that can be
+    modified by ShuttleInsertionDispatcher and the times computed with the
+    travel time matrix.
+
+    The first stop (position 0) is the current stop of the vehicle or, if the
+    vehicle is travelling, the stop it is travelling to. The stops after it
+    are the next stops of the route, in which the stops of the inserted legs
+    are added.
+        Properties
+        ----------
+        route: Route
+            The route.
+        nb_stops: int
+            The number of stops, including the first one.
+        rows: list of int
+            The row in the travel time matrix of the location of each stop.
+        departures: list of float
+            The time at which the vehicle leaves each stop.
+        arrivals: list of float
+            The time at which the vehicle arrives at each stop (the arrival
+            time of the first stop is the time at which the vehicle leaves
+            it).
+        latest_arrivals: list of float
+            The due time of the passengers alighting at each stop.
+        loads: list of int
+            The number of passengers on board when the vehicle leaves each
+            stop.
+    """
+
+    def __init__(self, route: Route, current_time: float,
+                 travel_time_matrix: TravelTimeMatrix) -> None:
+        self.__route = route
+        self.__travel_time_matrix = travel_time_matrix
+
+        onboard_load = sum(leg.nb_passengers for leg in route.onboard_legs)
+        if route.current_stop is not None:
+            # The vehicle leaves its current stop at the planned departure
+            # time or, if it is idle, at the current time.
+            first_stop = route.current_stop
+            next_stops = route.next_stops
+            self.__first_departure = first_stop.departure_time \
+                if len(next_stops) > 0 else current_time
+            onboard_load += self.__get_nb_passengers(
+                first_stop.boarding_passengers) - self.__get_nb_passengers(
+                first_stop.alighting_passengers)
+        else:
+            # The vehicle leaves the stop it is travelling to at the planned
+            # departure time or, if it is the last stop, as soon as it
+            # arrives.
+            first_stop = route.next_stops[0]
+            next_stops = route.next_stops[1:]
+            self.__first_departure = \
+                max(first_stop.arrival_time, first_stop.departure_time) \
+                if len(next_stops) > 0 else first_stop.arrival_time
+
+        # Each stop is a list [stop, label, earliest_departure,
+        # latest_arrival, load_change, leg_to_board, leg_to_alight], where
+        # stop is None for the stops of the inserted legs. The vehicle does
+        # not leave a stop before its planned departure time, except the
+        # last stop, whose departure time is unknown.
+        self.__stops = []
+        for position, stop in enumerate([first_stop, *next_stops]):
+            earliest_departure = stop.departure_time \
+                if 0 < position < len(next_stops) else -math.inf
+            latest_arrival = min((trip.due_time
+                                  for trip in stop.passengers_to_alight),
+                                 default=math.inf)
+            load_change = self.__get_nb_passengers(stop.passengers_to_board) \
+                - self.__get_nb_passengers(stop.passengers_to_alight)
+            self.__stops.append([stop, stop.location.label,
+                                 earliest_departure, latest_arrival,
+                                 load_change, None, None])
+        self.__stops[0][4] += onboard_load
+
+        self.__update_times()
+
+    @property
+    def route(self) -> Route:
+        return self.__route
+
+    @property
+    def nb_stops(self) -> int:
+        return len(self.__stops)
+
+    @property
+    def rows(self) -> list[int]:
+        return self.__rows
+
+    @property
+    def departures(self) -> list[float]:
+        return self.__departures
+
+    @property
+    def arrivals(self) -> list[float]:
+        return self.__arrivals
+
+    @property
+    def latest_arrivals(self) -> list[float]:
+        return [stop[3] for stop in self.__stops]
+
+    @property
+    def loads(self) -> list[int]:
+        return self.__loads
+
+    def insert(self, leg: 'request.Leg', pickup_position: int,
+               dropoff_position: int) -> None:
+        """Insert the origin of the leg after the stop at position
+        pickup_position and its destination after the stop at position
+        dropoff_position (>= pickup_position)."""
+        self.__stops.insert(
+            dropoff_position + 1,
+            [None, leg.destination.label, -math.inf, leg.trip.due_time,
+             -leg.nb_passengers, None, leg])
+        self.__stops.insert(
+            pickup_position + 1,
+            [None, leg.origin.label, leg.trip.ready_time, math.inf,
+             leg.nb_passengers, leg, None])
+
+        self.__update_times()
+
+    def create_route_plan(self, network: nx.Graph) -> OptimizedRoutePlan:
+        """Create the route plan of the route with the stops of the
+        inserted legs. The coordinates of the new stops are those of the
+        nodes of the network."""
+
+        next_stops = [stop[0] for stop in self.__stops[1:]
+                      if stop[0] is not None]
+        if self.__route.current_stop is None:
+            next_stops.insert(0, self.__stops[0][0])
+            self.__stops[0][0].departure_time = self.__departures[0]
+            route_plan = OptimizedRoutePlan(self.__route,
+                                            next_stops=next_stops)
+            index_offset = 0
+        else:
+            route_plan = OptimizedRoutePlan(self.__route,
+                                            self.__departures[0],
+                                            next_stops)
+            index_offset = -1
+
+        for position in range(1, len(self.__stops)):
+            stop, label, _, _, _, leg_to_board, leg_to_alight = \
+                self.__stops[position]
+            if stop is not None:
+                stop.arrival_time = self.__arrivals[position]
+                stop.departure_time = self.__departures[position]
+                continue
+
+            node = network.nodes[label]
+            route_plan.insert_next_stop(
+                position + index_offset, label, self.__arrivals[position],
+                self.__departures[position], lon=node.get("lon"),
+                lat=node.get("lat"),
+                legs_to_board=[leg_to_board]
+                if leg_to_board is not None else None,
+                legs_to_alight=[leg_to_alight]
+                if leg_to_alight is not None else None)
+
+        return route_plan
+
+    def __update_times(self):
+        travel_times = self.__travel_time_matrix.travel_times
+        self.__rows = [self.__travel_time_matrix.get_index(stop[1])
+                       for stop in self.__stops]
+
+        self.__arrivals = [self.__first_departure]
+        self.__departures = [self.__first_departure]
+        self.__loads = [self.__stops[0][4]]
+        for position in range(1, len(self.__stops)):
+            arrival = self.__departures[-1] + float(travel_times[
+                self.__rows[position - 1], self.__rows[position]])
+            self.__arrivals.append(arrival)
+            self.__departures.append(max(arrival,
+                                         self.__stops[position][2]))
+            self.__loads.append(self.__loads[-1] + self.__stops[position][4])
+
+    @staticmethod
+    def __get_nb_passengers(trips):
+        return sum(trip.nb_passengers for trip in trips)
+
+
+class _ScheduleArrays:
+    # The stops of the route schedules in arrays padded to the largest
+    # number of stops (one row per route), updated after each insertion.
+
+    def __init__(self, route_schedules, travel_times):
+        self.__route_schedules = route_schedules
+        self.__travel_times = travel_times
+        self.capacities = np.array([route_schedule.route.vehicle.capacity
+                                    for route_schedule in route_schedules],
+                                   dtype=float)
+        self.nb_stops = np.array([route_schedule.nb_stops
+                                  for route_schedule in route_schedules],
+                                 dtype=np.int64)
+        self.__allocate(int(self.nb_stops.max(initial=1)))
+
+    def update(self, route_index):
+        route_schedule = self.__route_schedules[route_index]
+        if route_schedule.nb_stops > self.rows.shape[1]:
+            self.__allocate(2 * route_schedule.nb_stops)
+        else:
+            self.__set_row(route_index)
+
+    def __allocate(self, width):
+        nb_routes = len(self.__route_schedules)
+        self.rows = np.zeros((nb_routes, width), dtype=np.int64)
+        self.next_rows = np.zeros((nb_routes, width), dtype=np.int64)
+        self.departures = np.full((nb_routes, width), np.inf)
+        self.cumulative_times = np.zeros((nb_routes, width + 1))
+        self.next_travel_times = np.zeros((nb_routes, width))
+        self.margins = np.full((nb_routes, width + 1), np.inf)
+        self.loads = np.full((nb_routes, width), np.inf)
+        for route_index in range(nb_routes):
+            self.__set_row(route_index)
+
+    def __set_row(self, route_index):
+        route_schedule = self.__route_schedules[route_index]
+        nb_stops = route_schedule.nb_stops
+        self.nb_stops[route_index] = nb_stops
+
+        rows = np.array(route_schedule.rows, dtype=np.int64)
+        arrivals = np.array(route_schedule.arrivals)
+        next_travel_times = np.asarray(
+            self.__travel_times[rows[:-1], rows[1:]], dtype=float)
+        cumulative_times = np.concatenate(([0], np.cumsum(
+            next_travel_times)))
+
+        self.rows[route_index, :] = 0
+        self.rows[route_index, :nb_stops] = rows
+        self.next_rows[route_index, :] = 0
+        self.next_rows[route_index, :nb_stops - 1] = rows[1:]
+        self.departures[route_index, :] = np.inf
+        self.departures[route_index, :nb_stops] = route_schedule.departures
+        self.cumulative_times[route_index, :] = cumulative_times[-1]
+        self.cumulative_times[route_index, :nb_stops] = cumulative_times
+        self.next_travel_times[route_index, :] = 0
+        self.next_travel_times[route_index, :nb_stops - 1] = \
+            next_travel_times
+        self.loads[route_index, :] = np.inf
+        self.loads[route_index, :nb_stops] = route_schedule.loads
+
+        # The margin of a stop is the largest shift (see optimize) that keeps
+        # its arrival time before its latest arrival (or its planned arrival
+        # if it is already late). The first stop has no margin constraint.
+        self.margins[route_index, :] = np.inf
+        self.margins[route_index, 1:nb_stops] = np.maximum(
+            np.array(route_schedule.latest_arrivals[1:]), arrivals[1:]) \
+            - cumulative_times[1:]
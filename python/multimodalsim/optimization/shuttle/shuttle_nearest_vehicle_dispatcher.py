@@ -0,0 +1,183 @@
+import logging
+from typing import Tuple, Optional
+
+import networkx as nx
+import numpy as np
+
+from multimodalsim.optimization.dispatcher import Dispatcher, \
+    OptimizedRoutePlan
+from multimodalsim.optimization.shuttle.spatial_grid import SpatialGrid
+from multimodalsim.optimization.shuttle.travel_time_matrix import \
+    TravelTimeMatrix
+from multimodalsim.optimization.state import State
+from multimodalsim.simulator.vehicle import Route
+import multimodalsim.simulator.request as request
+
+logger = logging.getLogger(__name__)
+
+
+class ShuttleNearestVehicleDispatcher(Dispatcher):
+
+    def __init__(self, network: nx.Graph,
+                 travel_time_matrix: Optional[TravelTimeMatrix] = None,
+                 nb_candidate_vehicles: Optional[int] = 10,
+                 cell_size: Optional[float] = None) -> None:
+        """
+        Parameters:
+            network: networkx Graph
+                A graph in which the nodes correspond to locations and have
+                the attributes "lon" and "lat", and the edges have an
+                attribute "length" that represents the time it takes to
+                travel between the locations of the two associated nodes.
+            travel_time_matrix: TravelTimeMatrix or None
+                The travel times between the locations of the network (see
+                ShuttleDataReader.get_travel_time_matrix). If None, the
+                shortest travel times are computed from the network.
+            nb_candidate_vehicles: int or None
+                Number of idle vehicles nearest (as the crow flies) to the
+                origin of a leg among which the vehicle that arrives the
+                earliest at the origin is chosen. If None, all the idle
+                vehicles are candidates.
+            cell_size: float or None
+                Side of the cells of the spatial grid in which the idle
+                vehicles are indexed (see SpatialGrid).
+        """
+        super().__init__()
+
+        self.__network = network
+        self.__travel_time_matrix = travel_time_matrix \
+            if travel_time_matrix is not None \
+            else TravelTimeMatrix.from_shortest_paths(network)
+        self.__nb_candidate_vehicles = nb_candidate_vehicles
+        self.__cell_size = cell_size
+
+    @property
+    def travel_time_matrix(self) -> TravelTimeMatrix:
+        return self.__travel_time_matrix
+
+    def prepare_input(self, state: State) \
+            -> Tuple[list['request.Leg'], list[Route]]:
+        """Before optimizing, we extract the legs and the routes that we want
+        to be considered by the optimization algorithm. For the
+        ShuttleNearestVehicleDispatcher, we want to keep only the legs that
+        have not been assigned to any route yet and the routes of the
+        vehicles that are idle, i.e., that are at a stop and have no next
+        stops.
+        """
+
+        selected_next_legs = state.non_assigned_next_legs
+
+        selected_routes = []
+        for vehicle_id, route in state.route_by_vehicle_id.items():
+            if route.current_stop is not None \
+                    and len(route.next_stops) == 0:
+                selected_routes.append(route)
+
+        return selected_next_legs, selected_routes
+
+    def optimize(self, selected_next_legs: list['request.Leg'],
+                 selected_routes: list[Route], current_time: float,
+                 state: State) -> list[OptimizedRoutePlan]:
+        """Each non assigned next leg is assigned, in order, to the idle
+        vehicle that can arrive the earliest at the leg origin. The vehicle
+        then goes to the leg origin and to the leg destination, where it
+        remains idle (current stop -> leg.origin -> leg.destination).
+
+        The idle vehicles are indexed in a spatial grid by the coordinates of
+        their current stop. For each leg, only the nb_candidate_vehicles
+        vehicles nearest to the leg origin are considered, and their travel
+        times to the origin are looked up at once in the travel time matrix.
+        A vehicle is removed from the grid once a leg is assigned to it. A
+        leg whose destination cannot be reached from its origin, or that none
+        of the candidate vehicles can reach, is left unassigned.
+        """
+
+        if len(selected_routes) == 0:
+            return []
+
+        vehicle_locations = [route.current_stop.location.label
+                             for route in selected_routes]
+        vehicle_rows = self.__travel_time_matrix.get_indexes(
+            vehicle_locations)
+        spatial_grid = SpatialGrid(
+            [self.__network.nodes[label]["lon"]
+             for label in vehicle_locations],
+            [self.__network.nodes[label]["lat"]
+             for label in vehicle_locations],
+            self.__cell_size)
+
+        route_plans = []
+        for leg in selected_next_legs:
+            if spatial_grid.nb_points == 0:
+                break
+
+            to_destination_travel_time = \
+                self.__travel_time_matrix.get_travel_time(
+                    leg.origin.label, leg.destination.label)
+            if not np.isfinite(to_destination_travel_time):
+                logger.debug("The destination of leg {} cannot be reached "
+                             "from its origin.".format(leg.id))
+                continue
+
+            origin_node = self.__network.nodes[leg.origin.label]
+            nb_candidate_vehicles = self.__nb_candidate_vehicles \
+                if self.__nb_candidate_vehicles is not None \
+                else spatial_grid.nb_points
+            candidate_route_indexes = np.array(spatial_grid.find_nearest(
+                origin_node["lon"], origin_node["lat"],
+                nb_candidate_vehicles), dtype=np.int64)
+
+            origin_row = self.__travel_time_matrix.get_index(
+                leg.origin.label)
+            travel_times = self.__travel_time_matrix.travel_times[
+                vehicle_rows[candidate_route_indexes], origin_row]
+            nearest_candidate = int(np.argmin(travel_times))
+            if not np.isfinite(travel_times[nearest_candidate]):
+                logger.debug("Leg {} cannot be reached by any idle vehicle."
+                             .format(leg.id))
+                continue
+
+            route_index = int(candidate_route_indexes[nearest_candidate])
+            spatial_grid.remove(route_index)
+
+            route_plans.append(self.__create_route_plan(
+                selected_routes[route_index], leg, current_time,
+                float(travel_times[nearest_candidate]),
+                float(to_destination_travel_time)))
+
+        return route_plans
+
+    def __create_route_plan(self, route, leg, current_time,
+                            to_origin_travel_time,
+                            to_destination_travel_time):
+        """For the route in argument, create a route plan made up of three
+        stops:
+          1. Current stop of the vehicle
+          2. Leg origin
+          3. Leg destination
+        The vehicle leaves the leg origin at the ready time of the leg at the
+        earliest.
+        """
+
+        route_plan = OptimizedRoutePlan(route)
+        route_plan.update_current_stop_departure_time(current_time)
+
+        origin_arrival_time = current_time + to_origin_travel_time
+        origin_departure_time = max(origin_arrival_time, leg.trip.ready_time)
+        origin_node = self.__network.nodes[leg.origin.label]
+        route_plan.append_next_stop(leg.origin.label, origin_arrival_time,
+                                    origin_departure_time,
+                                    lon=origin_node["lon"],
+                                    lat=origin_node["lat"])
+
+        destination_arrival_time = origin_departure_time \
+            + to_destination_travel_time
+        destination_node = self.__network.nodes[leg.destination.label]
+        route_plan.append_next_stop(leg.destination.label,
+                                    destination_arrival_time,
+                                    lon=destination_node["lon"],
+                                    lat=destination_node["lat"])
+
+        route_plan.assign_leg(leg)
+
+        return route_plan
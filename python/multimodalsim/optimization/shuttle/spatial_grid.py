@@ -0,0 +1,156 @@
+import logging
+import math
+from typing import Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SpatialGrid:
+    """The ``SpatialGrid`` class indexes points given by their longitude and
+    latitude in a regular grid of square cells, so that the points nearest
+    to a location are found by looking only at the cells around the
+    location.
+
+    The longitudes are multiplied by the cosine of the mean latitude of the
+    points (equirectangular projection), so that the distances are
+    approximately proportional to the distances on the ground within a
+    city-sized area. The points are identified by their position in the
+    lists of longitudes and latitudes, and they can be removed from the grid
+    (e.g., once a vehicle is no longer available).
+        Properties
+        ----------
+        cell_size: float
+            The side of the cells, in projected degrees.
+        nb_points: int
+            The number of points in the grid.
+    """
+
+    def __init__(self, lons: Iterable[float], lats: Iterable[float],
+                 cell_size: Optional[float] = None) -> None:
+        """
+        Parameters:
+            lons: list of float
+                The longitudes of the points.
+            lats: list of float
+                The latitudes of the points.
+            cell_size: float or None
+                The side of the cells, in projected degrees. If None, the
+                cell size is chosen so that there is about one point per cell.
+        """
+        lats = np.asarray(list(lats), dtype=float)
+        self.__scale = math.cos(math.radians(lats.mean())) \
+            if len(lats) > 0 else 1
+        self.__xs = np.asarray(list(lons), dtype=float) * self.__scale
+        self.__ys = lats
+
+        if cell_size is None:
+            cell_size = self.__get_default_cell_size()
+        self.__cell_size = cell_size
+
+        self.__point_indexes_by_cell = {}
+        for point_index, cell in enumerate(zip(
+                np.floor(self.__xs / cell_size).astype(int).tolist(),
+                np.floor(self.__ys / cell_size).astype(int).tolist())):
+            self.__point_indexes_by_cell.setdefault(cell, set()).add(
+                point_index)
+        self.__cell_by_point_index = {
+            point_index: cell for cell, point_indexes
+            in self.__point_indexes_by_cell.items()
+            for point_index in point_indexes}
+
+    @property
+    def cell_size(self) -> float:
+        return self.__cell_size
+
+    @property
+    def nb_points(self) -> int:
+        return len(self.__cell_by_point_index)
+
+    def remove(self, point_index: int) -> None:
+        """Remove the point at position point_index from the grid."""
+        cell = self.__cell_by_point_index.pop(point_index)
+        self.__point_indexes_by_cell[cell].discard(point_index)
+        if len(self.__point_indexes_by_cell[cell]) == 0:
+            del self.__point_indexes_by_cell[cell]
+
+    def find_nearest(self, lon: float, lat: float,
+                     nb_points: int = 1) -> list[int]:
+        """Find the points of the grid nearest to a location.
+
+        Input:
+          -lon: The longitude of the location.
+          -lat: The latitude of the location.
+          -nb_points: The number of points to find.
+
+        Output:
+          -point_indexes: The positions of the nb_points nearest points (or
+           of all the points if there are fewer), from the nearest to the
+           farthest. The points at the same distance are sorted by position.
+        """
+        if len(self.__point_indexes_by_cell) == 0 or nb_points <= 0:
+            return []
+
+        x = lon * self.__scale
+        y = lat
+        cell_x = math.floor(x / self.__cell_size)
+        cell_y = math.floor(y / self.__cell_size)
+
+        # The points of the rings 0 to ring are known. Any other point is at
+        # a distance greater than ring * cell_size from the location, so the
+        # search stops once nb_points known points are closer than that. If
+        # a ring has more cells than the grid has non-empty cells, all the
+        # points are compared instead.
+        point_indexes = []
+        ring = 0
+        while nb_points < self.nb_points \
+                and 8 * ring <= len(self.__point_indexes_by_cell):
+            point_indexes.extend(self.__get_ring_point_indexes(
+                cell_x, cell_y, ring))
+            if len(point_indexes) >= nb_points and np.count_nonzero(
+                    self.__get_distances(point_indexes, x, y)
+                    <= ring * self.__cell_size) >= nb_points:
+                break
+            ring += 1
+        else:
+            point_indexes = list(self.__cell_by_point_index)
+
+        point_indexes = np.sort(np.array(point_indexes, dtype=np.int64))
+        distances = self.__get_distances(point_indexes, x, y)
+        nearest = np.argsort(distances, kind="stable")[:nb_points]
+
+        return point_indexes[nearest].tolist()
+
+    def __get_default_cell_size(self):
+        if len(self.__xs) == 0:
+            return 1
+        area = (self.__xs.max() - self.__xs.min()) \
+            * (self.__ys.max() - self.__ys.min())
+        cell_size = math.sqrt(area / len(self.__xs))
+        if cell_size == 0:
+            cell_size = max(self.__xs.max() - self.__xs.min(),
+                            self.__ys.max() - self.__ys.min()) \
+                / len(self.__xs)
+        return cell_size if cell_size > 0 else 1
+
+    def __get_ring_point_indexes(self, cell_x, cell_y, ring):
+        if ring == 0:
+            cells = [(cell_x, cell_y)]
+        else:
+            cells = [(cell_x + offset, cell_y + side)
+                     for offset in range(-ring, ring + 1)
+                     for side in (-ring, ring)]
+            cells.extend((cell_x + side, cell_y + offset)
+                         for offset in range(-ring + 1, ring)
+                         for side in (-ring, ring))
+
+        point_indexes = []
+        for cell in cells:
+            point_indexes.extend(self.__point_indexes_by_cell.get(cell, ()))
+        return point_indexes
+
+    def __get_distances(self, point_indexes, x, y):
+        point_indexes = np.asarray(point_indexes, dtype=np.int64)
+        return np.hypot(self.__xs[point_indexes] - x,
+                        self.__ys[point_indexes] - y)
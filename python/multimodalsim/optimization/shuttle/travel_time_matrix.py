@@ -0,0 +1,198 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Iterable, Optional
+
+import networkx as nx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class TravelTimeMatrix:
+    """The ``TravelTimeMatrix`` class stores the travel times between the
+    locations of a network in a dense NumPy matrix, so that a travel time is
+    looked up in O(1) with its row and column indexes and the travel times
+    between many locations are looked up at once with array indexing.
+
+    The row (and column) of a location is given by the label -> index map.
+    The travel time from a location to itself is 0, and the travel time
+    between two locations that are not connected is infinite.
+
+    The matrix can be saved to a folder (travel_times.npy and labels.json)
+    and loaded from it as a read-only memory-mapped array, so that the
+    shortest travel times between all the locations of a network are
+    computed only once (see from_shortest_paths) and only the rows that are
+    used are read from the disk.
+        Properties
+        ----------
+        labels: list of str
+            The labels of the locations, in the order of the rows.
+        travel_times: NumPy array
+            The (nb_locations x nb_locations) matrix of the travel times.
+    """
+
+    # A network with fewer than nb_nodes ** 2 / DENSE_NETWORK_RATIO edges is
+    # considered sparse: its shortest paths are computed with one Dijkstra
+    # search per node rather than with the Floyd-Warshall algorithm.
+    DENSE_NETWORK_RATIO = 200
+
+    def __init__(self, labels: Iterable[str], travel_times: np.ndarray) \
+            -> None:
+        self.__labels = list(labels)
+        self.__index_by_label = {label: index
+                                 for index, label in enumerate(self.__labels)}
+        self.__travel_times = travel_times
+
+    @classmethod
+    def from_network(cls, network: nx.Graph, weight: str = "length",
+                     dtype: type = np.float32) -> 'TravelTimeMatrix':
+        """Create the matrix of the travel times along the edges of a
+        network, i.e., the travel time between two locations that are not
+        connected by an edge is infinite (see from_shortest_paths).
+
+        Input:
+          -network: A graph in which the nodes correspond to locations and
+           the edges have an attribute weight that represents the time it
+           takes to travel between the locations of the two associated
+           nodes.
+          -weight: The name of the edge attribute.
+          -dtype: The type of the elements of the matrix.
+
+        Output:
+          -travel_time_matrix: The TravelTimeMatrix of the network.
+        """
+        labels = list(network.nodes)
+        index_by_label = {label: index for index, label in enumerate(labels)}
+
+        travel_times = cls.__get_edge_travel_times(network, weight,
+                                                   index_by_label)
+
+        return cls(labels, travel_times.astype(dtype))
+
+    @classmethod
+    def from_shortest_paths(cls, network: nx.Graph, weight: str = "length",
+                            dtype: type = np.float32) -> 'TravelTimeMatrix':
+        """Create the matrix of the shortest travel times between all the
+        locations of a network, so that the network does not have to be
+        complete.
+
+        Input:
+          -network: A graph in which the nodes correspond to locations and
+           the edges have an attribute weight that represents the time it
+           takes to travel between the locations of the two associated
+           nodes.
+          -weight: The name of the edge attribute.
+          -dtype: The type of the elements of the matrix. The shortest
+           travel times are computed in double precision.
+
+        Output:
+          -travel_time_matrix: The TravelTimeMatrix of the network.
+        """
+        labels = list(network.nodes)
+        index_by_label = {label: index for index, label in enumerate(labels)}
+
+        if len(labels) ** 2 \
+                <= cls.DENSE_NETWORK_RATIO * network.number_of_edges():
+            travel_times = cls.__get_edge_travel_times(network, weight,
+                                                       index_by_label)
+            # Floyd-Warshall, one intermediate location at a time.
+            for index in range(len(labels)):
+                np.minimum(travel_times,
+                           travel_times[:, index, np.newaxis]
+                           + travel_times[np.newaxis, index, :],
+                           out=travel_times)
+        else:
+            travel_times = np.full((len(labels), len(labels)), np.inf)
+            for origin, travel_time_by_destination \
+                    in nx.all_pairs_dijkstra_path_length(network,
+                                                         weight=weight):
+                origin_index = index_by_label[origin]
+                for destination, travel_time \
+                        in travel_time_by_destination.items():
+                    travel_times[origin_index,
+                                 index_by_label[destination]] = travel_time
+
+        logger.debug("Shortest travel times computed between {} locations"
+                     .format(len(labels)))
+
+        return cls(labels, travel_times.astype(dtype))
+
+    @classmethod
+    def load(cls, folder: str) -> 'TravelTimeMatrix':
+        """Load a matrix saved in folder (see save). The travel times are
+        memory-mapped in read-only mode."""
+        with open(os.path.join(folder, "labels.json")) as f:
+            labels = json.load(f)
+        travel_times = np.load(os.path.join(folder, "travel_times.npy"),
+                               mmap_mode='r')
+
+        logger.debug("Travel time matrix loaded from {}".format(folder))
+
+        return cls(labels, travel_times)
+
+    def save(self, folder: str) -> None:
+        """Save the matrix in folder. The matrix is first written in a
+        temporary folder, which is then renamed, so that a matrix that is
+        only partially written is never loaded."""
+        parent_folder = os.path.dirname(os.path.abspath(folder))
+        os.makedirs(parent_folder, exist_ok=True)
+
+        temporary_folder = tempfile.mkdtemp(dir=parent_folder)
+        try:
+            with open(os.path.join(temporary_folder, "labels.json"),
+                      'w') as f:
+                json.dump(self.__labels, f)
+            np.save(os.path.join(temporary_folder, "travel_times.npy"),
+                    self.__travel_times)
+
+            os.replace(temporary_folder, folder)
+        except OSError:
+            # Another process may have saved the same matrix in the meantime.
+            shutil.rmtree(temporary_folder, ignore_errors=True)
+            if not os.path.isdir(folder):
+                raise
+
+        logger.debug("Travel time matrix saved to {}".format(folder))
+
+    @property
+    def labels(self) -> list[str]:
+        return self.__labels
+
+    @property
+    def travel_times(self) -> np.ndarray:
+        return self.__travel_times
+
+    def get_index(self, label: str) -> Optional[int]:
+        """Return the row of the location label, or None if the location is
+        not in the matrix."""
+        return self.__index_by_label.get(label)
+
+    def get_indexes(self, labels: Iterable[str]) -> np.ndarray:
+        """Return the rows of the locations labels in a NumPy array."""
+        return np.fromiter((self.__index_by_label[label] for label in labels),
+                           dtype=np.int64)
+
+    def get_travel_time(self, origin: str, destination: str) -> float:
+        """Return the travel time from the location origin to the location
+        destination."""
+        return float(self.__travel_times[self.__index_by_label[origin],
+                                         self.__index_by_label[destination]])
+
+    @staticmethod
+    def __get_edge_travel_times(network, weight, index_by_label):
+        travel_times = np.full((len(index_by_label), len(index_by_label)),
+                               np.inf)
+        np.fill_diagonal(travel_times, 0)
+        for origin, destination, travel_time in network.edges(data=weight):
+            origin_index = index_by_label[origin]
+            destination_index = index_by_label[destination]
+            travel_times[origin_index, destination_index] = min(
+                travel_time, travel_times[origin_index, destination_index])
+            if not network.is_directed():
+                travel_times[destination_index, origin_index] = \
+                    travel_times[origin_index, destination_index]
+
+        return travel_times
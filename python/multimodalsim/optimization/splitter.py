@@ -1,10 +1,10 @@
 import logging
+from collections import OrderedDict
 from typing import Any, Optional
 
-import networkx as nx
-
 import multimodalsim.simulator.request as request
 import multimodalsim.optimization.state as state_module
+from multimodalsim.optimization.connection_scan import ConnectionScan
 from multimodalsim.simulator.stop import LabelLocation
 
 logger = logging.getLogger(__name__)
@@ -19,6 +19,22 @@ class Splitter:
               state: 'state_module.State') -> list['request.Leg']:
         raise NotImplementedError('Splitter.split not implemented')
 
+    def split_batch(self, trips: list['request.Trip'],
+                    state: 'state_module.State') \
+            -> list[list['request.Leg']]:
+        """Split several trips released at the same time. By default, each
+        trip is split separately, but a splitter can override this method to
+        share the work between the trips.
+
+        Input:
+          -trips: The trips to split.
+          -state: The state (or the environment) at the release time.
+
+        Output:
+          -legs_by_trip: The legs of each trip, in the same order as trips.
+        """
+        return [self.split(trip, state) for trip in trips]
+
 
 class OneLegSplitter(Splitter):
 
@@ -35,85 +51,208 @@ class OneLegSplitter(Splitter):
         return [leg]
 
 
+class SplitCache:
+    """The ``SplitCache`` class is a least recently used (LRU) cache of the
+    paths found by a splitter. A path is stored with the ready time and the
+    due time of the search that found it, and it is keyed by the origin, the
+    destination and the time bucket of the ready time, i.e., the ready time
+    divided by time_bucket and rounded down.
+        Properties
+        ----------
+        max_size: int
+            Maximum number of paths in the cache. The least recently used
+            path is removed when the cache is full. If max_size is 0, nothing
+            is cached.
+        time_bucket: float
+            Width of the time buckets of the ready times.
+        hits: int
+            Number of times a cached path was used.
+        misses: int
+            Number of times no cached path could be used.
+    """
+
+    def __init__(self, max_size: int = 1024,
+                 time_bucket: float = 300) -> None:
+        self.__max_size = max_size
+        self.__time_bucket = time_bucket
+        self.__entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_size(self) -> int:
+        return self.__max_size
+
+    @property
+    def time_bucket(self) -> float:
+        return self.__time_bucket
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get(self, origin_stop_id: str, destination_stop_id: str,
+            ready_time: float) -> Optional[tuple[float, float, list[tuple]]]:
+        """Return the (ready_time, due_time, path) entry of the bucket of
+        ready_time, or None if there is no such entry."""
+        key = self.__get_key(origin_stop_id, destination_stop_id, ready_time)
+        entry = self.__entries.get(key)
+        if entry is not None:
+            self.__entries.move_to_end(key)
+        return entry
+
+    def put(self, origin_stop_id: str, destination_stop_id: str,
+            ready_time: float, due_time: float, path: list[tuple]) -> None:
+        if self.__max_size <= 0:
+            return
+
+        key = self.__get_key(origin_stop_id, destination_stop_id, ready_time)
+        self.__entries[key] = (ready_time, due_time, path)
+        self.__entries.move_to_end(key)
+        if len(self.__entries) > self.__max_size:
+            self.__entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.__entries.clear()
+
+    def __get_key(self, origin_stop_id, destination_stop_id, ready_time):
+        return origin_stop_id, destination_stop_id, \
+            int(ready_time // self.__time_bucket)
+
+
 class MultimodalSplitter(Splitter):
+    """The ``MultimodalSplitter`` class splits a trip into the legs of the
+    public transit journey that arrives the earliest at its destination.
+
+    The paths found are kept in a ``SplitCache``. A cached path found for a
+    ready time r0 is reused for a trip of the same origin and destination
+    whose ready time r1 is in the same time bucket if r1 >= r0 and if the
+    first vehicle of the path can still be boarded at r1. In that case, the
+    path arrives as early as a new search would, so the legs are the same
+    (up to the choice between paths that arrive at the same time).
+        Properties
+        ----------
+        network_graph: networkx.DiGraph
+            The network graph built by ``GTFSReader``. Setting a new graph
+            clears the cache.
+        split_cache: SplitCache
+            The cache of the paths found.
+    """
 
     def __init__(self, network_graph: Any,
                  available_connections: Optional[dict] = None,
-                 freeze_interval: float = 5) -> None:
+                 freeze_interval: float = 5, cache_size: int = 1024,
+                 cache_time_bucket: float = 300) -> None:
         super().__init__()
-        self.__network_graph = network_graph
         self.__available_connections = available_connections \
-            if available_connections is not None else []
+            if available_connections is not None else {}
         self.__freeze_interval = freeze_interval
         self.__trip = None
         self.__state = None
 
-    def split(self, trip: 'request.Trip',
-              state: 'state_module.State') -> list['request.Leg']:
-
-        self.__state = state
-        self.__trip = trip
+        self.__split_cache = SplitCache(cache_size, cache_time_bucket)
+        self.network_graph = network_graph
 
-        optimal_legs = []
+    @property
+    def network_graph(self) -> Any:
+        return self.__network_graph
 
-        potential_source_nodes = self.__find_potential_source_nodes(trip)
-        potential_target_nodes = self.__find_potential_target_nodes(trip)
-
-        if len(potential_source_nodes) != 0 \
-                and len(potential_target_nodes) != 0:
-            feasible_paths = self.__find_feasible_paths(potential_source_nodes,
-                                                        potential_target_nodes)
-            if len(feasible_paths) > 0:
-                optimal_path = min(feasible_paths, key=lambda x: x[-1][2])
-                optimal_legs = self.__get_legs_from_path(optimal_path)
-
-        self.__state = None
-        self.__trip = None
-
-        return optimal_legs
-
-    def __find_potential_source_nodes(self, trip):
-        potential_source_nodes = []
-        for node in self.__network_graph.nodes():
-            if node[0] == trip.origin.label and node[3] >= trip.ready_time:
-                potential_source_nodes.append(node)
-
-        return potential_source_nodes
-
-    def __find_potential_target_nodes(self, trip):
-        potential_target_nodes = []
-        for node in self.__network_graph.nodes():
-            if node[0] == trip.destination.label and node[2] <= trip.due_time:
-                potential_target_nodes.append(node)
-
-        return potential_target_nodes
+    @network_graph.setter
+    def network_graph(self, network_graph: Any) -> None:
+        self.__network_graph = network_graph
+        self.__connection_scan = ConnectionScan(
+            network_graph.nodes(), self.__available_connections,
+            self.__freeze_interval)
+        self.__split_cache.clear()
 
-    def __find_feasible_paths(self, potential_source_nodes,
-                              potential_target_nodes):
+    @property
+    def split_cache(self) -> SplitCache:
+        return self.__split_cache
 
-        logger.debug("__find_feasible_paths")
+    def split(self, trip: 'request.Trip',
+              state: 'state_module.State') -> list['request.Leg']:
+        return self.split_batch([trip], state)[0]
 
-        distance_dict, path_dict = nx.multi_source_dijkstra(
-            self.__network_graph, set(potential_source_nodes))
-        feasible_paths = []
-        for node, distance in distance_dict.items():
-            if node in potential_target_nodes \
-                    and self.__check_path_feasibility(path_dict[node]):
-                feasible_paths.append(path_dict[node])
+    def split_batch(self, trips: list['request.Trip'],
+                    state: 'state_module.State') \
+            -> list[list['request.Leg']]:
+        """Split several trips at once. The trips that have the same origin
+        and the same ready time are split with a single search."""
 
-        return feasible_paths
+        self.__state = state
 
-    def __check_path_feasibility(self, path):
-        path_feasible = True
+        path_by_trip = {}
+        trips_by_origin_and_ready_time = {}
+        for trip in trips:
+            cached_path = self.__get_cached_path(trip)
+            if cached_path is not None:
+                path_by_trip[trip] = cached_path
+            else:
+                trips_by_origin_and_ready_time.setdefault(
+                    (trip.origin.label, trip.ready_time), []).append(trip)
+
+        for (origin_stop_id, ready_time), origin_trips \
+                in trips_by_origin_and_ready_time.items():
+            due_time_by_destination_stop_id = {}
+            for trip in origin_trips:
+                destination_stop_id = trip.destination.label
+                due_time_by_destination_stop_id[destination_stop_id] = max(
+                    trip.due_time, due_time_by_destination_stop_id.get(
+                        destination_stop_id, trip.due_time))
+
+            path_by_destination_stop_id = \
+                self.__connection_scan.find_earliest_arrival_paths(
+                    origin_stop_id, due_time_by_destination_stop_id,
+                    ready_time)
+
+            for destination_stop_id, path \
+                    in path_by_destination_stop_id.items():
+                self.__split_cache.put(
+                    origin_stop_id, destination_stop_id, ready_time,
+                    due_time_by_destination_stop_id[destination_stop_id],
+                    path)
+            for trip in origin_trips:
+                path_by_trip[trip] = path_by_destination_stop_id[
+                    trip.destination.label]
+
+        legs_by_trip = []
+        for trip in trips:
+            self.__trip = trip
+            optimal_path = path_by_trip[trip]
+            legs_by_trip.append(
+                self.__get_legs_from_path(optimal_path)
+                if len(optimal_path) > 0
+                and optimal_path[-1][2] <= trip.due_time else [])
 
-        min_arrival_time = 0
-        for node in path:
-            if node[3] - min_arrival_time < self.__freeze_interval:
-                path_feasible = False
-            if node[2] > min_arrival_time:
-                min_arrival_time = node[2]
+        self.__state = None
+        self.__trip = None
 
-        return path_feasible
+        return legs_by_trip
+
+    def __get_cached_path(self, trip):
+        entry = self.__split_cache.get(trip.origin.label,
+                                       trip.destination.label,
+                                       trip.ready_time)
+        cached_path = None
+        if entry is not None and trip.ready_time >= entry[0]:
+            ready_time, due_time, path = entry
+            if len(path) == 0:
+                # No path arrives before due_time, so none arrives before an
+                # earlier due time either.
+                if trip.due_time <= due_time:
+                    cached_path = path
+            else:
+                boarding_time = trip.ready_time \
+                    if path[0][0] == trip.origin.label \
+                    else trip.ready_time + self.__freeze_interval
+                if path[0][3] >= boarding_time:
+                    cached_path = path
+
+        if cached_path is not None:
+            self.__split_cache.hits += 1
+        else:
+            self.__split_cache.misses += 1
+
+        return cached_path
 
     def __get_legs_from_path(self, path):
 
@@ -39,19 +39,38 @@ class State:
                 next_legs: list of Leg objects
                     A deep copy of the first next leg of each unassigned trip
                     of the environment.
+                modified_trips: list of Trip objects
+                    The trips of the state that were modified since the
+                    previous optimization.
+                modified_legs: list of Leg objects
+                    The legs of the trips of the state that were modified
+                    since the previous optimization.
+                modified_routes: list of Route objects
+                    The routes of the state that were modified (or whose
+                    vehicle was modified) since the previous optimization.
+                frozen_vehicle_ids: set of ids (string)
+                    The ids of the vehicles whose stops were moved by
+                    freeze_routes_for_time_interval. Since
+                    unfreeze_routes_for_time_interval does not always restore
+                    the routes exactly, the copies of these vehicles are not
+                    reused by the next state.
                 """
 
         self.current_time = env_deep_copy.current_time
-        self.trips = env_deep_copy.trips
-        self.assigned_trips = env_deep_copy.assigned_trips
-        self.non_assigned_trips = env_deep_copy.non_assigned_trips
-        self.vehicles = env_deep_copy.vehicles
+        self.trips = list(env_deep_copy.trips)
+        self.assigned_trips = list(env_deep_copy.assigned_trips)
+        self.non_assigned_trips = list(env_deep_copy.non_assigned_trips)
+        self.vehicles = list(env_deep_copy.vehicles)
         self.route_by_vehicle_id = \
             {veh.id: env_deep_copy.route_by_vehicle_id[veh.id]
              for veh in self.vehicles}
         self.next_legs = self.__get_next_legs(self.trips)
         self.non_assigned_next_legs = self.__get_next_legs(
             self.non_assigned_trips)
+        self.modified_trips = env_deep_copy.modified_trips
+        self.modified_legs = env_deep_copy.modified_legs
+        self.modified_routes = env_deep_copy.modified_routes
+        self.frozen_vehicle_ids = set()
 
     def get_trip_by_id(self, trip_id: str | int) -> 'request.Trip':
         found_trip = None
@@ -114,8 +133,13 @@ class State:
 
         for vehicle in self.vehicles:
             route = self.route_by_vehicle_id[vehicle.id]
+            nb_next_stops = len(route.next_stops)
+            current_stop = route.current_stop
             self.__move_current_stop_backward(route)
             self.__move_next_stops_backward(route)
+            if len(route.next_stops) != nb_next_stops \
+                    or route.current_stop is not current_stop:
+                self.frozen_vehicle_ids.add(vehicle.id)
 
     def __move_current_stop_backward(self, route):
 
@@ -0,0 +1,707 @@
+import gc
+import logging
+import pickle
+from contextlib import contextmanager
+from typing import Optional, Any
+
+import numpy as np
+
+import multimodalsim.optimization.optimization as optimization_module
+import multimodalsim.optimization.state as state_module
+import multimodalsim.simulator.request as request
+import multimodalsim.simulator.stop as stop_module
+import multimodalsim.simulator.vehicle as vehicle_module
+from multimodalsim.state_machine.status import PassengerStatus, VehicleStatus
+
+logger = logging.getLogger(__name__)
+
+
+class StateSerializer:
+    """The ``StateSerializer`` class converts a State (or an
+    OptimizationResult) to a compact binary representation and back.
+
+    The objects of the state (trips, legs, vehicles, routes, stops and
+    locations) are stored in tables with one column per attribute:
+        - numeric attributes (e.g., times) are stored in float64 arrays;
+        - ids, names, modes and labels are interned, i.e., stored once in a
+          list of values and referred to by their position in that list;
+        - references to other objects (e.g., Leg.trip) are stored as the
+          position of the object in its table (-1 for None);
+        - lists of references (e.g., Route.next_stops) are stored as a flat
+          array of positions and an array of offsets;
+        - the status of the state machine of a trip or a vehicle is stored
+          as a small int.
+    Each object is stored only once, so the structure of the object graph
+    (shared references between trips, legs, stops and routes) is preserved.
+
+    Attributes that do not fit in these columns (e.g., the polylines of a
+    vehicle, or locations that are neither LabelLocation nor
+    TimeCoordinatesLocation) are pickled as is. Trips, legs, vehicles, routes
+    and stops are rebuilt as instances of the base classes.
+
+    The binary representation does not depend on the simulation, so it can
+    also be used to save a state to a file (e.g., for checkpointing).
+    """
+
+    FORMAT_VERSION = 1
+
+    def serialize_state(self, state: 'state_module.State') -> bytes:
+        with _gc_paused():
+            encoder = _Encoder()
+            payload = {"state": encoder.encode_state(state)}
+            return encoder.dumps(payload)
+
+    def deserialize_state(self, data: bytes) -> 'state_module.State':
+        with _gc_paused():
+            payload, decoder = _Decoder.loads(data)
+            return decoder.decode_state(payload["state"])
+
+    def serialize_optimization_result(
+            self, optimization_result:
+            Optional['optimization_module.OptimizationResult']) -> bytes:
+        with _gc_paused():
+            encoder = _Encoder()
+            if optimization_result is None:
+                payload = None
+            else:
+                state = optimization_result.state
+                payload = {
+                    "state": encoder.encode_state(state)
+                    if state is not None else None,
+                    "modified_requests": encoder.encode_trip_list(
+                        optimization_result.modified_requests),
+                    "modified_vehicles": encoder.encode_vehicle_list(
+                        optimization_result.modified_vehicles)
+                }
+            return encoder.dumps(payload)
+
+    def deserialize_optimization_result(
+            self, data: bytes) \
+            -> Optional['optimization_module.OptimizationResult']:
+        with _gc_paused():
+            payload, decoder = _Decoder.loads(data)
+            if payload is None:
+                return None
+
+            state = decoder.decode_state(payload["state"]) \
+                if payload["state"] is not None else None
+            modified_requests = decoder.decode_trip_list(
+                payload["modified_requests"])
+            modified_vehicles = decoder.decode_vehicle_list(
+                payload["modified_vehicles"])
+
+        return optimization_module.OptimizationResult(
+            state, modified_requests, modified_vehicles)
+
+
+@contextmanager
+def _gc_paused():
+    """Pause the cyclic garbage collector. Rebuilding a state creates a
+    large number of objects and no garbage, so the collections triggered
+    meanwhile only add time."""
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+# Types of the values of a numeric column.
+_NONE = 0
+_INT = 1
+_FLOAT = 2
+_OBJECT = 3
+
+# Kinds of locations.
+_LABEL_LOCATION = 0
+_TIME_COORDINATES_LOCATION = 1
+_OTHER_LOCATION = 2
+
+# Largest integer that a float64 represents exactly.
+_MAX_EXACT_INT = 2 ** 53
+
+# Kinds of columns: numbers (or None), positions (in a table, in the list of
+# interned values or in the list of pickled objects), small ints and lists of
+# positions.
+_NUMBER = 0
+_POSITION = 1
+_SMALL_INT = 2
+_POSITION_LIST = 3
+
+_REQUEST_SCHEMA = {
+    "id": _POSITION, "origin": _POSITION, "destination": _POSITION,
+    "nb_passengers": _NUMBER, "release_time": _NUMBER, "ready_time": _NUMBER,
+    "due_time": _NUMBER}
+
+_SCHEMAS = {
+    "location": {"kind": _SMALL_INT, "label": _POSITION, "lon": _NUMBER,
+                 "lat": _NUMBER, "time": _NUMBER},
+    "trip": {**_REQUEST_SCHEMA, "name": _POSITION, "status": _SMALL_INT,
+             "previous_legs": _POSITION_LIST, "current_leg": _POSITION,
+             "next_legs": _POSITION_LIST},
+    "leg": {**_REQUEST_SCHEMA, "trip": _POSITION,
+            "assigned_vehicle": _POSITION, "boarding_time": _NUMBER,
+            "alighting_time": _NUMBER},
+    "vehicle": {"id": _POSITION, "start_time": _NUMBER, "end_time": _NUMBER,
+                "start_stop": _POSITION, "capacity": _NUMBER,
+                "release_time": _NUMBER, "mode": _POSITION,
+                "reusable": _POSITION, "position": _POSITION,
+                "polylines": _POSITION, "status": _SMALL_INT},
+    "stop": {"arrival_time": _NUMBER, "departure_time": _NUMBER,
+             "min_departure_time": _NUMBER, "cumulative_distance": _NUMBER,
+             "location": _POSITION, "passengers_to_board": _POSITION_LIST,
+             "boarding_passengers": _POSITION_LIST,
+             "boarded_passengers": _POSITION_LIST,
+             "passengers_to_alight": _POSITION_LIST,
+             "alighting_passengers": _POSITION_LIST,
+             "alighted_passengers": _POSITION_LIST},
+    "route": {"vehicle": _POSITION, "current_stop": _POSITION,
+              "next_stops": _POSITION_LIST, "previous_stops": _POSITION_LIST,
+              "onboard_legs": _POSITION_LIST, "assigned_legs": _POSITION_LIST,
+              "alighted_legs": _POSITION_LIST}
+}
+
+_STATE_LIST_ATTRIBUTES = {
+    "trips": "trip", "assigned_trips": "trip", "non_assigned_trips": "trip",
+    "vehicles": "vehicle", "next_legs": "leg",
+    "non_assigned_next_legs": "leg", "modified_trips": "trip",
+    "modified_legs": "leg", "modified_routes": "route"}
+
+
+class _Table:
+    """Objects of one type, in the order in which they were added, with the
+    position of each of them."""
+
+    def __init__(self):
+        self.objects = []
+        self.nb_encoded = 0
+        self.__position_by_object_id = {}
+
+    def position(self, obj):
+        if obj is None:
+            return -1
+
+        position = self.__position_by_object_id.get(id(obj))
+        if position is None:
+            position = len(self.objects)
+            self.__position_by_object_id[id(obj)] = position
+            self.objects.append(obj)
+        return position
+
+    def has_objects_to_encode(self):
+        return self.nb_encoded < len(self.objects)
+
+
+class _Encoder:
+
+    def __init__(self):
+        self.__values = []
+        self.__value_position_by_key = {}
+        self.__objects = []
+
+        self.__tables = {name: _Table() for name in _SCHEMAS}
+        self.__columns = {}
+
+    def encode_state(self, state: 'state_module.State') -> dict:
+        encoded_state = {
+            "current_time": state.current_time,
+            "route_vehicle_ids": self.__intern_list(
+                state.route_by_vehicle_id.keys()),
+            "routes": self.__positions("route",
+                                       state.route_by_vehicle_id.values())
+        }
+
+        for attribute, table_name in _STATE_LIST_ATTRIBUTES.items():
+            encoded_state[attribute] = self.__positions(
+                table_name, getattr(state, attribute))
+
+        # Attributes added to the state by the dispatcher, if any.
+        extra_attributes = {
+            attribute: value for attribute, value in state.__dict__.items()
+            if attribute not in _STATE_LIST_ATTRIBUTES
+            and attribute not in ("current_time", "route_by_vehicle_id")}
+        encoded_state["extra_attributes"] = extra_attributes
+
+        return encoded_state
+
+    def encode_trip_list(self, trips: list['request.Trip']) -> np.ndarray:
+        return self.__positions("trip", trips)
+
+    def encode_vehicle_list(
+            self, vehicles: list['vehicle_module.Vehicle']) -> np.ndarray:
+        return self.__positions("vehicle", vehicles)
+
+    def dumps(self, payload: Optional[dict]) -> bytes:
+        self.__encode_tables()
+
+        data = {
+            "version": StateSerializer.FORMAT_VERSION,
+            "values": self.__values,
+            "objects": self.__objects,
+            "tables": self.__columns,
+            "payload": payload
+        }
+
+        return pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def __encode_tables(self):
+        encode_functions = {
+            "location": self.__encode_location,
+            "trip": self.__encode_trip,
+            "leg": self.__encode_leg,
+            "vehicle": self.__encode_vehicle,
+            "stop": self.__encode_stop,
+            "route": self.__encode_route
+        }
+        rows_by_table = {name: [] for name in self.__tables}
+
+        # Encoding an object may add new objects to the tables, so the tables
+        # are traversed until every object has been encoded.
+        objects_to_encode = True
+        while objects_to_encode:
+            objects_to_encode = False
+            for name, table in self.__tables.items():
+                while table.has_objects_to_encode():
+                    obj = table.objects[table.nb_encoded]
+                    rows_by_table[name].append(encode_functions[name](obj))
+                    table.nb_encoded += 1
+                    objects_to_encode = True
+
+        for name, rows in rows_by_table.items():
+            self.__columns[name] = self.__rows_to_columns(_SCHEMAS[name],
+                                                          rows)
+
+    def __encode_location(self, location):
+        if type(location) is stop_module.LabelLocation:
+            row = {"kind": _LABEL_LOCATION,
+                   "label": self.__intern(location.label),
+                   "lon": location.lon, "lat": location.lat, "time": None}
+        elif type(location) is stop_module.TimeCoordinatesLocation:
+            row = {"kind": _TIME_COORDINATES_LOCATION, "label": -1,
+                   "lon": location.lon, "lat": location.lat,
+                   "time": location.time}
+        else:
+            row = {"kind": _OTHER_LOCATION,
+                   "label": self.__add_object(location),
+                   "lon": None, "lat": None, "time": None}
+        return row
+
+    def __encode_trip(self, trip):
+        row = self.__encode_request(trip)
+        row.update({
+            "name": self.__intern(trip.name),
+            "status": trip.status.value,
+            "previous_legs": self.__positions_list("leg", trip.previous_legs),
+            "current_leg": self.__position("leg", trip.current_leg),
+            "next_legs": self.__positions_list("leg", trip.next_legs)
+        })
+        return row
+
+    def __encode_leg(self, leg):
+        row = self.__encode_request(leg)
+        row.update({
+            "trip": self.__position("trip", leg.trip),
+            "assigned_vehicle": self.__position("vehicle",
+                                                leg.assigned_vehicle),
+            "boarding_time": leg.boarding_time,
+            "alighting_time": leg.alighting_time
+        })
+        return row
+
+    def __encode_request(self, leg_or_trip):
+        return {
+            "id": self.__intern(leg_or_trip.id),
+            "origin": self.__position("location", leg_or_trip.origin),
+            "destination": self.__position("location",
+                                           leg_or_trip.destination),
+            "nb_passengers": leg_or_trip.nb_passengers,
+            "release_time": leg_or_trip.release_time,
+            "ready_time": leg_or_trip.ready_time,
+            "due_time": leg_or_trip.due_time
+        }
+
+    def __encode_vehicle(self, vehicle):
+        return {
+            "id": self.__intern(vehicle.id),
+            "start_time": vehicle.start_time,
+            "end_time": vehicle.end_time,
+            "start_stop": self.__position("stop", vehicle.start_stop),
+            "capacity": vehicle.capacity,
+            "release_time": vehicle.release_time,
+            "mode": self.__intern(vehicle.mode),
+            "reusable": self.__intern(vehicle.reusable),
+            "position": self.__position("location", vehicle.position),
+            "polylines": self.__add_object(vehicle.polylines),
+            "status": vehicle.status.value
+        }
+
+    def __encode_stop(self, stop):
+        return {
+            "arrival_time": stop.arrival_time,
+            "departure_time": stop.departure_time,
+            "min_departure_time": stop.min_departure_time,
+            "cumulative_distance": stop.cumulative_distance,
+            "location": self.__position("location", stop.location),
+            "passengers_to_board": self.__positions_list(
+                "trip", stop.passengers_to_board),
+            "boarding_passengers": self.__positions_list(
+                "trip", stop.boarding_passengers),
+            "boarded_passengers": self.__positions_list(
+                "trip", stop.boarded_passengers),
+            "passengers_to_alight": self.__positions_list(
+                "trip", stop.passengers_to_alight),
+            "alighting_passengers": self.__positions_list(
+                "trip", stop.alighting_passengers),
+            "alighted_passengers": self.__positions_list(
+                "trip", stop.alighted_passengers)
+        }
+
+    def __encode_route(self, route):
+        return {
+            "vehicle": self.__position("vehicle", route.vehicle),
+            "current_stop": self.__position("stop", route.current_stop),
+            "next_stops": self.__positions_list("stop", route.next_stops),
+            "previous_stops": self.__positions_list("stop",
+                                                    route.previous_stops),
+            "onboard_legs": self.__positions_list("leg", route.onboard_legs),
+            "assigned_legs": self.__positions_list("leg",
+                                                   route.assigned_legs),
+            "alighted_legs": self.__positions_list("leg",
+                                                   route.alighted_legs)
+        }
+
+    def __rows_to_columns(self, schema, rows):
+        columns = {}
+        for attribute, column_kind in schema.items():
+            values = [row[attribute] for row in rows]
+            if column_kind == _NUMBER:
+                columns[attribute] = self.__encode_numbers(values)
+            elif column_kind == _POSITION:
+                columns[attribute] = np.array(values, dtype=np.int64)
+            elif column_kind == _SMALL_INT:
+                columns[attribute] = np.array(values, dtype=np.int8)
+            else:
+                columns[attribute] = self.__encode_lists(values)
+
+        return columns
+
+    def __encode_numbers(self, values):
+        """Encode a list of numbers (or None) as an array of floats and an
+        array of types, so that ints are decoded as ints."""
+        numbers = []
+        types = []
+        for value in values:
+            value_type = type(value)
+            if value_type is float:
+                numbers.append(value)
+                types.append(_FLOAT)
+            elif value_type is int and abs(value) <= _MAX_EXACT_INT:
+                numbers.append(value)
+                types.append(_INT)
+            elif value is None:
+                numbers.append(0)
+                types.append(_NONE)
+            else:
+                numbers.append(self.__add_object(value))
+                types.append(_OBJECT)
+
+        return np.array(numbers, dtype=np.float64), \
+            np.array(types, dtype=np.int8)
+
+    @staticmethod
+    def __encode_lists(lists):
+        offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(positions) for positions in lists])
+        positions = np.fromiter(
+            (position for positions in lists for position in positions),
+            dtype=np.int64, count=offsets[-1])
+        return offsets, positions
+
+    def __position(self, table_name, obj):
+        return self.__tables[table_name].position(obj)
+
+    def __positions_list(self, table_name, objects):
+        table = self.__tables[table_name]
+        return [table.position(obj) for obj in objects]
+
+    def __positions(self, table_name, objects):
+        return np.array(self.__positions_list(table_name, objects),
+                        dtype=np.int64)
+
+    def __intern(self, value):
+        if value is None:
+            return -1
+
+        key = (type(value), value)
+        position = self.__value_position_by_key.get(key)
+        if position is None:
+            position = len(self.__values)
+            self.__value_position_by_key[key] = position
+            self.__values.append(value)
+        return position
+
+    def __intern_list(self, values):
+        return np.array([self.__intern(value) for value in values],
+                        dtype=np.int64)
+
+    def __add_object(self, obj):
+        self.__objects.append(obj)
+        return len(self.__objects) - 1
+
+
+class _Decoder:
+
+    def __init__(self, values: list, objects: list,
+                 columns_by_table: dict[str, dict]) -> None:
+        self.__values = values
+        self.__objects = objects
+        self.__columns_by_table = columns_by_table
+
+        # The tables are decoded in an order such that the objects are
+        # created before the objects that refer to them. The references that
+        # form cycles (from trips to legs and from stops to trips) are set
+        # once all the objects have been created.
+        self.__objects_by_table = {}
+        self.__objects_by_table["location"] = self.__create_locations()
+        self.__objects_by_table["stop"] = self.__create_stops()
+        self.__objects_by_table["vehicle"] = self.__create_vehicles()
+        self.__objects_by_table["trip"] = self.__create_trips()
+        self.__objects_by_table["leg"] = self.__create_legs()
+        self.__fill_trips()
+        self.__fill_stops()
+        self.__objects_by_table["route"] = self.__create_routes()
+
+    @classmethod
+    def loads(cls, data: bytes) -> tuple[Any, '_Decoder']:
+        data = pickle.loads(data)
+        if data["version"] != StateSerializer.FORMAT_VERSION:
+            raise ValueError("Unsupported serialization format version: "
+                             "{}.".format(data["version"]))
+
+        decoder = cls(data["values"], data["objects"], data["tables"])
+        return data["payload"], decoder
+
+    def decode_state(self, encoded_state: dict) -> 'state_module.State':
+        state = state_module.State.__new__(state_module.State)
+        state.current_time = encoded_state["current_time"]
+
+        for attribute, table_name in _STATE_LIST_ATTRIBUTES.items():
+            setattr(state, attribute, self.__objects_at(
+                table_name, encoded_state[attribute]))
+
+        vehicle_ids = self.__values_at(encoded_state["route_vehicle_ids"])
+        routes = self.__objects_at("route", encoded_state["routes"])
+        state.route_by_vehicle_id = dict(zip(vehicle_ids, routes))
+
+        for attribute, value in encoded_state["extra_attributes"].items():
+            setattr(state, attribute, value)
+
+        return state
+
+    def decode_trip_list(self,
+                         positions: np.ndarray) -> list['request.Trip']:
+        return self.__objects_at("trip", positions)
+
+    def decode_vehicle_list(
+            self, positions: np.ndarray) -> list['vehicle_module.Vehicle']:
+        return self.__objects_at("vehicle", positions)
+
+    def __create_locations(self):
+        columns = self.__columns_by_table["location"]
+        lons = self.__decode_numbers(columns["lon"])
+        lats = self.__decode_numbers(columns["lat"])
+        times = self.__decode_numbers(columns["time"])
+
+        locations = []
+        for i, (kind, label) in enumerate(zip(columns["kind"].tolist(),
+                                              columns["label"].tolist())):
+            if kind == _LABEL_LOCATION:
+                location = stop_module.LabelLocation(self.__values[label],
+                                                     lons[i], lats[i])
+            elif kind == _TIME_COORDINATES_LOCATION:
+                location = stop_module.TimeCoordinatesLocation(
+                    times[i], lons[i], lats[i])
+            else:
+                location = self.__objects[label]
+            locations.append(location)
+
+        return locations
+
+    def __create_stops(self):
+        columns = self.__columns_by_table["stop"]
+        arrival_times = self.__decode_numbers(columns["arrival_time"])
+        departure_times = self.__decode_numbers(columns["departure_time"])
+        min_departure_times = self.__decode_numbers(
+            columns["min_departure_time"])
+        cumulative_distances = self.__decode_numbers(
+            columns["cumulative_distance"])
+        locations = self.__objects_at("location", columns["location"])
+
+        return [stop_module.Stop(arrival_time, departure_time, location,
+                                 cumulative_distance, min_departure_time)
+                for arrival_time, departure_time, location,
+                cumulative_distance, min_departure_time
+                in zip(arrival_times, departure_times, locations,
+                       cumulative_distances, min_departure_times)]
+
+    def __create_vehicles(self):
+        columns = self.__columns_by_table["vehicle"]
+        ids = self.__values_at(columns["id"])
+        start_times = self.__decode_numbers(columns["start_time"])
+        end_times = self.__decode_numbers(columns["end_time"])
+        start_stops = self.__objects_at("stop", columns["start_stop"])
+        capacities = self.__decode_numbers(columns["capacity"])
+        release_times = self.__decode_numbers(columns["release_time"])
+        modes = self.__values_at(columns["mode"])
+        reusables = self.__values_at(columns["reusable"])
+        positions = self.__objects_at("location", columns["position"])
+        polylines = [self.__objects[i] for i in columns["polylines"].tolist()]
+        statuses = columns["status"].tolist()
+
+        vehicles = []
+        for i in range(len(ids)):
+            vehicle = vehicle_module.Vehicle(
+                ids[i], start_times[i], start_stops[i], capacities[i],
+                release_times[i], end_times[i], modes[i], reusables[i])
+            vehicle.position = positions[i]
+            vehicle.polylines = polylines[i]
+            vehicle.state_machine.restore_current_state(
+                VehicleStatus(statuses[i]))
+            vehicles.append(vehicle)
+
+        return vehicles
+
+    def __create_trips(self):
+        columns = self.__columns_by_table["trip"]
+        request_attributes = self.__decode_request_attributes(columns)
+        names = self.__values_at(columns["name"])
+        statuses = columns["status"].tolist()
+
+        trips = []
+        for i, attributes in enumerate(request_attributes):
+            trip = request.Trip(*attributes, names[i])
+            trip.state_machine.restore_current_state(
+                PassengerStatus(statuses[i]))
+            trips.append(trip)
+
+        return trips
+
+    def __create_legs(self):
+        columns = self.__columns_by_table["leg"]
+        request_attributes = self.__decode_request_attributes(columns)
+        trips = self.__objects_at("trip", columns["trip"])
+        assigned_vehicles = self.__objects_at("vehicle",
+                                              columns["assigned_vehicle"])
+        boarding_times = self.__decode_numbers(columns["boarding_time"])
+        alighting_times = self.__decode_numbers(columns["alighting_time"])
+
+        legs = []
+        for i, attributes in enumerate(request_attributes):
+            leg = request.Leg(*attributes, trips[i])
+            leg.assigned_vehicle = assigned_vehicles[i]
+            leg.boarding_time = boarding_times[i]
+            leg.alighting_time = alighting_times[i]
+            legs.append(leg)
+
+        return legs
+
+    def __fill_trips(self):
+        columns = self.__columns_by_table["trip"]
+        previous_legs = self.__decode_lists("leg", columns["previous_legs"])
+        current_legs = self.__objects_at("leg", columns["current_leg"])
+        next_legs = self.__decode_lists("leg", columns["next_legs"])
+
+        for i, trip in enumerate(self.__objects_by_table["trip"]):
+            trip.previous_legs.extend(previous_legs[i])
+            trip.current_leg = current_legs[i]
+            trip.next_legs = next_legs[i]
+
+    def __fill_stops(self):
+        columns = self.__columns_by_table["stop"]
+        passengers_to_board = self.__decode_lists(
+            "trip", columns["passengers_to_board"])
+        boarding_passengers = self.__decode_lists(
+            "trip", columns["boarding_passengers"])
+        boarded_passengers = self.__decode_lists(
+            "trip", columns["boarded_passengers"])
+        passengers_to_alight = self.__decode_lists(
+            "trip", columns["passengers_to_alight"])
+        alighting_passengers = self.__decode_lists(
+            "trip", columns["alighting_passengers"])
+        alighted_passengers = self.__decode_lists(
+            "trip", columns["alighted_passengers"])
+
+        for i, stop in enumerate(self.__objects_by_table["stop"]):
+            stop.passengers_to_board = passengers_to_board[i]
+            stop.boarding_passengers = boarding_passengers[i]
+            stop.boarded_passengers = boarded_passengers[i]
+            stop.passengers_to_alight = passengers_to_alight[i]
+            stop.alighting_passengers.extend(alighting_passengers[i])
+            stop.alighted_passengers.extend(alighted_passengers[i])
+
+    def __create_routes(self):
+        columns = self.__columns_by_table["route"]
+        vehicles = self.__objects_at("vehicle", columns["vehicle"])
+        current_stops = self.__objects_at("stop", columns["current_stop"])
+        next_stops = self.__decode_lists("stop", columns["next_stops"])
+        previous_stops = self.__decode_lists("stop",
+                                             columns["previous_stops"])
+        onboard_legs = self.__decode_lists("leg", columns["onboard_legs"])
+        assigned_legs = self.__decode_lists("leg", columns["assigned_legs"])
+        alighted_legs = self.__decode_lists("leg", columns["alighted_legs"])
+
+        routes = []
+        for i, vehicle in enumerate(vehicles):
+            route = vehicle_module.Route(vehicle, next_stops[i])
+            route.current_stop = current_stops[i]
+            route.previous_stops.extend(previous_stops[i])
+            route.onboard_legs.extend(onboard_legs[i])
+            route.assigned_legs.extend(assigned_legs[i])
+            route.alighted_legs.extend(alighted_legs[i])
+            routes.append(route)
+
+        return routes
+
+    def __decode_request_attributes(self, columns):
+        ids = self.__values_at(columns["id"])
+        origins = self.__objects_at("location", columns["origin"])
+        destinations = self.__objects_at("location", columns["destination"])
+        nbs_passengers = self.__decode_numbers(columns["nb_passengers"])
+        release_times = self.__decode_numbers(columns["release_time"])
+        ready_times = self.__decode_numbers(columns["ready_time"])
+        due_times = self.__decode_numbers(columns["due_time"])
+
+        return list(zip(ids, origins, destinations, nbs_passengers,
+                        release_times, ready_times, due_times))
+
+    def __decode_numbers(self, column):
+        numbers, types = column
+        decoded_numbers = []
+        for number, number_type in zip(numbers.tolist(), types.tolist()):
+            if number_type == _FLOAT:
+                decoded_numbers.append(number)
+            elif number_type == _INT:
+                decoded_numbers.append(int(number))
+            elif number_type == _NONE:
+                decoded_numbers.append(None)
+            else:
+                decoded_numbers.append(self.__objects[int(number)])
+        return decoded_numbers
+
+    def __decode_lists(self, table_name, column):
+        offsets, positions = column
+        objects = self.__objects_at(table_name, positions)
+        offsets = offsets.tolist()
+        return [objects[offsets[i]:offsets[i + 1]]
+                for i in range(len(offsets) - 1)]
+
+    def __objects_at(self, table_name, positions):
+        table = self.__objects_by_table[table_name]
+        return [table[position] if position >= 0 else None
+                for position in positions.tolist()]
+
+    def __values_at(self, positions):
+        return [self.__values[position] if position >= 0 else None
+                for position in positions.tolist()]
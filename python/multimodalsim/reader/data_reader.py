@@ -9,10 +9,14 @@ from typing import Optional, Tuple
 from networkx.readwrite import json_graph
 
 import networkx as nx
+import numpy as np
 
 import os.path
 
 from multimodalsim.config.data_reader_config import DataReaderConfig
+import multimodalsim.optimization.shuttle.travel_time_matrix \
+    as travel_time_matrix_module
+from multimodalsim.reader.network_graph_cache import NetworkGraphCache
 from multimodalsim.simulator.request import Trip, Leg
 from multimodalsim.simulator.vehicle import Vehicle, Route
 from multimodalsim.simulator.stop import LabelLocation, Stop
@@ -125,10 +129,26 @@ class ShuttleDataReader(DataReader):
 
         return vehicles, routes_by_vehicle_id
 
-    def get_json_graph(self) -> nx.Graph:
+    def get_json_graph(self, cache_folder: Optional[str] = None) \
+            -> nx.Graph:
+        """Read the network graph from the JSON file. If cache_folder is
+        specified, the graph is loaded from the cache when the JSON file has
+        not changed since the graph was cached."""
+
+        if cache_folder is not None:
+            graph_cache = NetworkGraphCache(cache_folder)
+            cache_key = graph_cache.get_key(
+                [self.__graph_from_json_file_path], {"graph": "json"})
+            self.__network = graph_cache.load(cache_key)
+            if self.__network is not None:
+                return self.__network
+
         with open(self.__graph_from_json_file_path) as f:
             js_graph = json.load(f)
 
+            # networkx >= 3.4 reads the links under the "edges" key.
+            if "links" in js_graph:
+                js_graph.setdefault("edges", js_graph["links"])
             self.__network = json_graph.node_link_graph(js_graph)
             for node in self.__network.nodes(data=True):
                 node[1]['lon'] = node[1]['pos'][0]
@@ -136,8 +156,41 @@ class ShuttleDataReader(DataReader):
                 coord = (node[1]['pos'][0], node[1]['pos'][1])
                 node[1]['pos'] = coord
 
+        if cache_folder is not None:
+            graph_cache.save(cache_key, self.__network)
+
         return self.__network
 
+    def get_travel_time_matrix(self, cache_folder: Optional[str] = None,
+                               weight: str = "length") \
+            -> 'travel_time_matrix_module.TravelTimeMatrix':
+        """Compute the shortest travel times between all the nodes of the
+        network graph read from the JSON file (see
+        TravelTimeMatrix.from_shortest_paths). If cache_folder is specified,
+        the matrix is saved in the cache, and it is loaded (memory-mapped)
+        from the cache when the JSON file has not changed since the matrix
+        was cached."""
+
+        if cache_folder is not None:
+            graph_cache = NetworkGraphCache(cache_folder)
+            matrix_folder = os.path.join(cache_folder, graph_cache.get_key(
+                [self.__graph_from_json_file_path],
+                {"travel_time_matrix": weight}))
+            if os.path.isdir(matrix_folder):
+                return travel_time_matrix_module.TravelTimeMatrix.load(
+                    matrix_folder)
+
+        network = self.__network if self.__network is not None \
+            else self.get_json_graph(cache_folder)
+        travel_time_matrix = \
+            travel_time_matrix_module.TravelTimeMatrix.from_shortest_paths(
+                network, weight)
+
+        if cache_folder is not None:
+            travel_time_matrix.save(matrix_folder)
+
+        return travel_time_matrix
+
 
 class BusDataReader(DataReader):
     def __init__(self, requests_file_path: str,
@@ -339,12 +392,54 @@ class GTFSReader(DataReader):
 
         return vehicles, routes_by_vehicle_id
 
-    def get_network_graph(self, available_connections: Optional[dict] = None,
-                          freeze_interval: float = 5) -> nx.DiGraph:
+    def get_network_graph(
+            self, available_connections: Optional[dict] = None,
+            freeze_interval: float = 5,
+            max_transfers_per_route: Optional[int] = None,
+            cache_folder: Optional[str] = None) -> nx.DiGraph:
+        """Build the graph whose nodes are the stop times of the GTFS trips,
+        i.e., tuples (stop_id, trip_id, arrival_time, departure_time). An edge
+        links two consecutive stop times of a trip, or two stop times of
+        different trips between which a transfer is possible, i.e., the
+        second stop time is at the same stop as the first one (or at a stop
+        connected to it) and departs at least freeze_interval after the
+        arrival of the first one.
+
+        Input:
+          -available_connections: A dictionary associating with each stop id
+           the set of the stop ids that can be reached from it by a transfer.
+          -freeze_interval: Minimum time between the arrival at a stop and the
+           departure from a connected stop for a transfer to be possible.
+          -max_transfers_per_route: If not None, a transfer from a stop time
+           is only possible to the first max_transfers_per_route departures
+           of each route from each connected stop. As long as the trips of
+           a route do not overtake each other, the later departures are not
+           needed to reach a stop as early as possible, and the graph is
+           much smaller.
+          -cache_folder: If not None, path to the folder where the graph is
+           cached (see NetworkGraphCache). The graph is loaded from the cache
+           if it was already built from the same stop_times.txt and
+           trips.txt files with the same parameters.
+
+        Output:
+          -network_graph: An object of type networkx.DiGraph.
+        """
 
         available_connections = {} if available_connections is None \
             else available_connections
 
+        if cache_folder is not None:
+            graph_cache = NetworkGraphCache(cache_folder)
+            cache_key = graph_cache.get_key(
+                [self.__stop_times_path, self.__trips_path],
+                {"graph": "gtfs",
+                 "available_connections": available_connections,
+                 "freeze_interval": freeze_interval,
+                 "max_transfers_per_route": max_transfers_per_route})
+            self.__network_graph = graph_cache.load(cache_key)
+            if self.__network_graph is not None:
+                return self.__network_graph
+
         if self.__stop_times_by_trip_id_dict is None:
             self.__read_stop_times()
 
@@ -377,22 +472,11 @@ class GTFSReader(DataReader):
                     weight=current_node[2] - previous_node[2])
                 previous_node = current_node
 
-        for node1 in self.__network_graph.nodes:
-            for node2 in self.__network_graph.nodes:
-                if (node1[0] == node2[0] or node1[0] in available_connections
-                    and node2[0] in available_connections[node1[0]]) \
-                        and node1[1] != node2[1]:
-                    # Nodes correspond to same stop but different vehicles
-                    if (node2[3] - node1[2]) >= freeze_interval:
-                        # Departure time of the second node is greater than or
-                        # equal to the arrival time of the first
-                        # node. A connection is possible.
-                        if node2[3] - node1[2] < 0:
-                            logger.warning(
-                                "{}: node2: {} -> node1: {}".format(
-                                    node2[3] - node1[2], node2, node1))
-                        self.__network_graph.add_edge(
-                            node1, node2, weight=node2[3] - node1[2])
+        self.__add_transfer_edges(available_connections, freeze_interval,
+                                  max_transfers_per_route)
+
+        if cache_folder is not None:
+            graph_cache.save(cache_key, self.__network_graph)
 
         return self.__network_graph
 
@@ -419,6 +503,101 @@ class GTFSReader(DataReader):
 
         self.__trips_columns = config.get_trips_columns()
 
+    def __add_transfer_edges(self, available_connections, freeze_interval,
+                             max_transfers_per_route):
+        """Add the transfer edges to the network graph. Instead of comparing
+        every pair of nodes, the nodes are grouped by stop (and by route if
+        max_transfers_per_route is specified) and sorted by departure time
+        in each group, so that the nodes of a group that depart at least
+        freeze_interval after an arrival are found by binary search. The
+        edges are added in the same order as a comparison of every pair of
+        nodes would add them."""
+
+        nodes = list(self.__network_graph.nodes)
+        if len(nodes) == 0:
+            return
+
+        if max_transfers_per_route is not None:
+            if self.__trip_route_dict is None:
+                self.__read_trips()
+            route_by_trip_id = self.__trip_route_dict
+        else:
+            route_by_trip_id = {}
+
+        trip_codes = np.array(self.__get_codes(node[1] for node in nodes))
+        arrival_times = np.array([node[2] for node in nodes])
+        departure_times = np.array([node[3] for node in nodes])
+
+        node_indices_by_stop_id = {}
+        for node_index, node in enumerate(nodes):
+            node_indices_by_stop_id.setdefault(node[0], []).append(node_index)
+
+        # Groups of nodes sorted by departure time:
+        # {stop_id: [(departure_times, node_indices)]}, with one group per
+        # route if max_transfers_per_route is specified, else one group.
+        groups_by_stop_id = {}
+        for stop_id, node_indices in node_indices_by_stop_id.items():
+            node_indices_by_route = {}
+            for node_index in node_indices:
+                trip_id = nodes[node_index][1]
+                route_id = route_by_trip_id.get(trip_id, trip_id) \
+                    if max_transfers_per_route is not None else None
+                node_indices_by_route.setdefault(route_id, []).append(
+                    node_index)
+
+            groups_by_stop_id[stop_id] = []
+            for route_node_indices in node_indices_by_route.values():
+                route_node_indices = np.array(route_node_indices)
+                order = np.argsort(departure_times[route_node_indices],
+                                   kind="stable")
+                route_node_indices = route_node_indices[order]
+                groups_by_stop_id[stop_id].append(
+                    (departure_times[route_node_indices], route_node_indices))
+
+        targets_by_node_index = [[] for _ in nodes]
+        for stop_id, node_indices in node_indices_by_stop_id.items():
+            node_indices = np.array(node_indices)
+            min_departure_times = arrival_times[node_indices] \
+                + freeze_interval
+
+            connected_stop_ids = {stop_id}
+            if stop_id in available_connections:
+                connected_stop_ids |= set(available_connections[stop_id]) \
+                    & groups_by_stop_id.keys()
+
+            for connected_stop_id in connected_stop_ids:
+                for group_departure_times, group_node_indices \
+                        in groups_by_stop_id[connected_stop_id]:
+                    first_positions = np.searchsorted(
+                        group_departure_times, min_departure_times,
+                        side="left").tolist()
+                    for node_index, first_position in zip(
+                            node_indices.tolist(), first_positions):
+                        targets = group_node_indices[first_position:]
+                        targets = targets[trip_codes[targets]
+                                          != trip_codes[node_index]]
+                        if max_transfers_per_route is not None:
+                            targets = targets[:max_transfers_per_route]
+                        if len(targets) > 0:
+                            targets_by_node_index[node_index].append(targets)
+
+        for node_index, targets_list in enumerate(targets_by_node_index):
+            if len(targets_list) == 0:
+                continue
+            node1 = nodes[node_index]
+            for target_index in np.sort(np.concatenate(targets_list)).tolist():
+                node2 = nodes[target_index]
+                self.__network_graph.add_edge(node1, node2,
+                                              weight=node2[3] - node1[2])
+
+    @staticmethod
+    def __get_codes(values):
+        """Return the list of the integer codes of the values, where equal
+        values have the same code."""
+        code_by_value = {}
+        return [code_by_value.setdefault(value, len(code_by_value))
+                for value in values]
+
     def __get_vehicle_and_next_stops(self, trip_id, stop_time_list):
 
         vehicle_id = trip_id
@@ -0,0 +1,235 @@
+import gc
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from typing import Optional, Any
+
+import networkx as nx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class NetworkGraphCache:
+    """The ``NetworkGraphCache`` class saves network graphs to a folder so
+    that they do not have to be built again the next time the same inputs
+    are used.
+
+    Each graph is identified by a key that is a hash of the content of the
+    input files and of the parameters used to build the graph, so a change
+    in any of them automatically leads to a new key (i.e., the cached graph is
+    never used for other inputs).
+
+    A graph is stored in its own subfolder in a compressed sparse row (CSR)
+    format:
+        - nodes.pkl: the nodes, their attributes and the attributes of the
+          graph;
+        - indptr.npy and indices.npy: the successors (or neighbors) of each
+          node, as positions in the list of nodes;
+        - edge_<attribute>.npy: one array per numeric edge attribute (e.g.,
+          weight). The other edge attributes are stored in
+          edge_attributes.pkl.
+    When the graph is loaded, each array is read at once and the networkx
+    graph is built from it, since every edge is needed to build the graph.
+        Properties
+        ----------
+        cache_folder: str
+            Path to the folder that contains the cached graphs.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, cache_folder: str) -> None:
+        self.__cache_folder = cache_folder
+
+    @property
+    def cache_folder(self) -> str:
+        return self.__cache_folder
+
+    def get_key(self, file_paths: list[str],
+                parameters: Optional[dict[str, Any]] = None) -> str:
+        """Return the key of the graph built from the files file_paths with
+        the parameters. The files that do not exist are ignored."""
+        key_hash = hashlib.sha256()
+        key_hash.update(str(self.FORMAT_VERSION).encode())
+
+        for file_path in file_paths:
+            if not os.path.isfile(file_path):
+                continue
+            key_hash.update(os.path.basename(file_path).encode())
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    key_hash.update(chunk)
+
+        parameters = {} if parameters is None else parameters
+        key_hash.update(json.dumps(self.__get_canonical_value(parameters),
+                                   sort_keys=True).encode())
+
+        return key_hash.hexdigest()
+
+    def load(self, key: str) -> Optional[nx.Graph]:
+        """Return the graph associated with the key, or None if there is no
+        such graph in the cache."""
+        graph_folder = self.__get_graph_folder(key)
+        if not os.path.isdir(graph_folder):
+            return None
+
+        with open(os.path.join(graph_folder, "nodes.pkl"), 'rb') as f:
+            graph_data = pickle.load(f)
+        with open(os.path.join(graph_folder, "edge_attributes.pkl"),
+                  'rb') as f:
+            edge_attributes = pickle.load(f)
+
+        indptr = np.load(os.path.join(graph_folder, "indptr.npy"))
+        indices = np.load(os.path.join(graph_folder, "indices.npy"))
+        for attribute in graph_data["numeric_edge_attributes"]:
+            edge_attributes[attribute] = np.load(
+                os.path.join(graph_folder,
+                             "edge_" + attribute + ".npy")).tolist()
+
+        graph = nx.DiGraph() if graph_data["directed"] else nx.Graph()
+        graph.graph.update(graph_data["graph_attributes"])
+
+        nodes = graph_data["nodes"]
+        graph.add_nodes_from(zip(nodes, graph_data["node_attributes"]))
+
+        sources = np.repeat(np.arange(len(nodes)),
+                            np.diff(indptr)).tolist()
+        targets = indices.tolist()
+        attribute_names = list(edge_attributes.keys())
+
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            if attribute_names == ["weight"]:
+                graph.add_weighted_edges_from(
+                    (nodes[source], nodes[target], weight)
+                    for source, target, weight
+                    in zip(sources, targets, edge_attributes["weight"]))
+            else:
+                graph.add_edges_from(
+                    (nodes[source], nodes[target],
+                     dict(zip(attribute_names, values)))
+                    for source, target, *values
+                    in zip(sources, targets, *edge_attributes.values()))
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        logger.debug("Network graph loaded from {}".format(graph_folder))
+
+        return graph
+
+    def save(self, key: str, graph: nx.Graph) -> None:
+        """Save the graph in the cache. The graph is first written in a
+        temporary folder, which is then renamed, so that a graph that is only
+        partially written is never loaded."""
+        if graph.is_multigraph():
+            raise ValueError("Multigraphs cannot be cached.")
+
+        os.makedirs(self.__cache_folder, exist_ok=True)
+
+        nodes = list(graph.nodes)
+        position_by_node = {node: position
+                            for position, node in enumerate(nodes)}
+
+        indptr = [0]
+        indices = []
+        edges_data = []
+        for node in nodes:
+            for neighbor, edge_data in graph.adj[node].items():
+                if not graph.is_directed() \
+                        and position_by_node[neighbor] \
+                        < position_by_node[node]:
+                    # Each undirected edge is stored once.
+                    continue
+                indices.append(position_by_node[neighbor])
+                edges_data.append(edge_data)
+            indptr.append(len(indices))
+
+        edge_attributes = self.__get_edge_attributes(edges_data)
+        numeric_edge_attributes = [
+            attribute for attribute, values in edge_attributes.items()
+            if all(type(value) is int for value in values)
+            or all(type(value) is float for value in values)]
+
+        graph_data = {
+            "directed": graph.is_directed(),
+            "graph_attributes": dict(graph.graph),
+            "nodes": nodes,
+            "node_attributes": [dict(graph.nodes[node]) for node in nodes],
+            "numeric_edge_attributes": numeric_edge_attributes
+        }
+
+        temporary_folder = tempfile.mkdtemp(dir=self.__cache_folder)
+        try:
+            with open(os.path.join(temporary_folder, "nodes.pkl"), 'wb') as f:
+                pickle.dump(graph_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            np.save(os.path.join(temporary_folder, "indptr.npy"),
+                    np.array(indptr, dtype=np.int64))
+            np.save(os.path.join(temporary_folder, "indices.npy"),
+                    np.array(indices, dtype=np.int64))
+            for attribute in numeric_edge_attributes:
+                np.save(os.path.join(temporary_folder,
+                                     "edge_" + attribute + ".npy"),
+                        np.array(edge_attributes.pop(attribute)))
+
+            with open(os.path.join(temporary_folder, "edge_attributes.pkl"),
+                      'wb') as f:
+                pickle.dump(edge_attributes, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+
+            os.replace(temporary_folder, self.__get_graph_folder(key))
+        except OSError:
+            # Another process may have saved the same graph in the meantime.
+            shutil.rmtree(temporary_folder, ignore_errors=True)
+            if not os.path.isdir(self.__get_graph_folder(key)):
+                raise
+
+        logger.debug("Network graph saved to {}".format(
+            self.__get_graph_folder(key)))
+
+    def __get_graph_folder(self, key):
+        return os.path.join(self.__cache_folder, key)
+
+    @staticmethod
+    def __get_edge_attributes(edges_data):
+        attribute_names = []
+        for edge_data in edges_data:
+            for attribute in edge_data:
+                if attribute not in attribute_names:
+                    attribute_names.append(attribute)
+
+        edge_attributes = {}
+        for attribute in attribute_names:
+            if not all(attribute in edge_data for edge_data in edges_data):
+                raise ValueError("The edge attribute {} must be defined for "
+                                 "all the edges.".format(attribute))
+            edge_attributes[attribute] = [edge_data[attribute]
+                                          for edge_data in edges_data]
+
+        return edge_attributes
+
+    def __get_canonical_value(self, value):
+        """Convert the value to a JSON-serializable value that does not depend
+        on the order of the elements of the sets and of the dicts."""
+        if isinstance(value, dict):
+            canonical_value = sorted(
+                [str(key), self.__get_canonical_value(item)]
+                for key, item in value.items())
+        elif isinstance(value, (set, frozenset)):
+            canonical_value = sorted(str(item) for item in value)
+        elif isinstance(value, (list, tuple)):
+            canonical_value = [self.__get_canonical_value(item)
+                               for item in value]
+        elif value is None or isinstance(value, (bool, int, float, str)):
+            canonical_value = value
+        else:
+            canonical_value = str(value)
+
+        return canonical_value
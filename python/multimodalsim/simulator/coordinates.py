@@ -1,12 +1,15 @@
 import logging
 import csv
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
 from typing import Optional
 
-import requests
 import polyline
 import numpy as np
 
 from multimodalsim.config.coordinates_osrm_config import CoordinatesOSRMConfig
+from multimodalsim.simulator.osrm_client import OSRMClient
 from multimodalsim.simulator.stop import TimeCoordinatesLocation, Location
 from multimodalsim.simulator.vehicle import Vehicle, Route
 
@@ -23,11 +26,32 @@ class Coordinates:
         raise NotImplementedError(
             'Coordinates.update_position not implemented')
 
+    def update_positions(self, vehicles: list[Vehicle], routes: list[Route],
+                         time: float) -> list[Optional[Location]]:
+        """Return the positions of the vehicles at the given time, where
+        routes[i] is the route of vehicles[i].
+
+        By default, the position of each vehicle is computed by
+        update_position."""
+        return [self.update_position(vehicle, route, time)
+                for vehicle, route in zip(vehicles, routes)]
+
     def update_polylines(
             self, route) -> Optional[dict[str, tuple[str, list[float]]]]:
         raise NotImplementedError(
             'Coordinates.update_polylines not implemented')
 
+    def submit_polylines(self, route: Route) -> Future:
+        """Compute the polylines of the route in the background, so that
+        the events that modify the route do not wait for them. The result of
+        the returned Future is the result of update_polylines for the stops
+        of the route at the time of the call.
+
+        By default, the polylines are computed immediately."""
+        future = Future()
+        future.set_result(self.update_polylines(route))
+        return future
+
 
 class CoordinatesFromFile(Coordinates):
     def __init__(self, coordinates_file_path: str):
@@ -103,33 +127,66 @@ class CoordinatesOSRM(Coordinates):
 
         self.__load_config(config)
 
+    @property
+    def osrm_client(self) -> OSRMClient:
+        return self.__osrm_client
+
     def update_position(self, vehicle: Vehicle,
                         route: Route, time: float) -> Location:
-
-        current_position = None
-
-        if route.current_stop is not None:
-            current_position = route.current_stop.location
-        elif len(route.previous_stops) > 0 \
-                and vehicle.polylines is not None:
-            # Current position is between two stops
-            stop1 = route.previous_stops[-1]
-            stop2 = route.next_stops[0]
-            stop_id = str(len(route.previous_stops) - 1)
-
-            current_coordinates = self.__extract_coordinates_from_polyline(
-                vehicle, time, stop1, stop2, stop_id)
-
-            current_position = TimeCoordinatesLocation(time,
-                                                       current_coordinates[0],
-                                                       current_coordinates[1])
-
-        return current_position
+        return self.update_positions([vehicle], [route], time)[0]
+
+    def update_positions(self, vehicles: list[Vehicle], routes: list[Route],
+                         time: float) -> list[Optional[Location]]:
+        """The positions of the vehicles that are between two stops are
+        interpolated all at once (see SegmentPolyline.get_coordinates_array).
+        """
+
+        positions = [None] * len(vehicles)
+
+        moving_indices = []
+        segment_polylines = []
+        current_durations = []
+        total_durations = []
+        for index, (vehicle, route) in enumerate(zip(vehicles, routes)):
+            if route.current_stop is not None:
+                positions[index] = route.current_stop.location
+            elif len(route.previous_stops) > 0 \
+                    and vehicle.polylines is not None:
+                # Current position is between two stops
+                stop1 = route.previous_stops[-1]
+                stop2 = route.next_stops[0]
+                stop_id = str(len(route.previous_stops) - 1)
+
+                moving_indices.append(index)
+                segment_polylines.append(
+                    self.__get_segment_polyline(vehicle, stop_id))
+                current_durations.append(time - stop1.departure_time)
+                total_durations.append(
+                    stop2.arrival_time - stop1.departure_time)
+
+        if len(moving_indices) > 0:
+            current_coordinates = SegmentPolyline.get_coordinates_array(
+                segment_polylines, current_durations, total_durations)
+            for index, (lon, lat) in zip(moving_indices,
+                                         current_coordinates.tolist()):
+                positions[index] = TimeCoordinatesLocation(time, lon, lat)
+
+        return positions
 
     def update_polylines(self, route: Route) -> dict[
         str, tuple[str, list[float]]]:
+        return self.submit_polylines(route).result()
 
-        polylines = {}
+    def submit_polylines(self, route: Route) -> Future:
+        """The stops of the route are read immediately and the polylines are
+        computed in a thread of the OSRM client once the route is received
+        (see OSRMClient.submit).
+
+        The polyline of each segment (pair of consecutive stops) is cached,
+        so that only the segments that are not in the cache (e.g., the
+        segments after the stops modified by optimization) are requested.
+        Each run of consecutive segments that are not in the cache is
+        requested as one route."""
 
         all_stops = []
         all_stops.extend(route.previous_stops)
@@ -141,36 +198,108 @@ class CoordinatesOSRM(Coordinates):
                             for stop in all_stops]
         stop_ids = [stop.location.label for stop in all_stops]
 
+        polylines_future = Future()
         if len(stop_coordinates) > 2:
-            coordinates_str_list = [str(coord[0]) + "," + str(coord[1])
-                                    for coord in stop_coordinates]
-
-            service_url = "route/v1/driving/"
-            coord_url = ";".join(coordinates_str_list)
-            args_url = "?annotations=true&overview=full"
-
-            request_url = self.__osrm_url + service_url + coord_url + args_url
-
-            response = requests.get(request_url)
-
-            res = response.json()
-
-            if res['code'] == 'Ok':
-                polylines = \
-                    self.__extract_polylines_from_response(res, stop_ids)
+            segment_polylines = self.__get_cached_segment_polylines(
+                stop_coordinates)
+            missing_runs = self.__get_missing_runs(segment_polylines)
+
+            response_futures = [
+                self.__osrm_client.submit(stop_coordinates[first:last + 1])
+                for first, last in missing_runs]
+            for response_future in response_futures:
+                response_future.add_done_callback(
+                    lambda future: self.__set_polylines_from_responses(
+                        polylines_future, response_futures, missing_runs,
+                        segment_polylines, stop_coordinates, stop_ids))
+            if len(response_futures) == 0:
+                self.__set_polylines_from_responses(
+                    polylines_future, response_futures, missing_runs,
+                    segment_polylines, stop_coordinates, stop_ids)
+        else:
+            polylines_future.set_result({str(0): SegmentPolyline("", [])})
+
+        return polylines_future
+
+    def __get_cached_segment_polylines(self, stop_coordinates):
+        segment_polylines = []
+        with self.__segment_lock:
+            for segment in zip(stop_coordinates[:-1], stop_coordinates[1:]):
+                segment_polyline = \
+                    self.__polyline_by_segment.get(segment)
+                if segment_polyline is not None:
+                    self.__polyline_by_segment.move_to_end(segment)
+                segment_polylines.append(segment_polyline)
+
+        return segment_polylines
+
+    @staticmethod
+    def __get_missing_runs(segment_polylines):
+        # Return the (first, last) stop indexes of each run of consecutive
+        # segments whose polylines are missing.
+        missing_runs = []
+        for index, segment_polyline in enumerate(segment_polylines):
+            if segment_polyline is not None:
+                continue
+            if len(missing_runs) > 0 and missing_runs[-1][1] == index:
+                missing_runs[-1][1] = index + 1
             else:
-                logger.warning(request_url)
-                logger.warning(res)
-                polylines = {}
-                for i in range(0, len(stop_ids) - 1):
-                    coordinates = [stop_coordinates[i],
-                                   stop_coordinates[i + 1]]
-                    leg_polyline = polyline.encode(coordinates, geojson=True)
-                    leg_durations_frac = [1.0]
-                    polylines[str(i)] = (leg_polyline, leg_durations_frac)
-
+                missing_runs.append([index, index + 1])
+
+        return missing_runs
+
+    def __set_polylines_from_responses(self, polylines_future,
+                                       response_futures, missing_runs,
+                                       segment_polylines, stop_coordinates,
+                                       stop_ids):
+        # Called each time a response is received. The polylines are set
+        # once all the responses are received.
+        with self.__segment_lock:
+            if polylines_future.done() \
+                    or not all(response_future.done()
+                               for response_future in response_futures):
+                return
+
+            try:
+                for (first, last), response_future in zip(missing_runs,
+                                                          response_futures):
+                    run_polylines = self.__get_polylines_from_response(
+                        response_future.result(),
+                        stop_coordinates[first:last + 1],
+                        stop_ids[first:last + 1])
+                    for index, leg_polyline in run_polylines.items():
+                        segment_polylines[first + int(index)] = leg_polyline
+
+                polylines = {str(i): segment_polyline for i, segment_polyline
+                             in enumerate(segment_polylines)
+                             if segment_polyline is not None}
+            except Exception as exception:
+                polylines_future.set_exception(exception)
+            else:
+                polylines_future.set_result(polylines)
+
+    def __get_polylines_from_response(self, res, stop_coordinates,
+                                      stop_ids):
+        if res['code'] == 'Ok':
+            polylines = \
+                self.__extract_polylines_from_response(res, stop_ids)
+
+            for index, leg_polyline in polylines.items():
+                segment = (stop_coordinates[int(index)],
+                           stop_coordinates[int(index) + 1])
+                self.__polyline_by_segment[segment] = leg_polyline
+            while len(self.__polyline_by_segment) \
+                    > self.__segment_cache_size:
+                self.__polyline_by_segment.popitem(last=False)
         else:
-            polylines[str(0)] = ("", [])
+            polylines = {}
+            for i in range(0, len(stop_ids) - 1):
+                coordinates = [stop_coordinates[i],
+                               stop_coordinates[i + 1]]
+                leg_polyline = polyline.encode(coordinates, geojson=True)
+                leg_durations_frac = [1.0]
+                polylines[str(i)] = SegmentPolyline(leg_polyline,
+                                                    leg_durations_frac)
 
         return polylines
 
@@ -180,66 +309,21 @@ class CoordinatesOSRM(Coordinates):
         elif not isinstance(config, CoordinatesOSRMConfig):
             config = CoordinatesOSRMConfig()
 
-        self.__osrm_url = config.url
-
-    def __extract_coordinates_from_polyline(self, vehicle, current_time, stop1,
-                                            stop2, stop_id):
+        self.__osrm_client = OSRMClient(config.url, config.max_workers,
+                                        config.cache_size, config.cache_folder,
+                                        config.timeout)
 
-        stop_polyline_durations = vehicle.polylines[stop_id]
+        self.__segment_cache_size = config.segment_cache_size
+        self.__polyline_by_segment = OrderedDict()
+        self.__segment_lock = threading.Lock()
 
-        stop_coordinates = polyline.decode(stop_polyline_durations[0],
-                                           geojson=True)
-        stop_durations = stop_polyline_durations[1]
+    @staticmethod
+    def __get_segment_polyline(vehicle, stop_id):
+        segment_polyline = vehicle.polylines[stop_id]
+        if not isinstance(segment_polyline, SegmentPolyline):
+            segment_polyline = SegmentPolyline(*segment_polyline)
 
-        time1 = stop1.departure_time
-        time2 = stop2.arrival_time
-        current_coordinates = \
-            self.__calculate_current_coordinates(current_time, time1, time2,
-                                                 stop_coordinates,
-                                                 stop_durations)
-
-        return current_coordinates
-
-    def __calculate_current_coordinates(self, current_time, time1, time2,
-                                        coordinates, durations_frac):
-
-        current_duration = current_time - time1
-        durations = [d * (time2 - time1) for d in durations_frac]
-        cumulative_durations = np.cumsum(durations)
-
-        current_i = 0
-        for i in range(len(durations_frac)):
-            if current_duration >= cumulative_durations[i]:
-                current_i = i
-
-        coordinates1 = coordinates[current_i + 1]
-        if current_i + 2 < len(coordinates):
-            coordinates2 = coordinates[current_i + 2]
-            duration1 = cumulative_durations[current_i]
-            duration2 = cumulative_durations[current_i + 1]
-
-            current_coordinates = \
-                self.__interpolate_coordinates(coordinates1, coordinates2,
-                                               duration1, duration2,
-                                               current_duration)
-        else:
-            # Vehicle is at the end of the route (i.e., coordinates1 is the
-            # last coordinates)
-            current_coordinates = coordinates1
-
-        return current_coordinates
-
-    def __interpolate_coordinates(self, coordinates1, coordinates2, time1,
-                                  time2, current_time):
-        inter_factor = (current_time - time1) / (time2 - time1)
-
-        current_lon = inter_factor * (coordinates2[0]
-                                      - coordinates1[0]) + coordinates1[0]
-        current_lat = inter_factor * (coordinates2[1]
-                                      - coordinates1[1]) + coordinates1[1]
-        current_coordinates = (current_lon, current_lat)
-
-        return current_coordinates
+        return segment_polyline
 
     def __extract_polylines_from_response(self, res, stop_ids):
 
@@ -266,10 +350,179 @@ class CoordinatesOSRM(Coordinates):
             leg_coordinates = coordinates[start_coord_index:end_coord_index]
             leg_polyline = polyline.encode(leg_coordinates, geojson=True)
 
-            polylines[str(leg_index)] = (leg_polyline, leg_durations_frac)
+            polylines[str(leg_index)] = SegmentPolyline(leg_polyline,
+                                                        leg_durations_frac)
 
             # The last coordinates of a given leg are the same as the first
             # coordinates of the next leg
             start_coord_index = end_coord_index - 1
 
         return polylines
+
+
+class SegmentPolyline(tuple):
+    """The ``SegmentPolyline`` class stores the polyline between two
+    consecutive stops of a route. It is the tuple (encoded polyline,
+    durations_frac) found in Vehicle.polylines, which is what is exported,
+    and it also stores the decoded coordinates and the cumulative sums of
+    durations_frac in NumPy arrays, so that the polyline is decoded only once
+    however many times the position of the vehicle is updated.
+        Properties
+        ----------
+        encoded_polyline: str
+            The polyline, encoded with the polyline package.
+        durations_frac: list of float
+            The fraction of the travel time between the two stops spent on
+            each line of the polyline.
+        coordinates: NumPy array
+            The (nb_points x 2) array of the (lon, lat) coordinates of the
+            points of the polyline.
+        cumulative_durations_frac: NumPy array
+            The cumulative sums of durations_frac.
+    """
+
+    def __new__(cls, encoded_polyline: str,
+                durations_frac: list[float]) -> 'SegmentPolyline':
+        segment_polyline = super().__new__(cls, (encoded_polyline,
+                                                 durations_frac))
+        segment_polyline.__coordinates = np.array(
+            polyline.decode(encoded_polyline, geojson=True),
+            dtype=float).reshape(-1, 2)
+        segment_polyline.__cumulative_durations_frac = np.cumsum(
+            np.asarray(durations_frac, dtype=float))
+        return segment_polyline
+
+    def __getnewargs__(self) -> tuple[str, list[float]]:
+        return tuple(self)
+
+    @property
+    def encoded_polyline(self) -> str:
+        return self[0]
+
+    @property
+    def durations_frac(self) -> list[float]:
+        return self[1]
+
+    @property
+    def coordinates(self) -> np.ndarray:
+        return self.__coordinates
+
+    @property
+    def cumulative_durations_frac(self) -> np.ndarray:
+        return self.__cumulative_durations_frac
+
+    def get_coordinates(self, current_duration: float,
+                        total_duration: float) -> tuple[float, float]:
+        """Return the coordinates of a vehicle that left the first stop
+        current_duration ago and that arrives at the second stop
+        total_duration after it left the first stop.
+
+        The vehicle is on the line that ends at the last point reached
+        according to the cumulative durations, between the end of the line
+        and the following point (or at the end of the polyline).
+        """
+        cumulative_durations = self.__cumulative_durations_frac \
+            * total_duration
+        current_i = max(int(np.searchsorted(cumulative_durations,
+                                            current_duration,
+                                            side='right')) - 1, 0)
+
+        coordinates1 = self.__coordinates[current_i + 1]
+        if current_i + 2 < len(self.__coordinates):
+            coordinates2 = self.__coordinates[current_i + 2]
+            duration1 = cumulative_durations[current_i]
+            duration2 = cumulative_durations[current_i + 1]
+            inter_factor = (current_duration - duration1) \
+                / (duration2 - duration1)
+            current_coordinates = inter_factor \
+                * (coordinates2 - coordinates1) + coordinates1
+        else:
+            # Vehicle is at the end of the route (i.e., coordinates1 is the
+            # last coordinates)
+            current_coordinates = coordinates1
+
+        return float(current_coordinates[0]), float(current_coordinates[1])
+
+    @staticmethod
+    def get_coordinates_array(
+            segment_polylines: list['SegmentPolyline'],
+            current_durations: list[float],
+            total_durations: list[float]) -> np.ndarray:
+        """Return the coordinates of several vehicles at once.
+
+        Input:
+          -segment_polylines: The polyline of the segment on which each
+           vehicle is.
+          -current_durations: The time elapsed since each vehicle left the
+           first stop of its segment.
+          -total_durations: The travel time of each vehicle between the two
+           stops of its segment.
+
+        Output:
+          -coordinates: The (nb_vehicles x 2) array of the (lon, lat)
+           coordinates of the vehicles, equal to the ones returned by
+           get_coordinates.
+        """
+        current_durations = np.asarray(current_durations, dtype=float)
+        total_durations = np.asarray(total_durations, dtype=float)
+
+        nb_points = np.array([len(segment_polyline.coordinates)
+                              for segment_polyline in segment_polylines],
+                             dtype=int)
+        nb_lines = np.array([len(segment_polyline.cumulative_durations_frac)
+                             for segment_polyline in segment_polylines],
+                            dtype=int)
+
+        # The polylines that do not have one more point than lines (e.g.,
+        # empty polylines) are left to get_coordinates.
+        regular = (nb_lines > 0) & (nb_points == nb_lines + 1)
+        coordinates = np.empty((len(segment_polylines), 2), dtype=float)
+        for index in np.flatnonzero(~regular):
+            coordinates[index] = segment_polylines[index].get_coordinates(
+                current_durations[index], total_durations[index])
+
+        regular_indices = np.flatnonzero(regular)
+        if len(regular_indices) == 0:
+            return coordinates
+
+        # The polylines are concatenated, so that the index of the line on
+        # which each vehicle is (i.e., np.searchsorted(side='right') - 1 in
+        # get_coordinates) is the number of cumulative durations smaller
+        # than or equal to the current duration in its polyline, minus one.
+        nb_lines = nb_lines[regular_indices]
+        current_durations = current_durations[regular_indices]
+        total_durations = total_durations[regular_indices]
+        line_starts = np.concatenate(([0], np.cumsum(nb_lines)[:-1]))
+        point_starts = line_starts + np.arange(len(regular_indices))
+
+        cumulative_durations = np.concatenate(
+            [segment_polylines[index].cumulative_durations_frac
+             for index in regular_indices]) \
+            * np.repeat(total_durations, nb_lines)
+        points = np.concatenate([segment_polylines[index].coordinates
+                                 for index in regular_indices])
+
+        nb_reached = np.add.reduceat(
+            cumulative_durations <= np.repeat(current_durations, nb_lines),
+            line_starts, dtype=int)
+        current_i = np.maximum(nb_reached - 1, 0)
+
+        current_coordinates = points[point_starts + current_i + 1]
+
+        # Vehicles that are not at the end of their polyline are between
+        # two points.
+        between = current_i + 1 < nb_lines
+        line_indices = line_starts[between] + current_i[between]
+        point_indices = point_starts[between] + current_i[between]
+        coordinates1 = points[point_indices + 1]
+        coordinates2 = points[point_indices + 2]
+        duration1 = cumulative_durations[line_indices]
+        duration2 = cumulative_durations[line_indices + 1]
+        inter_factors = (current_durations[between] - duration1) \
+            / (duration2 - duration1)
+        current_coordinates[between] = inter_factors[:, np.newaxis] \
+            * (coordinates2 - coordinates1) + coordinates1
+
+        coordinates[regular_indices] = current_coordinates
+
+        return coordinates
@@ -1,12 +1,14 @@
 import copy
 import logging
+from collections.abc import ValuesView
 from threading import Condition
-from typing import Optional, Any
+from typing import Optional, Any, Iterable
 
 import multimodalsim.optimization.optimization as optimization_module
 import multimodalsim.optimization.state as state_module
 from multimodalsim.simulator.coordinates import Coordinates
 import multimodalsim.simulator.request as request
+from multimodalsim.simulator.state_copy_cache import StateCopyCache
 from multimodalsim.simulator.travel_times import TravelTimes
 from multimodalsim.simulator.vehicle import Vehicle, Route
 from multimodalsim.state_machine.status import VehicleStatus, PassengerStatus
@@ -21,14 +23,16 @@ class Environment:
         ----------
         current_time: int
             The date and time of the current event.
-        trips: list of Trip objects
+        trips: view of Trip objects
             All the trips that were added to the environment.
-        assigned_trips: list of Trip objects
+        assigned_trips: view of Trip objects
             The trips that are assigned to a route.
-        non_assigned_trips: list of Trip objects
+        non_assigned_trips: view of Trip objects
             The trips that are not assigned to a route yet.
-        vehicles: list of Vehicle objects
+        vehicles: view of Vehicle objects
             All the vehicles that were added to the environment.
+        The trips and the vehicles are read-only views of the indexes of the
+        environment (i.e., they are not copied when they are read).
         routes_by_vehicle_id: dictionary associating an id (string) with a
         Route object.
             The route of each vehicle in the environment (key: Vehicle.id,
@@ -41,6 +45,14 @@ class Environment:
             The coordinates of the vehicles.
         travel_times: TravelTimes
             The actual travel times of the vehicles.
+        modified_trips: list of Trip objects
+            The trips modified since the last State was created.
+        modified_legs: list of Leg objects
+            The legs modified since the last State was created.
+        modified_routes: list of Route objects
+            The routes (or their vehicles) modified since the last State was
+            created. The updates of Vehicle.position are not considered as
+            modifications.
         """
 
     def __init__(self, optimization: 'optimization_module.Optimization',
@@ -48,12 +60,28 @@ class Environment:
                  coordinates: Optional[Coordinates] = None,
                  travel_times: Optional[TravelTimes] = None) -> None:
         self.__current_time = 0
-        self.__trips = []
-        self.__assigned_trips = []
-        self.__non_assigned_trips = []
-        self.__vehicles = []
+
+        # The trips, the legs and the vehicles are indexed by id. Since
+        # dictionaries preserve the insertion order, the assigned and
+        # non-assigned trips are stored as insertion-ordered sets of trips
+        # (key: Trip.id, value: Trip).
+        self.__trip_by_id = {}
+        self.__leg_by_id = {}
+        self.__assigned_trip_by_id = {}
+        self.__non_assigned_trip_by_id = {}
+        self.__vehicle_by_id = {}
         self.__routes_by_vehicle_id = {}
 
+        # The trips, legs and routes modified since the last state was
+        # created (i.e., since the previous optimization).
+        self.__modified_trip_by_id = {}
+        self.__modified_leg_by_id = {}
+        self.__modified_route_by_vehicle_id = {}
+
+        # The copies of the last state, reused by the next state for the
+        # trips and the vehicles that were not modified in the meantime.
+        self.__state_copy_cache = StateCopyCache()
+
         self.__network = network
         self.__optimization = optimization
         self.__coordinates = coordinates
@@ -75,94 +103,78 @@ class Environment:
         self.__current_time = current_time
 
     @property
-    def trips(self) -> list['request.Trip']:
-        return self.__trips
+    def trips(self) -> ValuesView['request.Trip']:
+        return self.__trip_by_id.values()
 
     def get_trip_by_id(self, trip_id: str | int) -> 'request.Trip':
-        found_trip = None
-        for trip in self.trips:
-            if trip.id == trip_id:
-                found_trip = trip
-                break
-        return found_trip
+        return self.__trip_by_id.get(trip_id)
 
     def add_trip(self, trip: 'request.Trip') -> None:
         """ Adds a new trip to the trips list"""
-        self.__trips.append(trip)
+        self.__trip_by_id[trip.id] = trip
+        for leg in self.__get_trip_legs(trip):
+            self.add_leg(leg)
 
     def remove_trip(self, trip_id: str | int) -> None:
         """ Removes a trip from the requests list based on its id"""
-        self.__trips = [trip for trip in self.__trips if trip.id != trip_id]
+        trip = self.__trip_by_id.pop(trip_id, None)
+        if trip is not None:
+            for leg in self.__get_trip_legs(trip):
+                if self.__leg_by_id.get(leg.id) is leg:
+                    del self.__leg_by_id[leg.id]
 
     def get_leg_by_id(self, leg_id: str | int) -> 'request.Leg':
-        # Look for the leg in the legs of all trips.
-        found_leg = None
-        for trip in self.__trips:
-            # Current leg
-            if trip.current_leg is not None and trip.current_leg.id == leg_id:
-                found_leg = trip.current_leg
-            # Previous legs
-            for leg in trip.previous_legs:
-                if leg.id == leg_id:
-                    found_leg = leg
-            # Next legs
-            if trip.next_legs is not None:
-                for leg in trip.next_legs:
-                    if leg.id == leg_id:
-                        found_leg = leg
-
-        return found_leg
+        return self.__leg_by_id.get(leg_id)
+
+    def add_leg(self, leg: 'request.Leg') -> None:
+        """ Adds a leg to the legs index so that it can be found by id. The
+        legs of a trip are indexed when the trip is added to the environment;
+        the legs assigned to a trip afterwards must be added explicitly."""
+        self.__leg_by_id[leg.id] = leg
 
     @property
-    def assigned_trips(self) -> list['request.Trip']:
-        return self.__assigned_trips
+    def assigned_trips(self) -> ValuesView['request.Trip']:
+        return self.__assigned_trip_by_id.values()
 
     def add_assigned_trip(self, trip: 'request.Trip') -> None:
         """ Adds a new trip to the list of assigned trips if it is not already
         there"""
-        if trip not in self.__assigned_trips:
-            self.__assigned_trips.append(trip)
+        if trip.id not in self.__assigned_trip_by_id:
+            self.__assigned_trip_by_id[trip.id] = trip
 
     def remove_assigned_trip(self, trip_id: str | int) -> None:
         """ Removes a trip from the list of assigned trips based on its id"""
-        self.__assigned_trips = [trip for trip in self.__assigned_trips
-                                 if trip.id != trip_id]
+        self.__assigned_trip_by_id.pop(trip_id, None)
 
     @property
-    def non_assigned_trips(self) -> list['request.Trip']:
-        return self.__non_assigned_trips
+    def non_assigned_trips(self) -> ValuesView['request.Trip']:
+        return self.__non_assigned_trip_by_id.values()
 
     def add_non_assigned_trip(self, trip: 'request.Trip') -> None:
         """ Adds a new trip to the list of non-assigned trips it is not already
         there"""
-        if trip not in self.__non_assigned_trips:
-            self.__non_assigned_trips.append(trip)
+        if trip.id not in self.__non_assigned_trip_by_id:
+            self.__non_assigned_trip_by_id[trip.id] = trip
 
     def remove_non_assigned_trip(self, trip_id: str | int) -> None:
         """ Removes a trip from the list of non-assigned trips based on its
         id """
-        self.__non_assigned_trips = [trip for trip in self.__non_assigned_trips
-                                     if trip.id != trip_id]
+        self.__non_assigned_trip_by_id.pop(trip_id, None)
 
     @property
-    def vehicles(self) -> list[Vehicle]:
-        return self.__vehicles
+    def vehicles(self) -> ValuesView[Vehicle]:
+        return self.__vehicle_by_id.values()
 
     def get_vehicle_by_id(self, vehicle_id: str | int) -> Vehicle:
-        found_vehicle = None
-        for vehicle in self.vehicles:
-            if vehicle.id == vehicle_id:
-                found_vehicle = vehicle
-        return found_vehicle
+        return self.__vehicle_by_id.get(vehicle_id)
 
     def add_vehicle(self, vehicle: Vehicle) -> None:
         """ Adds a new vehicle to the vehicles list"""
-        self.__vehicles.append(vehicle)
+        self.__vehicle_by_id[vehicle.id] = vehicle
 
     def remove_vehicle(self, vehicle_id: str | int) -> None:
         """ Removes a vehicle from the vehicles list based on its id"""
-        self.__vehicles = [item for item in self.__vehicles
-                           if item.attribute != vehicle_id]
+        self.__vehicle_by_id.pop(vehicle_id, None)
 
     @property
     def route_by_vehicle_id(self) -> dict[str | int, Route]:
@@ -178,6 +190,41 @@ class Environment:
     def add_route(self, route: Route, vehicle_id: str | int) -> None:
         self.__routes_by_vehicle_id[vehicle_id] = route
 
+    @property
+    def modified_trips(self) -> list['request.Trip']:
+        return list(self.__modified_trip_by_id.values())
+
+    def add_modified_trip(self, trip: 'request.Trip') -> None:
+        """ Records that a trip was modified since the last state was
+        created"""
+        self.__modified_trip_by_id[trip.id] = trip
+
+    @property
+    def modified_legs(self) -> list['request.Leg']:
+        return list(self.__modified_leg_by_id.values())
+
+    def add_modified_leg(self, leg: 'request.Leg') -> None:
+        """ Records that a leg was modified since the last state was
+        created"""
+        self.__modified_leg_by_id[leg.id] = leg
+
+    @property
+    def modified_routes(self) -> list[Route]:
+        return list(self.__modified_route_by_vehicle_id.values())
+
+    def add_modified_route(self, route: Route) -> None:
+        """ Records that a route (or its vehicle) was modified since the last
+        state was created"""
+        self.__modified_route_by_vehicle_id[route.vehicle.id] = route
+
+    def invalidate_state_copies(
+            self, trip_ids: Iterable[str | int] = (),
+            vehicle_ids: Iterable[str | int] = ()) -> None:
+        """ Records that the copies of some trips and vehicles in the last
+        state were modified after the state was created (e.g., by the
+        optimization), so that the next state copies them again"""
+        self.__state_copy_cache.invalidate(trip_ids, vehicle_ids)
+
     def get_new_state(self) -> 'state_module.State':
         state_copy = copy.copy(self)
         state_copy.__network = None
@@ -185,33 +232,82 @@ class Environment:
         state_copy.__coordinates = None
         state_copy.__travel_times = None
         state_copy.optimize_cv = None
-
-        state_copy.__vehicles = \
-            self.__get_non_complete_vehicles(state_copy.__vehicles)
-
-        state_copy.__trips = self.__get_non_complete_trips(state_copy.__trips)
-        state_copy.__assigned_trips = \
-            self.__get_non_complete_trips(state_copy.__assigned_trips)
-
-        state_deepcopy = state_module.State(copy.deepcopy(state_copy))
+        state_copy.__state_copy_cache = None
+
+        state_copy.__vehicle_by_id = \
+            self.__get_non_complete_vehicles(state_copy.__vehicle_by_id)
+        state_copy.__routes_by_vehicle_id = \
+            {vehicle_id: self.__routes_by_vehicle_id[vehicle_id]
+             for vehicle_id in state_copy.__vehicle_by_id}
+
+        state_copy.__trip_by_id = \
+            self.__get_non_complete_trips(state_copy.__trip_by_id)
+        state_copy.__assigned_trip_by_id = \
+            self.__get_non_complete_trips(state_copy.__assigned_trip_by_id)
+
+        # The State does not use the legs index. Copying it would copy the
+        # legs of the complete trips as well.
+        state_copy.__leg_by_id = {}
+
+        # Only the modifications of the trips and the routes that are part
+        # of the state are kept.
+        state_copy.__modified_trip_by_id = \
+            {trip_id: trip for trip_id, trip
+             in self.__modified_trip_by_id.items()
+             if trip_id in state_copy.__trip_by_id}
+        state_copy.__modified_leg_by_id = \
+            {leg_id: leg for leg_id, leg in self.__modified_leg_by_id.items()
+             if leg.trip is not None
+             and leg.trip.id in state_copy.__trip_by_id}
+        state_copy.__modified_route_by_vehicle_id = \
+            {vehicle_id: route for vehicle_id, route
+             in self.__modified_route_by_vehicle_id.items()
+             if vehicle_id in state_copy.__vehicle_by_id}
+
+        # Only the trips and the vehicles that were modified since the last
+        # state (or that refer to a modified trip or vehicle) are copied. The
+        # copies of the other ones are reused. The vehicles are copied once
+        # and shared by State.vehicles, the routes and the assigned legs.
+        modified_trip_ids = set(self.__modified_trip_by_id)
+        modified_trip_ids.update(leg.trip.id for leg
+                                 in self.__modified_leg_by_id.values()
+                                 if leg.trip is not None)
+        memo = self.__state_copy_cache.get_memo(
+            state_copy.__trip_by_id, state_copy.__routes_by_vehicle_id,
+            modified_trip_ids, self.__modified_route_by_vehicle_id)
+        state_deepcopy = state_module.State(copy.deepcopy(state_copy, memo))
+        self.__state_copy_cache.update(memo, state_copy.__trip_by_id,
+                                       state_copy.__routes_by_vehicle_id)
+
+        # The next state will only contain the modifications that occur
+        # from now on.
+        self.__modified_trip_by_id = {}
+        self.__modified_leg_by_id = {}
+        self.__modified_route_by_vehicle_id = {}
 
         return state_deepcopy
 
-    def __get_non_complete_vehicles(self, vehicles):
-        non_complete_vehicles = []
-        for vehicle in vehicles:
+    def __get_non_complete_vehicles(self, vehicle_by_id):
+        non_complete_vehicle_by_id = {}
+        for vehicle_id, vehicle in vehicle_by_id.items():
             if vehicle.status != VehicleStatus.COMPLETE:
-                veh_copy = copy.copy(vehicle)
-                veh_copy.polylines = None
-                non_complete_vehicles.append(veh_copy)
-        return non_complete_vehicles
-
-    def __get_non_complete_trips(self, trips):
-        non_complete_trips = []
-        for trip in trips:
+                non_complete_vehicle_by_id[vehicle_id] = vehicle
+        return non_complete_vehicle_by_id
+
+    def __get_non_complete_trips(self, trip_by_id):
+        non_complete_trip_by_id = {}
+        for trip_id, trip in trip_by_id.items():
             if trip.status != PassengerStatus.COMPLETE:
-                non_complete_trips.append(trip)
-        return non_complete_trips
+                non_complete_trip_by_id[trip_id] = trip
+        return non_complete_trip_by_id
+
+    def __get_trip_legs(self, trip):
+        legs = list(trip.previous_legs)
+        if trip.current_leg is not None:
+            legs.append(trip.current_leg)
+        if trip.next_legs is not None:
+            legs.extend(trip.next_legs)
+        return legs
 
     @property
     def network(self) -> Optional[Any]:
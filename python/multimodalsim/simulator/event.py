@@ -14,7 +14,14 @@ logger = logging.getLogger(__name__)
 class Event:
     """An event with event_number occurs at a specific time ``event_time``
     and involves a specific event type ``event_type``. Comparing two events
-    amounts to figuring out which event occurs first """
+    amounts to figuring out which event occurs first.
+
+    The order of the events is given by their sort key, i.e., the tuple
+    (time, priority, index), where index is the insertion number of the event
+    in the queue. The sort key is recomputed only when the time or the index
+    of the event is modified, so that the queue can compare events natively
+    through their keys. Events with the same time and priority are processed
+    in the order in which they were added to the queue (FIFO). """
 
     MAX_PRIORITY = 1000
     VERY_LOW_PRIORITY = 7
@@ -39,6 +46,7 @@ class Event:
                 "{})".format(self.name, event_time,
                              self.queue.env.current_time))
         elif event_time > self.MAX_DELTA_TIME:
+            self.__time = event_time
             logger.warning(
                 "WARNING: {}: event_time ({}) is much larger than "
                 "current_time ({})".format(self.name, event_time,
@@ -57,6 +65,8 @@ class Event:
 
         self.__priority = 1 - 1 / (1 + event_priority)
 
+        self.__update_sort_key()
+
         self.__cancelled = False
 
     @property
@@ -74,6 +84,7 @@ class Event:
     @time.setter
     def time(self, time: float) -> None:
         self.__time = time
+        self.__update_sort_key()
 
     @property
     def priority(self) -> float:
@@ -86,6 +97,11 @@ class Event:
     @index.setter
     def index(self, index: int) -> None:
         self.__index = index
+        self.__update_sort_key()
+
+    @property
+    def sort_key(self) -> tuple[float, float, Optional[int]]:
+        return self.__sort_key
 
     @property
     def cancelled(self) -> bool:
@@ -110,28 +126,32 @@ class Event:
 
     def __lt__(self, other: 'Event') -> bool:
         """ Returns True if self.time < other.time or self.time == other.time
-        and self.priority < other.priority"""
-        result = False
-        if self.time < other.time:
-            result = True
-        elif self.time == other.time and self.priority < other.priority:
-            result = True
-
-        return result
+        and self.priority < other.priority. If both events have the same time
+        and priority, the event that was added to the queue first is the
+        smallest one."""
+        self_key = self.__sort_key
+        other_key = other.sort_key
+        if self_key[2] is None or other_key[2] is None:
+            # At least one of the events has not been added to the queue yet.
+            return self_key[:2] < other_key[:2]
+        return self_key < other_key
 
     def __eq__(self, other: 'Event') -> bool:
-        """ Returns True if self.time + self.priority
-        == other.time + other.priority"""
-        # return self.time + self.priority == other.time + other.priority
-        result = False
-        if self.time == other.time and self.priority == other.priority:
-            result = True
-
-        return result
+        """ Returns True if self.time == other.time and self.priority
+        == other.priority and, if both events were added to the queue, they
+        have the same index (i.e., the order is consistent with __lt__)."""
+        self_key = self.__sort_key
+        other_key = other.sort_key
+        if self_key[2] is None or other_key[2] is None:
+            return self_key[:2] == other_key[:2]
+        return self_key == other_key
 
     def add_to_queue(self) -> None:
         self.queue.put(self)
 
+    def __update_sort_key(self):
+        self.__sort_key = (self.__time, self.__priority, self.__index)
+
 
 class ActionEvent(Event):
 
@@ -1,79 +1,187 @@
-from queue import PriorityQueue
-from typing import Type, Optional, Any
+import heapq
+import threading
+from collections import deque
+from typing import Type, Optional, Any, Iterator
 
 import multimodalsim.simulator.event as event_module
 import multimodalsim.simulator.environment as environment
 
 
 class EventQueue:
+    """The ``EventQueue`` class is a binary heap of events ordered by their
+    sort key (time, priority, index), where index is the insertion number of
+    the event. Events of equal time and priority are therefore popped in the
+    order in which they were added to the queue.
+
+    Two secondary indexes are maintained alongside the heap:
+        - events by (event class, owner of the state machine)
+        - events by (event class, time)
+    so that looking for or cancelling the events of a given type does not
+    require a scan of the whole queue.
+
+    Cancelled events are removed from the secondary indexes immediately,
+    but they stay in the heap (lazy deletion) until they reach the top of
+    the heap, at which point they are popped like any other event.
+
+    The queue is not protected by a lock. Events added from a thread other
+    than the one that created the queue (e.g., the thread that waits for the
+    result of an asynchronous optimization) are put in a thread-safe inbox
+    that is emptied into the heap by the thread of the simulation.
+    """
+
     def __init__(self, env: 'environment.Environment') -> None:
-        self.__queue = PriorityQueue()
+        self.__queue = []
 
         self.__index = 0
 
         self.__env = env
 
+        # {event class: {id(owner): {id(event): event}}}
+        self.__events_by_type_and_owner = {}
+        # {event class: {time: {id(event): event}}}
+        self.__events_by_type_and_time = {}
+
+        self.__thread_id = threading.get_ident()
+        self.__inbox = deque()
+
     @property
     def env(self) -> 'environment.Environment':
         return self.__env
 
     def is_empty(self) -> bool:
         """check if the queue is empty"""
-        return self.__queue.empty()
+        self.__empty_inbox()
+        return len(self.__queue) == 0
 
     def put(self, event: 'event_module.Event') -> None:
         """add an element in the queue"""
-        event.index = self.__index
-        self.__queue.put(event)
-        self.__index += 1
+        if threading.get_ident() != self.__thread_id:
+            # deque.append is thread-safe.
+            self.__inbox.append(event)
+        else:
+            self.__empty_inbox()
+            self.__push(event)
 
     def pop(self) -> 'event_module.Event':
         """pop an element based on Priority time"""
-        return self.__queue.get()
+        self.__empty_inbox()
+        event = heapq.heappop(self.__queue)[1]
+        self.__remove_from_indexes(event)
+        return event
 
     def is_event_type_in_queue(
             self, event_type: Type['event_module.Event'],
             time: Optional[float] = None, owner: Optional[Any] = None) -> bool:
-        is_in_queue = False
-        for event in self.__queue.queue:
-            if owner is not None \
-                    and isinstance(event, event_module.ActionEvent) \
-                    and event.state_machine.owner == owner \
-                    and self.__is_event_looked_for(event, event_type, time):
-                is_in_queue = True
-                break
-            elif owner is None \
-                    and self.__is_event_looked_for(event, event_type, time):
-                is_in_queue = True
-                break
-
-        return is_in_queue
+        self.__empty_inbox()
+        return next(self.__find_events(event_type, time, owner),
+                    None) is not None
+
+    def get_events(self, event_type: Type['event_module.Event'],
+                   time: Optional[float] = None,
+                   owner: Optional[Any] = None) \
+            -> list['event_module.Event']:
+        """Return the events of type event_type (or of one of its
+        subclasses) that are in the queue and that were not cancelled,
+        optionally restricted to a time and to the owner of their state
+        machine. The events are returned in the order of the queue."""
+        self.__empty_inbox()
+        events = list(self.__find_events(event_type, time, owner))
+        return sorted(events, key=lambda x: x.sort_key)
 
     def cancel_event_type(self, event_type: Type['event_module.Event'],
                           time: Optional[float] = None,
                           owner: Optional[Any] = None) -> None:
-        events_to_be_cancelled = []
-        for event in self.__queue.queue:
-            if owner is not None \
-                    and isinstance(event, event_module.ActionEvent) \
-                    and event.state_machine.owner == owner \
-                    and self.__is_event_looked_for(event, event_type, time):
-                events_to_be_cancelled.append(event)
-            elif owner is None \
-                    and self.__is_event_looked_for(event, event_type, time):
-                events_to_be_cancelled.append(event)
+        self.__empty_inbox()
+        events_to_be_cancelled = list(
+            self.__find_events(event_type, time, owner))
 
         self.cancel_events(events_to_be_cancelled)
 
     def cancel_events(self, events: list['event_module.Event']) -> None:
         for event in events:
             event.cancelled = True
+            self.__remove_from_indexes(event)
+
+    def __push(self, event):
+        # The sort key of an event is unique once its index is set, so the
+        # heap never falls back on comparing the events themselves.
+        event.index = self.__index
+        heapq.heappush(self.__queue, (event.sort_key, event))
+        self.__index += 1
+        self.__add_to_indexes(event)
+
+    def __empty_inbox(self):
+        while self.__inbox:
+            self.__push(self.__inbox.popleft())
+
+    def __add_to_indexes(self, event):
+        event_type = event.__class__
+
+        events_by_time = self.__events_by_type_and_time.setdefault(
+            event_type, {})
+        events_by_time.setdefault(event.time, {})[id(event)] = event
+
+        owner_key = self.__get_owner_key(event)
+        if owner_key is not None:
+            events_by_owner = self.__events_by_type_and_owner.setdefault(
+                event_type, {})
+            events_by_owner.setdefault(owner_key, {})[id(event)] = event
+
+    def __remove_from_indexes(self, event):
+        event_type = event.__class__
+
+        self.__remove_from_index(self.__events_by_type_and_time, event_type,
+                                 event.time, event)
+
+        owner_key = self.__get_owner_key(event)
+        if owner_key is not None:
+            self.__remove_from_index(self.__events_by_type_and_owner,
+                                     event_type, owner_key, event)
+
+    def __remove_from_index(self, index, event_type, key, event):
+        # Empty buckets are deleted so that the presence of a key means that
+        # at least one event corresponds to it.
+        events_by_key = index.get(event_type)
+        if events_by_key is None or key not in events_by_key:
+            return
+
+        events = events_by_key[key]
+        events.pop(id(event), None)
+        if len(events) == 0:
+            del events_by_key[key]
+            if len(events_by_key) == 0:
+                del index[event_type]
+
+    def __find_events(self, event_type, time, owner) \
+            -> Iterator['event_module.Event']:
+        # The indexes are keyed by the exact class of the events, so the
+        # subclasses of event_type have to be looked up as well.
+        event_classes = [event_class for event_class
+                         in self.__events_by_type_and_time
+                         if issubclass(event_class, event_type)]
+
+        for event_class in event_classes:
+            if owner is not None:
+                events_by_owner = \
+                    self.__events_by_type_and_owner.get(event_class, {})
+                for event in list(events_by_owner.get(id(owner), {})
+                                  .values()):
+                    if time is None or event.time == time:
+                        yield event
+            elif time is not None:
+                events_by_time = \
+                    self.__events_by_type_and_time.get(event_class, {})
+                yield from list(events_by_time.get(time, {}).values())
+            else:
+                events_by_time = \
+                    self.__events_by_type_and_time.get(event_class, {})
+                for events in list(events_by_time.values()):
+                    yield from list(events.values())
 
-    def __is_event_looked_for(self, event, event_type, time):
-        is_event = False
-        if time is not None and event.time == time \
-                and isinstance(event, event_type):
-            is_event = True
-        elif time is None and isinstance(event, event_type):
-            is_event = True
-        return is_event
+    @staticmethod
+    def __get_owner_key(event):
+        owner_key = None
+        if isinstance(event, event_module.ActionEvent) \
+                and event.state_machine is not None:
+            owner_key = id(event.state_machine.owner)
+        return owner_key
@@ -2,9 +2,8 @@ import logging
 import time
 from threading import Thread, Condition
 import multiprocessing as mp
-from typing import Optional, Callable
+from typing import Optional
 
-from multimodalsim.optimization.state import State
 from multimodalsim.simulator.event import ActionEvent, TimeSyncEvent
 import multimodalsim.simulator.vehicle as vehicle_module
 
@@ -88,6 +87,8 @@ class Optimize(ActionEvent):
 
         env.optimization.state.unfreeze_routes_for_time_interval(
             env.optimization.freeze_interval)
+        env.invalidate_state_copies(
+            vehicle_ids=env.optimization.state.frozen_vehicle_ids)
 
         EnvironmentUpdate(optimization_result, self.queue).add_to_queue()
 
@@ -108,54 +109,37 @@ class Optimize(ActionEvent):
         env.optimization.state.freeze_routes_for_time_interval(
             env.optimization.freeze_interval)
 
-        with mp.Manager() as manager:
-            process_dict = self.__create_process_dict(env, manager)
-
-            opt_process = self.__create_optimize_process(process_dict,
-                                                         hold_event)
-            opt_process.start()
-            opt_process.join()
-
-            self.__create_environment_update(process_dict, hold_event)
-
-        env.optimization.state.unfreeze_routes_for_time_interval(
-            env.optimization.freeze_interval)
-
-        with env.optimize_cv:
-            env.optimize_cv.notify()
-
-    def __create_process_dict(self, env, manager):
-
-        process_dict = manager.dict()
-        process_dict["state"] = env.optimization.state
-        process_dict["dispatch_function"] = env.optimization.dispatch
-        process_dict["optimization_result"] = None
-
-        return process_dict
-
-    def __create_optimize_process(self, process_dict, hold_event):
-        opt_process = DispatchProcess(dispatch=Optimize.dispatch,
-                                      process_dict=process_dict)
-        with hold_event.cv:
-            hold_event.optimization_process = opt_process
-
-        return opt_process
+        worker_pool = env.optimization.dispatch_worker_pool
+        worker = worker_pool.acquire()
+        try:
+            with hold_event.cv:
+                hold_event.optimization_process = worker.process
+
+            optimization_result = worker.dispatch(env.optimization.state)
+
+            # The state is restored before the simulation is resumed, since
+            # the next state may reuse its copies.
+            env.optimization.state.unfreeze_routes_for_time_interval(
+                env.optimization.freeze_interval)
+            env.invalidate_state_copies(
+                vehicle_ids=env.optimization.state.frozen_vehicle_ids)
+
+            self.__create_environment_update(optimization_result, hold_event)
+        finally:
+            # Even if the optimization failed, the worker is made available
+            # again and the simulation is notified, so that the next
+            # optimization does not wait forever.
+            worker_pool.release(worker)
+            with env.optimize_cv:
+                env.optimize_cv.notify()
 
-    def __create_environment_update(self, process_dict, hold_event):
+    def __create_environment_update(self, optimization_result, hold_event):
         with hold_event.cv:
             hold_event.cancelled = True
-            optimization_result = process_dict["optimization_result"]
             EnvironmentUpdate(optimization_result,
                               self.queue).add_to_queue()
             hold_event.cv.notify()
 
-    @staticmethod
-    def dispatch(dispatch_function: Callable,
-                 state: State) -> 'optimization_module.OptimizationResult':
-        optimization_result = dispatch_function(state)
-
-        return optimization_result
-
     def __load_parameters_from_config(self, optimization,
                                       multiple_optimize_events, batch,
                                       max_optimization_time, asynchronous):
@@ -185,6 +169,12 @@ class EnvironmentUpdate(ActionEvent):
 
     def _process(self, env: 'environment.Environment') -> str:
 
+        # The optimization may have modified the copies of these trips and
+        # vehicles in the state.
+        env.invalidate_state_copies(
+            [trip.id for trip in self.__optimization_result.modified_requests],
+            [veh.id for veh in self.__optimization_result.modified_vehicles])
+
         for trip in self.__optimization_result.modified_requests:
             next_legs = trip.next_legs
             next_leg_assigned_vehicle = trip.next_legs[0].assigned_vehicle
@@ -256,11 +246,12 @@ class Hold(TimeSyncEvent):
         return self.__cv
 
     @property
-    def optimization_process(self) -> 'DispatchProcess':
+    def optimization_process(self) -> Optional[mp.Process]:
         return self.__optimization_process
 
     @optimization_process.setter
-    def optimization_process(self, optimization_process: 'DispatchProcess'):
+    def optimization_process(self,
+                             optimization_process: Optional[mp.Process]):
         self.__optimization_process = optimization_process
 
     def _synchronize(self) -> None:
@@ -280,17 +271,3 @@ class Hold(TimeSyncEvent):
                 self.__optimization_process.kill()
             raise RuntimeError("Optimization exceeded the time limit of {} "
                                "seconds.".format(self.__max_optimization_time))
-
-
-class DispatchProcess(mp.Process):
-    def __init__(self, dispatch: Callable, process_dict: dict) -> None:
-        super().__init__()
-        self.__dispatch = dispatch
-        self.__process_dict = process_dict
-
-    def run(self) -> None:
-        state = self.__process_dict["state"]
-        dispatch_function = self.__process_dict["dispatch_function"]
-
-        optimization_result = self.__dispatch(dispatch_function, state)
-        self.__process_dict["optimization_result"] = optimization_result
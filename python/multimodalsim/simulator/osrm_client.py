@@ -0,0 +1,223 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class OSRMClient:
+    """The ``OSRMClient`` class sends route requests to an OSRM server and
+    caches the responses, so that the geometry of a route that was already
+    requested is not requested again.
+
+    The HTTP connections are kept open and reused from one request to the
+    next (requests.Session), and the requests are sent by a pool of at most
+    max_workers threads, so that the routes of many vehicles can be requested
+    concurrently (see submit and get_routes). A route requested while the
+    same route is being requested is not requested twice.
+
+    A response is identified by a key that is a hash of the ordered sequence
+    of the coordinates of the route. The successful responses are kept in
+    memory in a least recently used (LRU) cache of at most cache_size
+    responses and, if cache_folder is not None, they are also saved in
+    cache_folder (one JSON file per response), so that they can be reused
+    from one simulation to the next.
+        Properties
+        ----------
+        url: str
+            The URL of the OSRM server.
+        cache_folder: str or None
+            Path to the folder that contains the cached responses.
+        nb_requests: int
+            The number of requests sent to the OSRM server.
+    """
+
+    FORMAT_VERSION = 1
+
+    SERVICE_URL = "route/v1/driving/"
+    ARGS_URL = "?annotations=true&overview=full"
+
+    def __init__(self, url: str, max_workers: int = 8,
+                 cache_size: int = 1024, cache_folder: Optional[str] = None,
+                 timeout: Optional[float] = None) -> None:
+        """
+        Parameters:
+            url: str
+                The URL of the OSRM server.
+            max_workers: int
+                The maximum number of requests sent concurrently.
+            cache_size: int
+                The maximum number of responses kept in memory.
+            cache_folder: str or None
+                Path to the folder in which the responses are saved. If None,
+                the responses are only kept in memory.
+            timeout: float or None
+                The number of seconds to wait for the server to respond. If
+                None, wait forever.
+        """
+        self.__url = url
+        self.__cache_size = cache_size
+        self.__cache_folder = cache_folder
+        self.__timeout = timeout
+
+        self.__session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max_workers)
+        self.__session.mount("http://", adapter)
+        self.__session.mount("https://", adapter)
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers,
+                                             thread_name_prefix="OSRMClient")
+
+        self.__lock = threading.Lock()
+        self.__response_by_key = OrderedDict()
+        self.__future_by_key = {}
+        self.__nb_requests = 0
+
+    @property
+    def url(self) -> str:
+        return self.__url
+
+    @property
+    def cache_folder(self) -> Optional[str]:
+        return self.__cache_folder
+
+    @property
+    def nb_requests(self) -> int:
+        return self.__nb_requests
+
+    def get_key(self, coordinates: list[tuple[float, float]]) -> str:
+        """Return the key of the route that goes through the coordinates
+        (lon, lat), in that order."""
+        key_hash = hashlib.sha256()
+        key_hash.update(str(self.FORMAT_VERSION).encode())
+        key_hash.update(self.ARGS_URL.encode())
+        key_hash.update(self.__get_coordinates_url(coordinates).encode())
+
+        return key_hash.hexdigest()
+
+    def submit(self, coordinates: list[tuple[float, float]]) -> Future:
+        """Request the route that goes through the coordinates (lon, lat), in
+        that order, in a thread of the pool.
+
+        Input:
+          -coordinates: The coordinates of the stops of the route.
+
+        Output:
+          -future: A Future whose result is the response of the OSRM server
+           (a dict). The response must not be modified, since it may be
+           shared with other requests.
+        """
+        key = self.get_key(coordinates)
+        with self.__lock:
+            if key in self.__response_by_key:
+                self.__response_by_key.move_to_end(key)
+                future = Future()
+                future.set_result(self.__response_by_key[key])
+            elif key in self.__future_by_key:
+                future = self.__future_by_key[key]
+            else:
+                future = self.__executor.submit(self.__get_response, key,
+                                                coordinates)
+                self.__future_by_key[key] = future
+
+        return future
+
+    def get_route(self, coordinates: list[tuple[float, float]]) -> dict:
+        """Return the response of the OSRM server to the request of the
+        route that goes through the coordinates (see submit)."""
+        return self.submit(coordinates).result()
+
+    def get_routes(self, coordinates_list: list[list[tuple[float, float]]]) \
+            -> list[dict]:
+        """Request the routes that go through each list of coordinates
+        concurrently and return the responses in the same order (see
+        submit)."""
+        futures = [self.submit(coordinates)
+                   for coordinates in coordinates_list]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        """Wait for the requests in progress and close the connections."""
+        self.__executor.shutdown()
+        self.__session.close()
+
+    def __get_response(self, key, coordinates):
+        try:
+            response = self.__load(key)
+            if response is None:
+                response = self.__request(coordinates)
+                if response.get('code') == 'Ok':
+                    self.__save(key, response)
+
+            if response.get('code') == 'Ok':
+                with self.__lock:
+                    self.__response_by_key[key] = response
+                    while len(self.__response_by_key) > self.__cache_size:
+                        self.__response_by_key.popitem(last=False)
+        finally:
+            with self.__lock:
+                self.__future_by_key.pop(key, None)
+
+        return response
+
+    def __request(self, coordinates):
+        request_url = self.__url + self.SERVICE_URL \
+            + self.__get_coordinates_url(coordinates) + self.ARGS_URL
+
+        with self.__lock:
+            self.__nb_requests += 1
+        response = self.__session.get(request_url, timeout=self.__timeout)
+        res = response.json()
+
+        if res.get('code') != 'Ok':
+            logger.warning(request_url)
+            logger.warning(res)
+
+        return res
+
+    def __load(self, key):
+        if self.__cache_folder is None:
+            return None
+
+        file_path = self.__get_file_path(key)
+        if not os.path.isfile(file_path):
+            return None
+
+        with open(file_path) as f:
+            return json.load(f)
+
+    def __save(self, key, response):
+        if self.__cache_folder is None:
+            return
+
+        # The response is first written in a temporary file, which is then
+        # renamed, so that a response that is only partially written is
+        # never loaded.
+        file_path = self.__get_file_path(key)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        file_descriptor, temporary_file_path = tempfile.mkstemp(
+            dir=os.path.dirname(file_path), suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, 'w') as f:
+                json.dump(response, f)
+            os.replace(temporary_file_path, file_path)
+        except OSError:
+            logger.warning("The OSRM response {} could not be saved."
+                           .format(key))
+            if os.path.exists(temporary_file_path):
+                os.remove(temporary_file_path)
+
+    def __get_file_path(self, key):
+        return os.path.join(self.__cache_folder, key[:2], key + ".json")
+
+    @staticmethod
+    def __get_coordinates_url(coordinates):
+        return ";".join(str(lon) + "," + str(lat) for lon, lat in coordinates)
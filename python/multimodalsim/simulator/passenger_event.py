@@ -17,6 +17,7 @@ class PassengerRelease(Event):
                  queue: 'event_queue.EventQueue') -> None:
         super().__init__('PassengerRelease', queue, trip.release_time)
         self.__trip = trip
+        self.__legs = None
 
     @property
     def trip(self) -> 'request.Trip':
@@ -27,14 +28,37 @@ class PassengerRelease(Event):
         env.add_non_assigned_trip(self.__trip)
 
         if self.__trip.current_leg is None:
-            legs = env.optimization.split(self.__trip, env)
+            if self.__legs is None:
+                self.__split_trips_released_at_same_time(env)
+            legs = self.__legs
             self.__trip.assign_legs(legs)
+            for leg in legs:
+                env.add_leg(leg)
+
+        env.add_modified_trip(self.__trip)
+        for leg in self.__trip.next_legs:
+            env.add_modified_leg(leg)
 
         optimization_event_process.Optimize(
             env.current_time, self.queue).add_to_queue()
 
         return 'Passenger Release process is implemented'
 
+    def __split_trips_released_at_same_time(self, env):
+        # The trips of all the PassengerRelease events that are still in the
+        # queue at the same time are split together, so that the splitter can
+        # share its work between them. Their legs are kept in the events
+        # until the events are processed.
+        release_events = [self] + [
+            event for event
+            in self.queue.get_events(PassengerRelease, self.time)
+            if event.__legs is None and event.trip.current_leg is None]
+
+        legs_by_trip = env.optimization.split_batch(
+            [event.trip for event in release_events], env)
+        for event, legs in zip(release_events, legs_by_trip):
+            event.__legs = legs
+
 
 class PassengerAssignment(ActionEvent):
     def __init__(self, passenger_update: 'request.PassengerUpdate',
@@ -60,6 +84,10 @@ class PassengerAssignment(ActionEvent):
         env.remove_non_assigned_trip(self.__trip.id)
         env.add_assigned_trip(self.__trip)
 
+        env.add_modified_trip(self.__trip)
+        for leg in self.__trip.next_legs:
+            env.add_modified_leg(leg)
+
         PassengerReady(self.__trip, self.queue).add_to_queue()
 
         return 'Passenger Assignment process is implemented'
@@ -84,6 +112,8 @@ class PassengerReady(ActionEvent):
         self.__trip = trip
 
     def _process(self, env: 'environment.Environment') -> str:
+        env.add_modified_trip(self.__trip)
+
         return 'Passenger Ready process is implemented'
 
 
@@ -99,6 +129,9 @@ class PassengerToBoard(ActionEvent):
         self.__trip.start_next_leg()
         self.__trip.current_leg.boarding_time = env.current_time
 
+        env.add_modified_trip(self.__trip)
+        env.add_modified_leg(self.__trip.current_leg)
+
         VehicleBoarded(self.__trip, self.queue).add_to_queue()
 
         return 'Passenger To Board process is implemented'
@@ -115,6 +148,9 @@ class PassengerAlighting(ActionEvent):
 
         self.__trip.current_leg.alighting_time = env.current_time
 
+        env.add_modified_trip(self.__trip)
+        env.add_modified_leg(self.__trip.current_leg)
+
         VehicleAlighted(self.__trip.current_leg, self.queue).add_to_queue()
 
         self.__trip.finish_current_leg()
@@ -56,22 +56,28 @@ class Simulation:
         max_time = self.__max_time if max_time is None else max_time
 
         # main loop of the simulation
-        while not self.__queue.is_empty():
+        try:
+            while not self.__queue.is_empty():
 
-            current_event = self.__queue.pop()
+                current_event = self.__queue.pop()
 
-            self.__env.current_time = current_event.time
+                self.__env.current_time = current_event.time
 
-            if max_time is not None and self.__env.current_time > max_time:
-                break
+                if max_time is not None \
+                        and self.__env.current_time > max_time:
+                    break
 
-            self.__visualize_environment(current_event, current_event.index,
-                                         current_event.priority)
+                self.__visualize_environment(current_event,
+                                             current_event.index,
+                                             current_event.priority)
 
-            process_event = current_event.process(self.__env)
-            logger.debug("process_event: {}".format(process_event))
-            self.__collect_data(current_event, current_event.index,
-                                current_event.priority)
+                process_event = current_event.process(self.__env)
+                logger.debug("process_event: {}".format(process_event))
+                self.__collect_data(current_event, current_event.index,
+                                    current_event.priority)
+        finally:
+            # The worker processes are stopped even if an event fails.
+            self.__env.optimization.close()
 
         logger.info("\n***************\nEND OF SIMULATION\n***************")
         self.__visualize_environment()
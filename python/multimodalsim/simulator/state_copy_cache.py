@@ -0,0 +1,247 @@
+from typing import Iterable, Optional
+
+import multimodalsim.simulator.request as request
+import multimodalsim.simulator.vehicle as vehicle_module
+
+TRIP = "trip"
+VEHICLE = "vehicle"
+
+
+class StateCopyCache:
+    """The ``StateCopyCache`` class keeps the copies of the trips and the
+    vehicles made for the last State so that the next State only copies the
+    trips and the vehicles that were modified in the meantime.
+
+    The copies are grouped in units: a trip unit contains the copy of a trip
+    and of its legs, and a vehicle unit contains the copy of a vehicle and of
+    its route (with its stops and its legs). A unit is copied again if its
+    trip or its vehicle was modified, or if it refers to a unit that is
+    copied again (e.g., the route of a vehicle refers to the trips that
+    board it and the legs of a trip refer to their assigned vehicle), so that
+    a reused copy never refers to an outdated copy. The other units are
+    reused by seeding the memo of copy.deepcopy with their copies.
+        Properties
+        ----------
+        nb_copied_trips: int
+            The number of trips that were copied for the last State.
+        nb_reused_trips: int
+            The number of trip copies reused by the last State.
+        nb_copied_vehicles: int
+            The number of vehicles that were copied for the last State.
+        nb_reused_vehicles: int
+            The number of vehicle copies reused by the last State.
+    """
+
+    def __init__(self) -> None:
+        # The units of the last State (key: (TRIP or VEHICLE, id), value:
+        # _Unit).
+        self.__unit_by_key = {}
+        # The keys of the units that refer to each unit.
+        self.__referring_keys_by_key = {}
+        # The keys of the units whose copies were modified after the last
+        # State was created.
+        self.__invalid_keys = set()
+        self.__dirty_keys = set()
+
+        self.__nb_copied_trips = 0
+        self.__nb_reused_trips = 0
+        self.__nb_copied_vehicles = 0
+        self.__nb_reused_vehicles = 0
+
+    @property
+    def nb_copied_trips(self) -> int:
+        return self.__nb_copied_trips
+
+    @property
+    def nb_reused_trips(self) -> int:
+        return self.__nb_reused_trips
+
+    @property
+    def nb_copied_vehicles(self) -> int:
+        return self.__nb_copied_vehicles
+
+    @property
+    def nb_reused_vehicles(self) -> int:
+        return self.__nb_reused_vehicles
+
+    def invalidate(self, trip_ids: Iterable[str | int] = (),
+                   vehicle_ids: Iterable[str | int] = ()) -> None:
+        """Records that the copies of some trips and vehicles of the last
+        State were modified after the State was created (e.g., by the
+        optimization), so that they are not reused by the next State.
+            Input:
+                -trip_ids: the ids of the trips whose copies were modified.
+                -vehicle_ids: the ids of the vehicles whose copies (or the
+                 copies of their routes) were modified."""
+        self.__invalid_keys.update((TRIP, trip_id) for trip_id in trip_ids)
+        self.__invalid_keys.update((VEHICLE, vehicle_id)
+                                   for vehicle_id in vehicle_ids)
+
+    def get_memo(self, trip_by_id: dict[str | int, 'request.Trip'],
+                 route_by_vehicle_id: dict[str | int,
+                                           'vehicle_module.Route'],
+                 modified_trip_ids: Iterable[str | int],
+                 modified_vehicle_ids: Iterable[str | int]) -> dict:
+        """Returns a memo for copy.deepcopy that contains the copies of the
+        last State that can be reused by the new State.
+            Input:
+                -trip_by_id: the trips of the new State.
+                -route_by_vehicle_id: the routes of the vehicles of the new
+                 State.
+                -modified_trip_ids: the ids of the trips modified since the
+                 last State was created.
+                -modified_vehicle_ids: the ids of the vehicles whose routes
+                 were modified since the last State was created.
+            Output:
+                -memo: dictionary associating the id of an object with its
+                 copy."""
+        dirty_keys = set(self.__invalid_keys)
+        dirty_keys.update((TRIP, trip_id) for trip_id in modified_trip_ids)
+        dirty_keys.update((VEHICLE, vehicle_id)
+                          for vehicle_id in modified_vehicle_ids)
+
+        # The trips and the routes that were replaced by other objects with
+        # the same id cannot be reused either.
+        for trip_id, trip in trip_by_id.items():
+            unit = self.__unit_by_key.get((TRIP, trip_id))
+            if unit is not None and unit.original is not trip:
+                dirty_keys.add((TRIP, trip_id))
+        for vehicle_id, route in route_by_vehicle_id.items():
+            unit = self.__unit_by_key.get((VEHICLE, vehicle_id))
+            if unit is not None and (unit.original is not route.vehicle
+                                     or unit.route is not route):
+                dirty_keys.add((VEHICLE, vehicle_id))
+
+        keys_to_visit = list(dirty_keys)
+        while len(keys_to_visit) > 0:
+            key = keys_to_visit.pop()
+            for referring_key in self.__referring_keys_by_key.get(key, ()):
+                if referring_key not in dirty_keys:
+                    dirty_keys.add(referring_key)
+                    keys_to_visit.append(referring_key)
+
+        memo = {}
+        for key, unit in self.__unit_by_key.items():
+            if key in dirty_keys:
+                continue
+            for original, original_copy in unit.copy_by_original:
+                memo[id(original)] = original_copy
+            if key[0] == VEHICLE:
+                # The updates of the positions of the vehicles are not
+                # recorded as modifications.
+                unit.copy.position = unit.original.position
+
+        self.__dirty_keys = dirty_keys
+
+        return memo
+
+    def update(self, memo: dict,
+               trip_by_id: dict[str | int, 'request.Trip'],
+               route_by_vehicle_id: dict[str | int,
+                                         'vehicle_module.Route']) -> None:
+        """Replaces the units of the last State with the units of the new
+        State.
+            Input:
+                -memo: the memo of copy.deepcopy after the new State was
+                 copied.
+                -trip_by_id: the trips of the new State.
+                -route_by_vehicle_id: the routes of the vehicles of the new
+                 State."""
+        unit_by_key = {}
+        nb_reused_trips = 0
+        nb_reused_vehicles = 0
+
+        objects_to_visit = [(TRIP, trip) for trip in trip_by_id.values()]
+        objects_to_visit.extend((VEHICLE, route.vehicle)
+                                for route in route_by_vehicle_id.values())
+        while len(objects_to_visit) > 0:
+            unit_type, original = objects_to_visit.pop()
+            key = (unit_type, original.id)
+            if key in unit_by_key:
+                continue
+
+            unit = self.__unit_by_key.get(key)
+            if unit is not None and key not in self.__dirty_keys:
+                if unit_type == TRIP:
+                    nb_reused_trips += 1
+                else:
+                    nb_reused_vehicles += 1
+            elif unit_type == TRIP:
+                unit = self.__create_trip_unit(original, memo)
+            else:
+                unit = self.__create_vehicle_unit(
+                    original, route_by_vehicle_id.get(original.id), memo)
+
+            unit_by_key[key] = unit
+            objects_to_visit.extend(unit.referred_objects)
+
+        referring_keys_by_key = {}
+        for key, unit in unit_by_key.items():
+            for unit_type, referred_object in unit.referred_objects:
+                referring_keys_by_key.setdefault(
+                    (unit_type, referred_object.id), set()).add(key)
+
+        trip_keys = [key for key in unit_by_key if key[0] == TRIP]
+        self.__nb_copied_trips = len(trip_keys) - nb_reused_trips
+        self.__nb_reused_trips = nb_reused_trips
+        self.__nb_copied_vehicles = \
+            len(unit_by_key) - len(trip_keys) - nb_reused_vehicles
+        self.__nb_reused_vehicles = nb_reused_vehicles
+
+        self.__unit_by_key = unit_by_key
+        self.__referring_keys_by_key = referring_keys_by_key
+        self.__invalid_keys = set()
+        self.__dirty_keys = set()
+
+    def __create_trip_unit(self, trip, memo):
+        legs = list(trip.previous_legs)
+        if trip.current_leg is not None:
+            legs.append(trip.current_leg)
+        if trip.next_legs is not None:
+            legs.extend(trip.next_legs)
+
+        referred_objects = [(VEHICLE, leg.assigned_vehicle) for leg in legs
+                            if leg.assigned_vehicle is not None]
+
+        return _Unit(trip, memo, legs, referred_objects)
+
+    def __create_vehicle_unit(self, vehicle, route, memo):
+        stops = [vehicle.start_stop]
+        legs = []
+        if route is not None:
+            stops.append(route.current_stop)
+            stops.extend(route.next_stops)
+            legs.extend(route.onboard_legs)
+            legs.extend(route.assigned_legs)
+
+        referred_objects = []
+        for stop in stops:
+            if stop is not None:
+                referred_objects.extend((TRIP, trip) for trip
+                                        in stop.passengers_to_board)
+                referred_objects.extend((TRIP, trip) for trip
+                                        in stop.passengers_to_alight)
+        for leg in legs:
+            if leg.trip is not None:
+                referred_objects.append((TRIP, leg.trip))
+            if leg.assigned_vehicle is not None:
+                referred_objects.append((VEHICLE, leg.assigned_vehicle))
+
+        return _Unit(vehicle, memo, legs, referred_objects, route)
+
+
+class _Unit:
+    """The copies of a trip (or a vehicle), of the objects that are only
+    copied with it and the trips and the vehicles it refers to."""
+
+    def __init__(self, original, memo, legs, referred_objects,
+                 route: Optional['vehicle_module.Route'] = None):
+        self.original = original
+        self.copy = memo[id(original)]
+        self.route = route
+        self.copy_by_original = [(original, self.copy)]
+        if route is not None:
+            self.copy_by_original.append((route, memo[id(route)]))
+        self.copy_by_original.extend((leg, memo[id(leg)])
+                                     for leg in legs)
+        self.referred_objects = referred_objects
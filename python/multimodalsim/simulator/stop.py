@@ -193,7 +193,11 @@ class Stop:
 class Location:
     """The ``Location`` class is a base class that mostly serves as a
     structure for storing basic information about the location of a vehicle
-    or a passenger (i.e., Request). """
+    or a passenger (i.e., Request).
+
+    Locations are never modified once created. Therefore, they are shared
+    instead of being copied when a deep copy of a stop, a vehicle or a
+    request is made (e.g., when the State is created). """
 
     def __init__(self) -> None:
         pass
@@ -201,6 +205,10 @@ class Location:
     def __eq__(self, other: 'Location') -> bool:
         pass
 
+    def __deepcopy__(self, memo: dict) -> 'Location':
+        memo[id(self)] = self
+        return self
+
 
 class LabelLocation(Location):
     def __init__(self, label: str, lon: Optional[float] = None,
@@ -224,14 +232,6 @@ class LabelLocation(Location):
             return self.label == other.label
         return False
 
-    def __deepcopy__(self, memo: dict) -> 'LabelLocation':
-        cls = self.__class__
-        result = cls.__new__(cls)
-        memo[id(self)] = result
-        for k, v in self.__dict__.items():
-            setattr(result, k, copy.deepcopy(v, memo))
-        return result
-
 
 class TimeCoordinatesLocation(Location):
     def __init__(self, time: float, lon: float, lat: float) -> None:
@@ -248,11 +248,3 @@ class TimeCoordinatesLocation(Location):
             return self.time == other.time and self.lon == other.lon \
                    and self.lat == other.lat
         return False
-
-    def __deepcopy__(self, memo: dict) -> 'TimeCoordinatesLocation':
-        cls = self.__class__
-        result = cls.__new__(cls)
-        memo[id(self)] = result
-        for k, v in self.__dict__.items():
-            setattr(result, k, copy.deepcopy(v, memo))
-        return result
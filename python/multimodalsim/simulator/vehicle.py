@@ -1,5 +1,6 @@
 import logging
 import copy
+from concurrent.futures import Future
 from typing import Optional
 
 import multimodalsim.state_machine.state_machine as state_machine
@@ -33,10 +34,13 @@ class Vehicle:
         position: Location
             Most recent location of the vehicle. Note that the position is not
             updated at every time unit; it is updated only when the event
-            VehicleUpdatePositionEvent is processed.
+            FleetUpdatePositionEvent is processed.
         polylines: dict
             A dictionary that specifies for each stop id (key),
-            the polyline until the next stop.
+            the polyline until the next stop. The polylines may be set to a
+            Future (see Coordinates.submit_polylines), in which case they are
+            awaited the first time they are read. Use pending_polylines to
+            read them without waiting.
         status: int
             Represents the different status of the vehicle
             (VehicleStatus(Enum)).
@@ -109,12 +113,24 @@ class Vehicle:
 
     @property
     def polylines(self) -> Optional[dict[str, tuple[str, list[float]]]]:
+        if isinstance(self.__polylines, Future):
+            self.__polylines = self.__polylines.result()
+        return self.__polylines
+
+    @property
+    def pending_polylines(
+            self) -> Optional[dict[str, tuple[str, list[float]]] | Future]:
+        """The polylines if they are available, else the Future of the
+        polylines (i.e., the polylines are not awaited)."""
+        if isinstance(self.__polylines, Future) and self.__polylines.done():
+            self.__polylines = self.__polylines.result()
         return self.__polylines
 
     @polylines.setter
     def polylines(
             self,
-            polylines: Optional[dict[str, tuple[str, list[float]]]]) -> None:
+            polylines: Optional[dict[str, tuple[str, list[float]]] | Future]) \
+            -> None:
         self.__polylines = polylines
 
     @property
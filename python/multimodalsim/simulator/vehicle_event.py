@@ -39,20 +39,21 @@ class VehicleReady(Event):
                 self.__vehicle)
 
         env.add_route(self.__route, self.__vehicle.id)
+        env.add_modified_route(self.__route)
 
         VehicleWaiting(self.__route, self.queue).add_to_queue()
 
         if env.coordinates is not None and self.__update_position_time_step \
                 is not None:
             self.__vehicle.polylines = \
-                env.coordinates.update_polylines(self.__route)
-            VehicleUpdatePositionEvent(
-                self.__vehicle, self.queue,
+                env.coordinates.submit_polylines(self.__route)
+            FleetUpdatePositionEvent(
+                [self.__vehicle], self.queue,
                 self.time + self.__update_position_time_step,
                 self.__update_position_time_step).add_to_queue()
         elif env.coordinates is not None:
             self.__vehicle.polylines = \
-                env.coordinates.update_polylines(self.__route)
+                env.coordinates.submit_polylines(self.__route)
 
         return 'Vehicle Ready process is implemented'
 
@@ -70,6 +71,8 @@ class VehicleWaiting(ActionEvent):
 
     def _process(self, env: 'environment.Environment') -> str:
 
+        env.add_modified_route(self.__route)
+
         optimization_event.Optimize(env.current_time, self.queue). \
             add_to_queue()
 
@@ -116,6 +119,8 @@ class VehicleBoarding(ActionEvent):
         self.__route = route
 
     def _process(self, env: 'environment.Environment') -> str:
+        env.add_modified_route(self.__route)
+
         passengers_to_board_copy = self.__route.current_stop. \
             passengers_to_board.copy()
 
@@ -151,6 +156,7 @@ class VehicleDeparture(ActionEvent):
             actual_arrival_time = self.__route.next_stops[0].arrival_time
 
         self.__route.depart()
+        env.add_modified_route(self.__route)
 
         VehicleArrival(self.__route, self.queue,
                        actual_arrival_time).add_to_queue()
@@ -171,6 +177,7 @@ class VehicleArrival(ActionEvent):
         self.__update_stop_times(env.current_time)
 
         self.__route.arrive()
+        env.add_modified_route(self.__route)
 
         if len(self.__route.next_stops) == 0 \
                 and not self.__route.vehicle.reusable:
@@ -221,6 +228,8 @@ class VehicleNotification(Event):
 
         self.__env = env
 
+        env.add_modified_route(self.__route)
+
         if self.__route_update.next_stops is not None:
             self.__route.next_stops = \
                 copy.deepcopy(self.__route_update.next_stops)
@@ -265,7 +274,7 @@ class VehicleNotification(Event):
         # Update polylines
         if env.coordinates is not None:
             self.__vehicle.polylines = \
-                env.coordinates.update_polylines(self.__route)
+                env.coordinates.submit_polylines(self.__route)
 
         return 'Notify Vehicle process is implemented'
 
@@ -299,6 +308,7 @@ class VehicleBoarded(Event):
 
     def _process(self, env: 'environment.Environment') -> str:
         self.__route.board(self.__trip)
+        env.add_modified_route(self.__route)
 
         if len(self.__route.current_stop.boarding_passengers) == 0:
             # All passengers are on board
@@ -323,6 +333,7 @@ class VehicleAlighted(Event):
 
     def _process(self, env: 'environment.Environment') -> str:
         self.__route.alight(self.__leg)
+        env.add_modified_route(self.__route)
 
         if len(self.__route.current_stop.alighting_passengers) == 0:
             # All passengers are alighted
@@ -333,34 +344,53 @@ class VehicleAlighted(Event):
         return 'Vehicle Alighted process is implemented'
 
 
-class VehicleUpdatePositionEvent(Event):
-    def __init__(self, vehicle: vehicle_module.Vehicle,
+class FleetUpdatePositionEvent(Event):
+    """Updates the positions of several vehicles at once (see
+    Coordinates.update_positions) and, as long as time_step is not None,
+    updates them again time_step later, until they are complete.
+
+    A single event is processed at a given time: the vehicles of an event
+    added to the queue while an event of the same time is already in the
+    queue are added to the vehicles of the event in the queue."""
+
+    def __init__(self, vehicles: list[vehicle_module.Vehicle],
                  queue: 'event_queue.EventQueue', event_time: float,
                  time_step: Optional[float] = None):
-        super().__init__("VehicleUpdatePositionEvent", queue, event_time)
+        super().__init__("FleetUpdatePositionEvent", queue, event_time)
 
-        self.__vehicle = vehicle
-        self.__route = queue.env.get_route_by_vehicle_id(vehicle.id)
-        self.__event_time = event_time
-        self.__queue = queue
+        self.__vehicles = list(vehicles)
         self.__time_step = time_step
 
+    @property
+    def vehicles(self) -> list[vehicle_module.Vehicle]:
+        return self.__vehicles
+
+    def add_vehicles(self, vehicles: list[vehicle_module.Vehicle]) -> None:
+        self.__vehicles.extend(vehicles)
+
     def _process(self, env: 'environment.Environment') -> str:
-        self.__vehicle.position = env.coordinates.update_position(
-            self.__vehicle, self.__route, self.__event_time)
-
-        if self.__vehicle.status != VehicleStatus.COMPLETE \
-                and self.__time_step is not None:
-            VehicleUpdatePositionEvent(
-                self.__vehicle, self.__queue,
-                self.__event_time + self.__time_step,
+        routes = [env.get_route_by_vehicle_id(vehicle.id)
+                  for vehicle in self.__vehicles]
+        positions = env.coordinates.update_positions(self.__vehicles, routes,
+                                                     self.time)
+        for vehicle, position in zip(self.__vehicles, positions):
+            vehicle.position = position
+
+        active_vehicles = [vehicle for vehicle in self.__vehicles
+                           if vehicle.status != VehicleStatus.COMPLETE]
+        if len(active_vehicles) > 0 and self.__time_step is not None:
+            FleetUpdatePositionEvent(
+                active_vehicles, self.queue, self.time + self.__time_step,
                 self.__time_step).add_to_queue()
 
-        return 'VehicleUpdatePositionEvent processed'
+        return 'FleetUpdatePositionEvent processed'
 
-    @property
-    def vehicle(self) -> vehicle_module.Vehicle:
-        return self.__vehicle
+    def add_to_queue(self) -> None:
+        queued_events = self.queue.get_events(self.__class__, time=self.time)
+        if len(queued_events) > 0:
+            queued_events[0].add_vehicles(self.__vehicles)
+        else:
+            super().add_to_queue()
 
 
 class VehicleComplete(ActionEvent):
@@ -375,6 +405,7 @@ class VehicleComplete(ActionEvent):
         self.__route = route
 
     def _process(self, env: 'environment.Environment') -> str:
+        env.add_modified_route(self.__route)
 
         return 'Vehicle Complete process is implemented'
 
@@ -1,3 +1,4 @@
+import copy
 import logging
 from enum import Enum
 from typing import Type, Optional, Any
@@ -106,6 +107,12 @@ class StateMachine:
 
         self.__current_state = current_state
 
+    def restore_current_state(self, status: Enum) -> None:
+        """Set the current state from its status without going through a
+        transition. This is only meant to rebuild a state machine that was
+        serialized (see StateSerializer)."""
+        self.__current_state = self.__get_state(status)
+
     def add_transition(self, source_status: Enum, target_status: Enum,
                        triggering_event: Type[Event],
                        condition: Optional[Condition] = None) -> Transition:
@@ -139,6 +146,24 @@ class StateMachine:
 
         return self.__current_state
 
+    def __deepcopy__(self, memo: dict) -> 'StateMachine':
+        # The states only hold a status, so they are shared with the copy.
+        # The transitions are copied, since their conditions may refer to
+        # the owner (e.g., PassengerConnectionCondition), but the states are
+        # added to the memo so that the copied transitions refer to the
+        # shared states.
+        cls = self.__class__
+        result = cls.__new__(cls)
+        memo[id(self)] = result
+        for state in self.__states:
+            memo[id(state)] = state
+        for k, v in self.__dict__.items():
+            if k in ("_StateMachine__states", "_StateMachine__current_state"):
+                setattr(result, k, v)
+            else:
+                setattr(result, k, copy.deepcopy(v, memo))
+        return result
+
     def __add_transition_to_transitions(self, transition):
 
         if transition.triggering_event.__name__ in self.__transitions:
@@ -0,0 +1,86 @@
+import unittest
+
+from multimodalsim.optimization.fixed_line.capacity_fixed_line_dispatcher \
+    import CapacityFixedLineDispatcher
+from multimodalsim.optimization.fixed_line.load_profile import LoadProfile
+from multimodalsim.simulator.request import Trip
+from multimodalsim.simulator.stop import LabelLocation
+
+from dispatcher_test_helpers import create_route, create_leg
+
+
+class LoadProfileTestCase(unittest.TestCase):
+
+    def test_get_max_load(self):
+        load_profile = LoadProfile([1, 3, 0, 2, 2])
+        self.assertEqual(load_profile.nb_stops, 5)
+        self.assertEqual(load_profile.get_max_load(0, 5), 3)
+        self.assertEqual(load_profile.get_max_load(2, 5), 2)
+        self.assertEqual(load_profile.get_max_load(2, 3), 0)
+        self.assertEqual(load_profile.get_max_load(3, 3), 0)
+
+    def test_add_load(self):
+        load_profile = LoadProfile([1, 3, 0, 2, 2])
+        load_profile.add_load(2, 4, 4)
+        self.assertEqual(load_profile.get_max_load(0, 5), 6)
+        self.assertEqual(load_profile.get_max_load(0, 2), 3)
+        self.assertEqual(load_profile.get_max_load(2, 3), 4)
+        self.assertEqual(load_profile.get_max_load(4, 5), 2)
+
+        load_profile.add_load(0, 5, -1)
+        self.assertEqual(load_profile.get_max_load(0, 5), 5)
+        self.assertEqual(load_profile.get_max_load(0, 1), 0)
+
+
+class CapacityFixedLineDispatcherTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # Route 1: A (100) -> B (200) -> C (300), capacity 2
+        # Route 2: A (150) -> B (250) -> C (350), capacity 2
+        self.__routes = [
+            create_route("1", [("A", 100), ("B", 200), ("C", 300)], 2),
+            create_route("2", [("A", 150), ("B", 250), ("C", 350)], 2)]
+
+    def test_capacity(self):
+        legs = [create_leg("1", "A", "C", nb_passengers=2),
+                create_leg("2", "B", "C", nb_passengers=1),
+                create_leg("3", "A", "B", nb_passengers=1),
+                create_leg("4", "B", "C", nb_passengers=2),
+                create_leg("5", "A", "C", nb_passengers=1),
+                create_leg("6", "A", "C", nb_passengers=1)]
+
+        optimized_route_plans = CapacityFixedLineDispatcher().optimize(
+            legs, self.__routes, 10, None)
+
+        # Route 1 is full from A to C after leg 1. Leg 4 does not fit in
+        # route 2 after legs 2 and 3, and leg 6 does not fit in route 2
+        # after leg 5.
+        self.assertEqual(self.__get_assignments(optimized_route_plans),
+                         [("1", ["1"]), ("2", ["2"]), ("2", ["3"]),
+                          ("2", ["5"])])
+
+    def test_passengers_already_assigned(self):
+        # Two passengers board route 1 at B and alight at C.
+        trip = Trip("0", LabelLocation("B"), LabelLocation("C"), 2, 0, 0,
+                    1000)
+        self.__routes[0].next_stops[0].passengers_to_board.append(trip)
+        self.__routes[0].next_stops[1].passengers_to_alight.append(trip)
+
+        legs = [create_leg("1", "A", "B", nb_passengers=2),
+                create_leg("2", "A", "C", nb_passengers=1)]
+
+        optimized_route_plans = CapacityFixedLineDispatcher().optimize(
+            legs, self.__routes, 10, None)
+
+        self.assertEqual(self.__get_assignments(optimized_route_plans),
+                         [("1", ["1"]), ("2", ["2"])])
+
+    @staticmethod
+    def __get_assignments(optimized_route_plans):
+        return [(optimized_route_plan.route.vehicle.id,
+                 [leg.id for leg in optimized_route_plan.assigned_legs])
+                for optimized_route_plan in optimized_route_plans]
+
+
+if __name__ == '__main__':
+    unittest.main()
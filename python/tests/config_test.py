@@ -99,8 +99,7 @@ class ShuttleTestCase(unittest.TestCase):
 
         coordinates = CoordinatesOSRM(config=coordinates_osrm_config_file_path)
 
-        self.assertEqual(coordinates._CoordinatesOSRM__osrm_url,
-                         "test")
+        self.assertEqual(coordinates.osrm_client.url, "test")
 
     def test_load_gtfs_data_reader_config_from_tile(self):
         gtfs_folder_path = "../../data/tests/fixed_line_multimodal/gtfs/"
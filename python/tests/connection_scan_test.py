@@ -0,0 +1,193 @@
+import unittest
+
+from multimodalsim.optimization.connection_scan import ConnectionScan
+from multimodalsim.optimization.splitter import MultimodalSplitter
+from multimodalsim.reader.data_reader import GTFSReader
+from multimodalsim.simulator.request import Trip
+from multimodalsim.simulator.stop import LabelLocation
+
+
+class ConnectionScanTestCase(unittest.TestCase):
+
+    def setUp(self):
+        gtfs_folder_path = "../../data/tests/fixed_line_transfers/gtfs/"
+        requests_file_path = \
+            "../../data/tests/fixed_line_multimodal/requests_gtfs.csv"
+        data_reader = GTFSReader(gtfs_folder_path, requests_file_path)
+        self.__network_graph = data_reader.get_network_graph()
+        self.__available_connections = {"2": {"2", "4"}, "4": {"2", "4"}}
+
+    def test_earliest_arrival(self):
+        connection_scan = ConnectionScan(self.__network_graph.nodes())
+
+        # Trip 1 from stop 1 to stop 2, then trip 2 from stop 2 to stop 3.
+        self.assertEqual(
+            connection_scan.find_earliest_arrival_path("1", "3", 57600, 60000),
+            [("1", "1", 57600, 57600), ("2", "1", 57900, 57900),
+             ("2", "2", 58200, 58200), ("3", "2", 58500, 58500)])
+
+        self.assertEqual(
+            connection_scan.find_earliest_arrival_path("1", "3", 57601, 60000),
+            [])
+        self.assertEqual(
+            connection_scan.find_earliest_arrival_path("2", "3", 58201, 59000),
+            [])
+        self.assertEqual(
+            connection_scan.find_earliest_arrival_path("2", "2", 57000, 60000),
+            [])
+
+    def test_unreachable_destinations(self):
+        connection_scan = ConnectionScan(self.__network_graph.nodes())
+
+        # No connection arrives at stop 3 before 58400, and no connection
+        # arrives at stop 1.
+        paths = connection_scan.find_earliest_arrival_paths(
+            "1", {"2": 60000, "3": 58400, "1": 60000, "5": 60000}, 57600)
+        self.assertEqual(paths, {"2": [("1", "1", 57600, 57600),
+                                       ("2", "1", 57900, 57900)],
+                                 "3": [], "1": [], "5": []})
+
+        # No connection departs from stop 3.
+        self.assertEqual(
+            connection_scan.find_earliest_arrival_path("3", "2", 57000, 60000),
+            [])
+
+    def test_freeze_interval(self):
+        for freeze_interval, expected_trip_id in [(300, "2"), (301, "3"),
+                                                  (901, "4")]:
+            connection_scan = ConnectionScan(self.__network_graph.nodes(),
+                                             freeze_interval=freeze_interval)
+            path = connection_scan.find_earliest_arrival_path("1", "3", 57600,
+                                                              60000)
+            self.assertEqual(path[-1][1], expected_trip_id)
+
+        connection_scan = ConnectionScan(self.__network_graph.nodes(),
+                                         freeze_interval=1501)
+        self.assertEqual(
+            connection_scan.find_earliest_arrival_path("1", "3", 57600, 60000),
+            [])
+
+    def test_available_connections(self):
+        connection_scan = ConnectionScan(self.__network_graph.nodes())
+        path = connection_scan.find_earliest_arrival_path("4", "3", 58300,
+                                                          60000)
+        self.assertEqual([node[1] for node in path], ["5", "5", "3", "3"])
+
+        # Stop 2 can be reached from stop 4 without taking trip 5.
+        connection_scan = ConnectionScan(self.__network_graph.nodes(),
+                                         self.__available_connections)
+        path = connection_scan.find_earliest_arrival_path("4", "3", 58000,
+                                                          60000)
+        self.assertEqual([node[1] for node in path], ["2", "2"])
+
+    def test_multimodal_splitter(self):
+        splitter = MultimodalSplitter(self.__network_graph,
+                                      self.__available_connections)
+
+        trip = Trip("1", LabelLocation("1"), LabelLocation("3"), 1, 57000,
+                    57600, 60000)
+        legs = splitter.split(trip, None)
+        self.assertEqual([(leg.id, leg.origin.label, leg.destination.label)
+                          for leg in legs],
+                         [("1_1", "1", "2"), ("1_2", "2", "3")])
+        self.assertTrue(all(leg.trip is trip for leg in legs))
+
+        # The ride from stop 4 to stop 2 is replaced by a walk.
+        trip = Trip("2", LabelLocation("4"), LabelLocation("3"), 1, 58000,
+                    58300, 60000)
+        legs = splitter.split(trip, None)
+        self.assertEqual([(leg.origin.label, leg.destination.label)
+                          for leg in legs], [("2", "3")])
+
+    def test_split_batch(self):
+        splitter = MultimodalSplitter(self.__network_graph,
+                                      freeze_interval=301)
+
+        trips = [Trip("1", LabelLocation("1"), LabelLocation("3"), 1, 57000,
+                      57600, 60000),
+                 Trip("2", LabelLocation("1"), LabelLocation("2"), 1, 57000,
+                      57600, 60000),
+                 Trip("3", LabelLocation("1"), LabelLocation("3"), 1, 57000,
+                      57600, 59000),
+                 Trip("4", LabelLocation("4"), LabelLocation("3"), 1, 57000,
+                      58300, 60000)]
+        legs_by_trip = splitter.split_batch(trips, None)
+
+        self.assertEqual(len(legs_by_trip), len(trips))
+        for trip, legs in zip(trips, legs_by_trip):
+            self.assertEqual(
+                [(leg.id, leg.origin.label, leg.destination.label)
+                 for leg in legs],
+                [(leg.id, leg.origin.label, leg.destination.label)
+                 for leg in splitter.split(trip, None)])
+            self.assertTrue(all(leg.trip is trip for leg in legs))
+
+        # Trip 3 cannot take trip 3 of the GTFS, which arrives at 59100.
+        self.assertEqual(len(legs_by_trip[0]), 2)
+        self.assertEqual(legs_by_trip[2], [])
+
+    def test_split_cache(self):
+        splitter = MultimodalSplitter(self.__network_graph)
+        split_cache = splitter.split_cache
+
+        legs = self.__split(splitter, 57100, 60000)
+        self.assertEqual(legs, [("1", "2"), ("2", "3")])
+        self.assertEqual((split_cache.hits, split_cache.misses), (0, 1))
+
+        # Same time bucket and later ready time.
+        self.assertEqual(self.__split(splitter, 57200, 60000), legs)
+        self.assertEqual((split_cache.hits, split_cache.misses), (1, 1))
+
+        # Same time bucket but earlier ready time.
+        self.assertEqual(self.__split(splitter, 57000, 60000), legs)
+        self.assertEqual((split_cache.hits, split_cache.misses), (1, 2))
+
+        # Other time bucket.
+        self.assertEqual(self.__split(splitter, 57300, 60000), legs)
+        self.assertEqual((split_cache.hits, split_cache.misses), (1, 3))
+
+        # The first vehicle has already left.
+        self.assertEqual(self.__split(splitter, 58200, 60000, "2"),
+                         [("2", "3")])
+        self.assertEqual(self.__split(splitter, 58300, 60000, "2"),
+                         [("2", "3")])
+        self.assertEqual(self.__split(splitter, 58400, 60000, "2"),
+                         [("2", "3")])
+        self.assertEqual((split_cache.hits, split_cache.misses), (2, 5))
+
+        # The cached path arrives at 58500.
+        self.assertEqual(self.__split(splitter, 57000, 58400), [])
+        self.assertEqual((split_cache.hits, split_cache.misses), (3, 5))
+
+        # No path arrives before 58400, so none arrives before 58300.
+        self.assertEqual(self.__split(splitter, 56700, 58400), [])
+        self.assertEqual(self.__split(splitter, 56800, 58300), [])
+        self.assertEqual(self.__split(splitter, 56800, 60000), legs)
+        self.assertEqual((split_cache.hits, split_cache.misses), (4, 7))
+
+        self.assertGreater(len(split_cache), 0)
+        splitter.network_graph = self.__network_graph
+        self.assertEqual(len(split_cache), 0)
+
+    def test_split_cache_size(self):
+        splitter = MultimodalSplitter(self.__network_graph, cache_size=1)
+        self.__split(splitter, 57000, 60000)
+        self.__split(splitter, 57300, 60000)
+        self.assertEqual(len(splitter.split_cache), 1)
+        self.__split(splitter, 57000, 60000)
+        self.assertEqual(splitter.split_cache.hits, 0)
+
+        splitter = MultimodalSplitter(self.__network_graph, cache_size=0)
+        self.__split(splitter, 57000, 60000)
+        self.assertEqual(len(splitter.split_cache), 0)
+
+    @staticmethod
+    def __split(splitter, ready_time, due_time, origin_stop_id="1"):
+        trip = Trip("1", LabelLocation(origin_stop_id), LabelLocation("3"), 1,
+                    ready_time, ready_time, due_time)
+        return [(leg.origin.label, leg.destination.label)
+                for leg in splitter.split(trip, None)]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import multiprocessing as mp
+import threading
+import unittest
+from unittest import mock
+
+from multimodalsim.optimization.dispatch_worker import DispatchWorkerPool, \
+    DispatchWorker
+from multimodalsim.optimization.optimization import OptimizationResult, \
+    Optimization
+from multimodalsim.simulator.environment import Environment
+from multimodalsim.simulator.event_queue import EventQueue
+from multimodalsim.simulator.optimization_event import Optimize, Hold
+from multimodalsim.simulator.passenger_event import PassengerRelease
+from multimodalsim.simulator.request import Trip
+from multimodalsim.simulator.simulation import Simulation
+from multimodalsim.simulator.stop import LabelLocation
+
+
+class EchoDispatcher:
+
+    def dispatch(self, state):
+        if len(state.trips) == 0:
+            raise ValueError("The state has no trips.")
+        return OptimizationResult(state, state.trips, [])
+
+
+class ChildProcessDispatcher(EchoDispatcher):
+
+    def dispatch(self, state):
+        # A daemonic process cannot start a child process.
+        process = mp.Process(target=len, args=([],))
+        process.start()
+        process.join()
+        return super().dispatch(state)
+
+
+class DispatchWorkerPoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.__pool = DispatchWorkerPool(EchoDispatcher())
+
+        self.__env = Environment(None)
+        self.__env.add_trip(Trip("1", LabelLocation("0"), LabelLocation("1"),
+                                 1, 0, 0, 100))
+
+    def tearDown(self):
+        self.__pool.close()
+
+    def test_worker_is_reused(self):
+        worker = self.__pool.acquire()
+        pid = worker.process.pid
+        self.__assert_dispatched(worker)
+        self.__pool.release(worker)
+
+        worker = self.__pool.acquire()
+        self.assertEqual(worker.process.pid, pid)
+        self.__assert_dispatched(worker)
+        self.__pool.release(worker)
+
+    def test_dispatch_error(self):
+        worker = self.__pool.acquire()
+        empty_state = Environment(None).get_new_state()
+        self.assertIsNone(worker.dispatch(empty_state))
+        self.assertTrue(worker.is_alive())
+        self.__pool.release(worker)
+
+    def test_killed_worker_is_restarted(self):
+        worker = self.__pool.acquire()
+        pid = worker.process.pid
+        worker.process.kill()
+        worker.process.join()
+        self.assertIsNone(worker.dispatch(self.__env.get_new_state()))
+        self.__pool.release(worker)
+
+        worker = self.__pool.acquire()
+        self.assertNotEqual(worker.process.pid, pid)
+        self.__assert_dispatched(worker)
+        self.__pool.release(worker)
+
+    def test_close(self):
+        worker = self.__pool.acquire()
+        self.__pool.release(worker)
+        self.__pool.close()
+        self.assertFalse(worker.is_alive())
+
+    def test_worker_released_after_optimization_error(self):
+        env = Environment(Optimization(EchoDispatcher()))
+        env.add_trip(Trip("1", LabelLocation("0"), LabelLocation("1"), 1, 0,
+                          0, 100))
+        queue = EventQueue(env)
+        env.optimization.state = env.get_new_state()
+        env.optimize_cv = threading.Condition()
+        hold_cv = threading.Condition()
+        hold_event = Hold(queue, 0, hold_cv, 10)
+        optimize = Optimize(0, queue, asynchronous=True)
+
+        waiting = threading.Event()
+        notified = []
+
+        def wait_for_optimization():
+            with env.optimize_cv:
+                waiting.set()
+                notified.append(env.optimize_cv.wait(timeout=10))
+
+        waiting_thread = threading.Thread(target=wait_for_optimization)
+        waiting_thread.start()
+        waiting.wait()
+
+        # An error that is not caught by DispatchWorker.dispatch.
+        worker_pool = env.optimization.dispatch_worker_pool
+        with mock.patch.object(DispatchWorker, "dispatch",
+                               side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                optimize._Optimize__optimize_in_new_thread(env, hold_cv,
+                                                           hold_event)
+        waiting_thread.join()
+
+        self.assertEqual(notified, [True])
+        self.assertEqual(
+            worker_pool._DispatchWorkerPool__idle_workers.qsize(),
+            worker_pool.nb_workers)
+        env.optimization.close()
+
+    def test_dispatcher_starts_processes(self):
+        pool = DispatchWorkerPool(ChildProcessDispatcher())
+        worker = pool.acquire()
+        self.assertFalse(worker.process.daemon)
+        self.__assert_dispatched(worker)
+        pool.release(worker)
+        pool.close()
+
+    def test_workers_closed_after_simulation_error(self):
+        trip = Trip("1", LabelLocation("0"), LabelLocation("1"), 1, 0, 0,
+                    100)
+        simulation = Simulation(Optimization(EchoDispatcher()), [trip], [],
+                                {})
+
+        with mock.patch.object(Optimization, "close") as close, \
+                mock.patch.object(PassengerRelease, "process",
+                                  side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                simulation.simulate()
+
+        close.assert_called_once()
+
+    def __assert_dispatched(self, worker):
+        optimization_result = worker.dispatch(self.__env.get_new_state())
+        self.assertEqual([trip.id for trip in optimization_result.state.trips],
+                         ["1"])
+        self.assertIs(optimization_result.modified_requests[0],
+                      optimization_result.state.trips[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
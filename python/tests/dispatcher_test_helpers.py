@@ -0,0 +1,79 @@
+import networkx as nx
+
+from multimodalsim.optimization.optimization import Optimization
+from multimodalsim.reader.data_reader import ShuttleDataReader
+from multimodalsim.simulator.request import Trip, Leg
+from multimodalsim.simulator.simulation import Simulation
+from multimodalsim.simulator.stop import Stop, LabelLocation
+from multimodalsim.simulator.vehicle import Vehicle, Route
+from multimodalsim.state_machine.status import PassengerStatus, VehicleStatus
+
+SIMPLE_NETWORK_DATA_FOLDER = "../../data/shuttle/simple_network_dispatcher/"
+
+
+def create_line_network(labels):
+    """Create a complete network of locations on a line, one unit of time
+    apart.
+        Input:
+            -labels: the labels of the locations, in the order of the line.
+        Output:
+            -network: the network graph."""
+    network = nx.DiGraph()
+    for position, label in enumerate(labels):
+        network.add_node(label, lon=0.01 * position, lat=0)
+    for origin_position, origin in enumerate(labels):
+        for destination_position, destination in enumerate(labels):
+            if origin != destination:
+                network.add_edge(
+                    origin, destination,
+                    length=abs(origin_position - destination_position))
+
+    return network
+
+
+def create_route(vehicle_id, stop_times, capacity=1):
+    """Create the route of a vehicle.
+        Input:
+            -vehicle_id: the id of the vehicle.
+            -stop_times: list of tuples (stop_id, time). The vehicle starts
+             at the first stop and then visits the other stops.
+            -capacity: the capacity of the vehicle.
+        Output:
+            -route: the route of the vehicle."""
+    stops = [Stop(time, time, LabelLocation(stop_id))
+             for stop_id, time in stop_times]
+    vehicle = Vehicle(vehicle_id, 0, stops[0], capacity, 0)
+    return Route(vehicle, stops[1:])
+
+
+def create_leg(leg_id, origin_stop_id, destination_stop_id, ready_time=0,
+               due_time=1000, nb_passengers=1):
+    """Create a leg covering the whole trip of the same id."""
+    trip = Trip(leg_id, LabelLocation(origin_stop_id),
+                LabelLocation(destination_stop_id), nb_passengers, 0,
+                ready_time, due_time)
+    return Leg(leg_id, trip.origin, trip.destination, nb_passengers, 0,
+               ready_time, due_time, trip)
+
+
+def check_simple_network_simulation(test_case, dispatcher_class):
+    """Simulate the simple network data with a dispatcher of class
+    dispatcher_class and check that all the vehicles and trips complete."""
+    data_reader = ShuttleDataReader(
+        SIMPLE_NETWORK_DATA_FOLDER + "requests.csv",
+        SIMPLE_NETWORK_DATA_FOLDER + "vehicles.csv",
+        graph_from_json_file_path=SIMPLE_NETWORK_DATA_FOLDER + "graph.json",
+        vehicles_end_time=100000)
+    network = data_reader.get_json_graph()
+    vehicles, routes_by_vehicle_id = data_reader.get_vehicles()
+    trips = data_reader.get_trips()
+
+    dispatcher = dispatcher_class(network)
+    simulation = Simulation(Optimization(dispatcher), trips, vehicles,
+                            routes_by_vehicle_id, network=network)
+    simulation.simulate()
+
+    for vehicle in vehicles:
+        test_case.assertEqual(vehicle.status, VehicleStatus.COMPLETE)
+    for trip in trips:
+        test_case.assertEqual(trip.status, PassengerStatus.COMPLETE)
@@ -0,0 +1,200 @@
+import unittest
+
+from multimodalsim.simulator.environment import Environment
+from multimodalsim.simulator.request import Trip, Leg
+from multimodalsim.simulator.stop import Stop, LabelLocation
+from multimodalsim.simulator.vehicle import Vehicle, Route
+
+
+class EnvironmentTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.__env = Environment(None)
+
+        self.__trip = Trip("1", LabelLocation("0"), LabelLocation("2"), 1, 0,
+                           0, 100)
+        self.__leg1 = Leg("1_1", LabelLocation("0"), LabelLocation("1"), 1,
+                          0, 0, 100, self.__trip)
+        self.__leg2 = Leg("1_2", LabelLocation("1"), LabelLocation("2"), 1,
+                          0, 0, 100, self.__trip)
+
+        start_stop = Stop(0, 100, LabelLocation("0"))
+        self.__vehicle = Vehicle("v1", 0, start_stop, 10, 0)
+
+    def test_get_trip_and_leg_by_id(self):
+        self.__trip.assign_legs([self.__leg1])
+        self.__env.add_trip(self.__trip)
+        self.__env.add_leg(self.__leg2)
+
+        self.assertIs(self.__env.get_trip_by_id("1"), self.__trip)
+        self.assertIs(self.__env.get_leg_by_id("1_1"), self.__leg1)
+        self.assertIs(self.__env.get_leg_by_id("1_2"), self.__leg2)
+        self.assertIsNone(self.__env.get_trip_by_id("2"))
+
+        self.__env.remove_trip("1")
+        self.assertIsNone(self.__env.get_trip_by_id("1"))
+        self.assertIsNone(self.__env.get_leg_by_id("1_1"))
+        self.assertEqual(list(self.__env.trips), [])
+
+    def test_assigned_and_non_assigned_trips(self):
+        other_trip = Trip("2", LabelLocation("0"), LabelLocation("2"), 1, 0,
+                          0, 100)
+
+        # The trips are read through views that follow the modifications.
+        non_assigned_trips = self.__env.non_assigned_trips
+        self.__env.add_non_assigned_trip(self.__trip)
+        self.__env.add_non_assigned_trip(other_trip)
+        self.__env.add_non_assigned_trip(self.__trip)
+        self.assertEqual(list(non_assigned_trips), [self.__trip, other_trip])
+
+        self.__env.remove_non_assigned_trip("1")
+        self.__env.add_assigned_trip(self.__trip)
+        self.assertEqual(list(non_assigned_trips), [other_trip])
+        self.assertEqual(list(self.__env.assigned_trips), [self.__trip])
+
+        self.__env.remove_assigned_trip("1")
+        self.__env.add_non_assigned_trip(self.__trip)
+        self.assertEqual(list(self.__env.non_assigned_trips),
+                         [other_trip, self.__trip])
+
+    def test_get_vehicle_by_id(self):
+        self.__env.add_vehicle(self.__vehicle)
+        self.assertIs(self.__env.get_vehicle_by_id("v1"), self.__vehicle)
+
+        self.__env.remove_vehicle("v1")
+        self.assertIsNone(self.__env.get_vehicle_by_id("v1"))
+        self.assertEqual(list(self.__env.vehicles), [])
+
+    def test_modified_trips_and_routes(self):
+        route = Route(self.__vehicle)
+        self.__trip.assign_legs([self.__leg1])
+
+        self.__env.add_trip(self.__trip)
+        self.__env.add_vehicle(self.__vehicle)
+        self.__env.add_route(route, self.__vehicle.id)
+
+        self.__env.add_modified_trip(self.__trip)
+        self.__env.add_modified_leg(self.__leg1)
+        self.__env.add_modified_route(route)
+
+        state = self.__env.get_new_state()
+        self.assertEqual([trip.id for trip in state.modified_trips], ["1"])
+        self.assertIs(state.modified_trips[0], state.trips[0])
+        self.assertIs(state.modified_legs[0], state.trips[0].next_legs[0])
+        self.assertIs(state.modified_routes[0],
+                      state.route_by_vehicle_id["v1"])
+
+        # The modifications are reset once a state is created.
+        self.assertEqual(self.__env.modified_trips, [])
+        next_state = self.__env.get_new_state()
+        self.assertEqual(next_state.modified_trips, [])
+        self.assertEqual(next_state.modified_legs, [])
+        self.assertEqual(next_state.modified_routes, [])
+
+    def test_unmodified_copies_reused(self):
+        route = Route(self.__vehicle)
+        self.__trip.assign_legs([self.__leg1])
+        self.__leg1.assigned_vehicle = self.__vehicle
+        route.assign_leg(self.__leg1)
+        route.current_stop.passengers_to_board.append(self.__trip)
+        other_trip = Trip("2", LabelLocation("0"), LabelLocation("2"), 1, 0,
+                          0, 100)
+        other_vehicle = Vehicle("v2", 0, Stop(0, 100, LabelLocation("1")),
+                                10, 0)
+
+        self.__env.add_trip(self.__trip)
+        self.__env.add_trip(other_trip)
+        for vehicle, vehicle_route in [(self.__vehicle, route),
+                                       (other_vehicle, Route(other_vehicle))]:
+            self.__env.add_vehicle(vehicle)
+            self.__env.add_route(vehicle_route, vehicle.id)
+
+        state = self.__env.get_new_state()
+
+        # Only the modified trip is copied again.
+        self.__env.add_modified_trip(other_trip)
+        next_state = self.__env.get_new_state()
+        self.assertIs(next_state.get_trip_by_id("1"),
+                      state.get_trip_by_id("1"))
+        self.assertIsNot(next_state.get_trip_by_id("2"),
+                         state.get_trip_by_id("2"))
+        self.assertIs(next_state.route_by_vehicle_id["v1"],
+                      state.route_by_vehicle_id["v1"])
+        self.assertIs(next_state.route_by_vehicle_id["v2"],
+                      state.route_by_vehicle_id["v2"])
+
+        # The route of v1 refers to the modified trip, so it is copied again
+        # as well.
+        state = next_state
+        self.__env.add_modified_leg(self.__leg1)
+        next_state = self.__env.get_new_state()
+        trip_copy = next_state.get_trip_by_id("1")
+        route_copy = next_state.route_by_vehicle_id["v1"]
+        self.assertIsNot(trip_copy, state.get_trip_by_id("1"))
+        self.assertIsNot(route_copy, state.route_by_vehicle_id["v1"])
+        self.assertIs(route_copy.assigned_legs[0], trip_copy.next_legs[0])
+        self.assertIs(trip_copy.next_legs[0].assigned_vehicle,
+                      route_copy.vehicle)
+        self.assertIs(route_copy.current_stop.passengers_to_board[0],
+                      trip_copy)
+        self.assertIs(next_state.get_trip_by_id("2"),
+                      state.get_trip_by_id("2"))
+        self.assertIs(next_state.route_by_vehicle_id["v2"],
+                      state.route_by_vehicle_id["v2"])
+
+        # The copies modified after the state was created are copied again
+        # and the positions of the reused vehicles are updated.
+        state = next_state
+        state.route_by_vehicle_id["v2"].next_stops.append(
+            Stop(10, 20, LabelLocation("2")))
+        self.__env.invalidate_state_copies(vehicle_ids=["v2"])
+        self.__vehicle.position = LabelLocation("1")
+        next_state = self.__env.get_new_state()
+        self.assertEqual(next_state.route_by_vehicle_id["v2"].next_stops, [])
+        self.assertIs(next_state.route_by_vehicle_id["v1"],
+                      state.route_by_vehicle_id["v1"])
+        self.assertEqual(next_state.get_vehicle_by_id("v1").position.label,
+                         "1")
+
+    def test_frozen_vehicle_ids(self):
+        other_vehicle = Vehicle("v2", 0, Stop(0, 100, LabelLocation("1")),
+                                10, 0)
+        for vehicle, next_stops in [
+                (self.__vehicle, [Stop(5, 6, LabelLocation("1"))]),
+                (other_vehicle, [Stop(150, 160, LabelLocation("2"))])]:
+            self.__env.add_vehicle(vehicle)
+            self.__env.add_route(Route(vehicle, next_stops), vehicle.id)
+
+        # Only the stops of v1 are moved by the freeze.
+        state = self.__env.get_new_state()
+        state.freeze_routes_for_time_interval(10)
+        self.assertEqual(state.frozen_vehicle_ids, {"v1"})
+
+    def test_state_machine_conditions_copied(self):
+        self.__trip.assign_legs([self.__leg1])
+        self.__trip.next_legs = [self.__leg2]
+        self.__env.add_trip(self.__trip)
+
+        state = self.__env.get_new_state()
+        trip_copy = state.trips[0]
+        state_machine = self.__trip.state_machine
+        state_machine_copy = trip_copy.state_machine
+
+        # The states are shared, but the conditions of the transitions
+        # refer to the copy of the trip.
+        self.assertIs(state_machine_copy.current_state,
+                      state_machine.current_state)
+        transitions = state_machine.transitions["PassengerAlighting"]
+        transitions_copy = state_machine_copy.transitions["PassengerAlighting"]
+        for transition, transition_copy in zip(transitions, transitions_copy):
+            self.assertIs(transition_copy.current_state,
+                          transition.current_state)
+            self.assertIs(transition_copy.next_state, transition.next_state)
+        self.assertTrue(transitions_copy[1].condition.check(None))
+        trip_copy.next_legs = []
+        self.assertFalse(transitions_copy[1].condition.check(None))
+        self.assertTrue(transitions[1].condition.check(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+
+from multimodalsim.simulator.environment import Environment
+from multimodalsim.simulator.event import PauseEvent
+from multimodalsim.simulator.event_queue import EventQueue
+from multimodalsim.simulator.stop import Stop, LabelLocation
+from multimodalsim.simulator.vehicle import Vehicle, Route
+from multimodalsim.simulator.vehicle_event import VehicleWaiting, \
+    VehicleComplete, FleetUpdatePositionEvent
+
+
+class EventQueueTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.__env = Environment(None)
+        self.__queue = EventQueue(self.__env)
+
+        start_stop = Stop(0, 100, LabelLocation("0"))
+        self.__vehicle = Vehicle("1", 0, start_stop, 10, 0)
+        self.__route = Route(self.__vehicle)
+
+    def test_pop_order(self):
+        late_event = PauseEvent(self.__queue, 20, event_priority=1)
+        low_priority_event = PauseEvent(self.__queue, 10, event_priority=5)
+        first_event = PauseEvent(self.__queue, 10, event_priority=1)
+        second_event = PauseEvent(self.__queue, 10, event_priority=1)
+
+        for event in [late_event, low_priority_event, first_event,
+                      second_event]:
+            event.add_to_queue()
+
+        popped_events = [self.__queue.pop() for _ in range(4)]
+
+        self.assertEqual(popped_events, [first_event, second_event,
+                                         low_priority_event, late_event])
+        self.assertIs(popped_events[0], first_event)
+        self.assertIs(popped_events[1], second_event)
+        self.assertTrue(self.__queue.is_empty())
+
+    def test_sort_key(self):
+        first_event = PauseEvent(self.__queue, 10, event_priority=1)
+        second_event = PauseEvent(self.__queue, 10, event_priority=1)
+
+        self.assertIsNone(first_event.sort_key[2])
+        self.assertFalse(first_event < second_event)
+        self.assertEqual(first_event, second_event)
+
+        first_event.add_to_queue()
+        second_event.add_to_queue()
+
+        self.assertEqual(first_event.sort_key,
+                         (10, first_event.priority, 0))
+        self.assertEqual(second_event.sort_key,
+                         (10, second_event.priority, 1))
+        self.assertTrue(first_event < second_event)
+        self.assertTrue(second_event > first_event)
+        self.assertNotEqual(first_event, second_event)
+        self.assertTrue(first_event <= second_event)
+        self.assertFalse(second_event <= first_event)
+
+    def test_is_event_type_in_queue(self):
+        PauseEvent(self.__queue, 10).add_to_queue()
+
+        self.assertTrue(self.__queue.is_event_type_in_queue(PauseEvent))
+        self.assertTrue(self.__queue.is_event_type_in_queue(PauseEvent,
+                                                            time=10))
+        self.assertFalse(self.__queue.is_event_type_in_queue(PauseEvent,
+                                                             time=20))
+        self.assertFalse(self.__queue.is_event_type_in_queue(
+            PauseEvent, owner=self.__vehicle))
+
+        self.__queue.pop()
+        self.assertFalse(self.__queue.is_event_type_in_queue(PauseEvent))
+
+    def test_cancel_event_type_by_owner(self):
+        first_waiting = VehicleWaiting(self.__route, self.__queue, 10)
+        first_waiting.add_to_queue()
+        self.assertTrue(self.__queue.is_event_type_in_queue(
+            VehicleWaiting, owner=self.__vehicle))
+
+        # Adding a VehicleWaiting event cancels the previous one.
+        second_waiting = VehicleWaiting(self.__route, self.__queue, 20)
+        second_waiting.add_to_queue()
+        self.assertTrue(first_waiting.cancelled)
+        self.assertFalse(second_waiting.cancelled)
+
+        # Cancelled events are still popped.
+        self.assertIs(self.__queue.pop(), first_waiting)
+        self.assertIs(self.__queue.pop(), second_waiting)
+        self.assertTrue(self.__queue.is_empty())
+
+    def test_vehicle_complete_added_once(self):
+        VehicleComplete(self.__route, self.__queue, 10).add_to_queue()
+        VehicleComplete(self.__route, self.__queue, 20).add_to_queue()
+
+        self.__queue.pop()
+        self.assertTrue(self.__queue.is_empty())
+
+    def test_fleet_update_position_merged(self):
+        other_vehicle = Vehicle("2", 0, Stop(0, 100, LabelLocation("1")), 10,
+                                0)
+        first_event = FleetUpdatePositionEvent([self.__vehicle],
+                                               self.__queue, 10, 5)
+        first_event.add_to_queue()
+        FleetUpdatePositionEvent([other_vehicle], self.__queue, 10,
+                                 5).add_to_queue()
+        FleetUpdatePositionEvent([other_vehicle], self.__queue, 12,
+                                 5).add_to_queue()
+
+        # The vehicles updated at the same time are updated by one event.
+        self.assertIs(self.__queue.pop(), first_event)
+        self.assertEqual(first_event.vehicles,
+                         [self.__vehicle, other_vehicle])
+        self.assertEqual(self.__queue.pop().vehicles, [other_vehicle])
+        self.assertTrue(self.__queue.is_empty())
+
+
+if __name__ == '__main__':
+    unittest.main()
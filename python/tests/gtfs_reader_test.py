@@ -0,0 +1,70 @@
+import unittest
+
+from multimodalsim.reader.data_reader import GTFSReader
+
+
+class GTFSReaderNetworkGraphTestCase(unittest.TestCase):
+
+    def setUp(self):
+        gtfs_folder_path = "../../data/tests/fixed_line_transfers/gtfs/"
+        requests_file_path = \
+            "../../data/tests/fixed_line_multimodal/requests_gtfs.csv"
+        self.__data_reader = GTFSReader(gtfs_folder_path, requests_file_path)
+        self.__available_connections = {"2": {"2", "4"}, "4": {"2", "4"}}
+
+        # Arrival of trip 1 at stop 2.
+        self.__arrival_node = ("2", "1", 57900, 57900)
+
+    def test_transfer_edges(self):
+        for available_connections in [None, self.__available_connections]:
+            for freeze_interval in [0, 5, 300, 301]:
+                graph = self.__data_reader.get_network_graph(
+                    available_connections, freeze_interval)
+                self.assertEqual(
+                    self.__get_transfer_edges(graph),
+                    self.__get_expected_transfer_edges(
+                        graph, available_connections, freeze_interval))
+
+    def test_max_transfers_per_route(self):
+        graph = self.__data_reader.get_network_graph()
+        self.assertEqual(self.__get_transfer_trip_ids(graph),
+                         ["2", "3", "4", "5"])
+
+        # Trips 2, 3 and 4 belong to the same route.
+        graph = self.__data_reader.get_network_graph(
+            max_transfers_per_route=1)
+        self.assertEqual(self.__get_transfer_trip_ids(graph), ["2", "5"])
+
+        graph = self.__data_reader.get_network_graph(
+            self.__available_connections, max_transfers_per_route=2)
+        self.assertEqual(self.__get_transfer_trip_ids(graph),
+                         ["2", "3", "5", "5"])
+
+    def __get_transfer_trip_ids(self, graph):
+        return [node[1] for node in graph.successors(self.__arrival_node)
+                if node[1] != self.__arrival_node[1]]
+
+    @staticmethod
+    def __get_transfer_edges(graph):
+        return [(node1, node2, weight) for node1, node2, weight
+                in graph.edges.data("weight") if node1[1] != node2[1]]
+
+    @staticmethod
+    def __get_expected_transfer_edges(graph, available_connections,
+                                      freeze_interval):
+        available_connections = {} if available_connections is None \
+            else available_connections
+        expected_edges = []
+        for node1 in graph.nodes:
+            for node2 in graph.nodes:
+                connected = node1[0] == node2[0] \
+                    or node1[0] in available_connections \
+                    and node2[0] in available_connections[node1[0]]
+                if connected and node1[1] != node2[1] \
+                        and node2[3] - node1[2] >= freeze_interval:
+                    expected_edges.append((node1, node2, node2[3] - node1[2]))
+        return expected_edges
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import networkx as nx
+
+from multimodalsim.reader.data_reader import GTFSReader
+from multimodalsim.reader.network_graph_cache import NetworkGraphCache
+
+
+class NetworkGraphCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.__cache_folder = tempfile.mkdtemp()
+        self.__gtfs_folder = tempfile.mkdtemp() + "/"
+        shutil.copytree("../../data/tests/fixed_line_transfers/gtfs/",
+                        self.__gtfs_folder, dirs_exist_ok=True)
+        self.__requests_file_path = \
+            "../../data/tests/fixed_line_multimodal/requests_gtfs.csv"
+        self.__available_connections = {"2": {"2", "4"}, "4": {"2", "4"}}
+
+    def tearDown(self):
+        shutil.rmtree(self.__cache_folder)
+        shutil.rmtree(self.__gtfs_folder)
+
+    def test_gtfs_network_graph(self):
+        graph = self.__get_network_graph()
+        self.assertEqual(len(os.listdir(self.__cache_folder)), 1)
+
+        cached_graph = self.__get_network_graph()
+        self.assertEqual(len(os.listdir(self.__cache_folder)), 1)
+        self.assertIsNot(cached_graph, graph)
+        self.assertTrue(cached_graph.is_directed())
+        self.assertEqual(list(cached_graph.nodes), list(graph.nodes))
+        self.assertEqual(list(cached_graph.edges.data()),
+                         list(graph.edges.data()))
+
+    def test_invalidation(self):
+        self.__get_network_graph()
+        self.__get_network_graph(freeze_interval=10)
+        self.assertEqual(len(os.listdir(self.__cache_folder)), 2)
+
+        with open(self.__gtfs_folder + "stop_times.txt", 'a') as f:
+            f.write("5,58900,58900,3,3,1,0,0.6\n")
+        graph = self.__get_network_graph()
+        self.assertEqual(len(os.listdir(self.__cache_folder)), 3)
+        self.assertIn(("3", "5", 58900, 58900), graph.nodes)
+
+    def test_undirected_graph(self):
+        graph = nx.Graph()
+        graph.add_node("a", pos=(1.5, 2.5))
+        graph.add_edge("a", "b", length=10, name="ab")
+        graph.add_edge("b", "c", length=2.5, name="bc")
+
+        graph_cache = NetworkGraphCache(self.__cache_folder)
+        key = graph_cache.get_key([], {"graph": "test"})
+        self.assertIsNone(graph_cache.load(key))
+        graph_cache.save(key, graph)
+
+        cached_graph = graph_cache.load(key)
+        self.assertFalse(cached_graph.is_directed())
+        self.assertEqual(cached_graph.nodes["a"]["pos"], (1.5, 2.5))
+        self.assertEqual(cached_graph.edges["b", "a"],
+                         {"length": 10, "name": "ab"})
+        self.assertEqual(cached_graph.edges["c", "b"],
+                         {"length": 2.5, "name": "bc"})
+
+    def __get_network_graph(self, freeze_interval=5):
+        data_reader = GTFSReader(self.__gtfs_folder,
+                                 self.__requests_file_path)
+        return data_reader.get_network_graph(self.__available_connections,
+                                             freeze_interval,
+                                             cache_folder=self.__cache_folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
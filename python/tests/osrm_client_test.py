@@ -0,0 +1,375 @@
+import copy
+import json
+import os
+import pickle
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import networkx as nx
+import polyline
+
+from multimodalsim.config.coordinates_osrm_config import CoordinatesOSRMConfig
+from multimodalsim.observer.data_collector import DataContainer, \
+    StandardDataCollector
+from multimodalsim.observer.environment_observer import EnvironmentObserver
+from multimodalsim.optimization.optimization import Optimization
+from multimodalsim.optimization.shuttle.shuttle_nearest_vehicle_dispatcher \
+    import ShuttleNearestVehicleDispatcher
+from multimodalsim.simulator.coordinates import CoordinatesOSRM, \
+    SegmentPolyline
+from multimodalsim.simulator.osrm_client import OSRMClient
+from multimodalsim.simulator.request import Trip
+from multimodalsim.simulator.simulation import Simulation
+from multimodalsim.simulator.stop import Stop, LabelLocation
+from multimodalsim.simulator.vehicle import Vehicle, Route
+from multimodalsim.state_machine.status import PassengerStatus
+
+
+class StubOSRMRequestHandler(BaseHTTPRequestHandler):
+    # Answer the route requests with the straight lines between the
+    # coordinates. The durations of the legs are the lengths of the lines.
+
+    def do_GET(self):
+        self.server.request_paths.append(self.path)
+        self.server.response_allowed.wait()
+
+        coordinates_url = urlsplit(self.path).path.split("/")[-1]
+        coordinates = [tuple(float(value) for value in lon_lat.split(","))
+                       for lon_lat in coordinates_url.split(";")]
+        legs = [{"annotation": {"duration": [
+            abs(coordinates[i + 1][0] - coordinates[i][0])
+            + abs(coordinates[i + 1][1] - coordinates[i][1])]}}
+            for i in range(len(coordinates) - 1)]
+        response = {"code": "Ok", "routes": [{
+            "geometry": polyline.encode(coordinates, geojson=True),
+            "legs": legs}]}
+
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OSRMClientTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.__server = ThreadingHTTPServer(("127.0.0.1", 0),
+                                            StubOSRMRequestHandler)
+        self.__server.request_paths = []
+        self.__server.response_allowed = threading.Event()
+        self.__server.response_allowed.set()
+        threading.Thread(target=self.__server.serve_forever,
+                         daemon=True).start()
+        self.__url = "http://127.0.0.1:{}/".format(
+            self.__server.server_address[1])
+        self.__cache_folder = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__cache_folder.cleanup()
+
+    def test_get_route(self):
+        osrm_client = OSRMClient(self.__url)
+        coordinates = [(1.0, 2.0), (3.0, 2.0), (3.0, 5.0)]
+
+        response = osrm_client.get_route(coordinates)
+
+        self.assertEqual(response["code"], "Ok")
+        self.assertEqual(polyline.decode(response["routes"][0]["geometry"],
+                                         geojson=True), coordinates)
+        self.assertEqual(self.__server.request_paths,
+                         ["/route/v1/driving/1.0,2.0;3.0,2.0;3.0,5.0"
+                          "?annotations=true&overview=full"])
+
+        # The same route is served from the cache.
+        self.assertIs(osrm_client.get_route(coordinates), response)
+        self.assertEqual(osrm_client.nb_requests, 1)
+        osrm_client.close()
+
+    def test_get_routes(self):
+        osrm_client = OSRMClient(self.__url, max_workers=4)
+        coordinates_list = [[(0.0, 0.0), (float(i), 1.0)] for i in range(10)]
+        coordinates_list.extend(coordinates_list[:5])
+
+        responses = osrm_client.get_routes(coordinates_list)
+
+        self.assertEqual([polyline.decode(response["routes"][0]["geometry"],
+                                          geojson=True)
+                          for response in responses], coordinates_list)
+        self.assertEqual(osrm_client.nb_requests, 10)
+        self.assertEqual(len(self.__server.request_paths), 10)
+        osrm_client.close()
+
+    def test_cache_size(self):
+        osrm_client = OSRMClient(self.__url, cache_size=1)
+        coordinates1 = [(0.0, 0.0), (1.0, 1.0)]
+        coordinates2 = [(1.0, 1.0), (0.0, 0.0)]
+
+        osrm_client.get_route(coordinates1)
+        osrm_client.get_route(coordinates2)
+        osrm_client.get_route(coordinates2)
+        osrm_client.get_route(coordinates1)
+
+        self.assertEqual(osrm_client.nb_requests, 3)
+        osrm_client.close()
+
+    def test_cache_folder(self):
+        coordinates = [(0.0, 0.0), (1.0, 1.0), (2.0, 0.0)]
+        osrm_client = OSRMClient(self.__url,
+                                 cache_folder=self.__cache_folder.name)
+        response = osrm_client.get_route(coordinates)
+        osrm_client.close()
+
+        # A new client reads the response saved by the first one.
+        osrm_client = OSRMClient(self.__url,
+                                 cache_folder=self.__cache_folder.name)
+        self.assertEqual(osrm_client.get_route(coordinates), response)
+        self.assertEqual(osrm_client.nb_requests, 0)
+        self.assertEqual(len(self.__server.request_paths), 1)
+        osrm_client.close()
+
+    def test_update_polylines(self):
+        coordinates = CoordinatesOSRM(self.__create_config())
+
+        vehicle = Vehicle("1", 0, Stop(0, 10, LabelLocation("A", 0.0, 0.0)),
+                          1, 0)
+        route = Route(vehicle, [Stop(20, 30, LabelLocation("B", 2.0, 0.0)),
+                                Stop(40, 50, LabelLocation("C", 2.0, 2.0))])
+
+        polylines = coordinates.update_polylines(route)
+
+        self.assertEqual(polylines,
+                         {"0": (polyline.encode([(0.0, 0.0), (2.0, 0.0)],
+                                                geojson=True), [1.0]),
+                          "1": (polyline.encode([(2.0, 0.0), (2.0, 2.0)],
+                                                geojson=True), [1.0])})
+        coordinates.update_polylines(route)
+        self.assertEqual(coordinates.osrm_client.nb_requests, 1)
+
+    def test_segment_polylines(self):
+        coordinates = CoordinatesOSRM(self.__create_config())
+
+        vehicle = Vehicle("1", 0, Stop(0, 10, LabelLocation("A", 0.0, 0.0)),
+                          1, 0)
+        route = Route(vehicle, [Stop(20, 30, LabelLocation("B", 2.0, 0.0)),
+                                Stop(40, 50, LabelLocation("C", 2.0, 2.0))])
+        coordinates.update_polylines(route)
+
+        # Only the segments after the modified stops are requested.
+        route.next_stops.append(Stop(60, 70, LabelLocation("D", 0.0, 2.0)))
+        coordinates.update_polylines(route)
+        route.next_stops[1] = Stop(40, 50, LabelLocation("E", 1.0, 1.0))
+        route.next_stops.append(Stop(80, 90, LabelLocation("F", 3.0, 3.0)))
+        polylines = coordinates.update_polylines(route)
+
+        self.assertEqual(self.__server.request_paths,
+                         ["/route/v1/driving/0.0,0.0;2.0,0.0;2.0,2.0"
+                          "?annotations=true&overview=full",
+                          "/route/v1/driving/2.0,2.0;0.0,2.0"
+                          "?annotations=true&overview=full",
+                          "/route/v1/driving/2.0,0.0;1.0,1.0;0.0,2.0;3.0,3.0"
+                          "?annotations=true&overview=full"])
+        stop_coordinates = [(0.0, 0.0), (2.0, 0.0), (1.0, 1.0), (0.0, 2.0),
+                            (3.0, 3.0)]
+        self.assertEqual(polylines, {
+            str(i): (polyline.encode(stop_coordinates[i:i + 2],
+                                     geojson=True), [1.0])
+            for i in range(4)})
+
+    def test_submit_polylines(self):
+        coordinates = CoordinatesOSRM(self.__create_config())
+
+        vehicle = Vehicle("1", 0, Stop(0, 10, LabelLocation("A", 0.0, 0.0)),
+                          1, 0)
+        route = Route(vehicle, [Stop(20, 30, LabelLocation("B", 2.0, 0.0)),
+                                Stop(40, 50, LabelLocation("C", 2.0, 2.0))])
+
+        self.__server.response_allowed.clear()
+        polylines_future = coordinates.submit_polylines(route)
+        vehicle.polylines = polylines_future
+        self.assertFalse(polylines_future.done())
+
+        # The polylines correspond to the stops of the route at the time of
+        # the submission.
+        route.next_stops.append(Stop(60, 70, LabelLocation("D", 0.0, 2.0)))
+        self.__server.response_allowed.set()
+
+        self.assertEqual(vehicle.polylines,
+                         {"0": (polyline.encode([(0.0, 0.0), (2.0, 0.0)],
+                                                geojson=True), [1.0]),
+                          "1": (polyline.encode([(2.0, 0.0), (2.0, 2.0)],
+                                                geojson=True), [1.0])})
+
+    def test_update_positions(self):
+        coordinates = CoordinatesOSRM(self.__create_config())
+
+        moving_vehicle = Vehicle(
+            "1", 0, Stop(0, 10, LabelLocation("A", 0.0, 0.0)), 1, 0)
+        moving_route = Route(moving_vehicle,
+                             [Stop(20, 30, LabelLocation("B", 2.0, 0.0))])
+        moving_route.depart()
+        moving_vehicle.polylines = {"0": SegmentPolyline(
+            polyline.encode([(0.0, 0.0), (1.0, 0.0), (2.0, 0.0)],
+                            geojson=True), [0.5, 0.5])}
+        waiting_vehicle = Vehicle(
+            "2", 0, Stop(0, 10, LabelLocation("C", 2.0, 2.0)), 1, 0)
+        waiting_route = Route(waiting_vehicle)
+
+        positions = coordinates.update_positions(
+            [moving_vehicle, waiting_vehicle], [moving_route, waiting_route],
+            17.5)
+
+        self.assertEqual((positions[0].lon, positions[0].lat), (1.5, 0.0))
+        self.assertIs(positions[1], waiting_route.current_stop.location)
+        position = coordinates.update_position(moving_vehicle, moving_route,
+                                               17.5)
+        self.assertEqual((position.lon, position.lat), (1.5, 0.0))
+
+    def test_simulate(self):
+        vehicle = self.__create_vehicle()
+        trip = self.__create_trip()
+
+        simulation = self.__create_simulation(vehicle, trip)
+        simulation.simulate()
+
+        self.assertEqual(trip.status, PassengerStatus.COMPLETE)
+        self.assertEqual(sorted(vehicle.polylines), ["0", "1"])
+        self.assertEqual(self.__server.request_paths,
+                         ["/route/v1/driving/0.0,0.0;2.0,0.0;2.0,2.0"
+                          "?annotations=true&overview=full"])
+
+    def test_simulate_with_data_collector(self):
+        vehicle = self.__create_vehicle()
+        trip = self.__create_trip()
+        data_container = DataContainer()
+        environment_observer = EnvironmentObserver(
+            data_collectors=StandardDataCollector(data_container))
+
+        # The simulation does not wait for OSRM to observe the polylines.
+        self.__server.response_allowed.clear()
+        try:
+            simulation = self.__create_simulation(vehicle, trip,
+                                                  environment_observer)
+            simulation_thread = threading.Thread(target=simulation.simulate,
+                                                 daemon=True)
+            simulation_thread.start()
+            simulation_thread.join(10)
+            self.assertFalse(simulation_thread.is_alive())
+            self.assertEqual(trip.status, PassengerStatus.COMPLETE)
+        finally:
+            self.__server.response_allowed.set()
+
+        # The polylines are awaited when the observations are exported.
+        vehicles_df = data_container.get_observations_table_df("vehicles")
+        polylines_column = data_container.get_columns("vehicles")["polylines"]
+        self.assertEqual(sorted(vehicles_df[polylines_column].iloc[-1]),
+                         ["0", "1"])
+
+    def __create_simulation(self, vehicle, trip, environment_observer=None):
+        network = nx.DiGraph()
+        for label, lon, lat in [("A", 0.0, 0.0), ("B", 2.0, 0.0),
+                                ("C", 2.0, 2.0)]:
+            network.add_node(label, lon=lon, lat=lat)
+        for origin in network.nodes:
+            for destination in network.nodes:
+                if origin != destination:
+                    network.add_edge(origin, destination, length=10)
+
+        coordinates = CoordinatesOSRM(self.__create_config())
+
+        return Simulation(
+            Optimization(ShuttleNearestVehicleDispatcher(network)), [trip],
+            [vehicle], {"1": Route(vehicle)}, network=network,
+            environment_observer=environment_observer,
+            coordinates=coordinates)
+
+    @staticmethod
+    def __create_vehicle():
+        return Vehicle("1", 0, Stop(0, Vehicle.MAX_TIME,
+                                    LabelLocation("A", 0.0, 0.0)),
+                       1, 0, end_time=1000)
+
+    @staticmethod
+    def __create_trip():
+        return Trip("1", LabelLocation("B"), LabelLocation("C"), 1, 5, 5,
+                    1000)
+
+    def __create_config(self):
+        config_file_path = os.path.join(self.__cache_folder.name,
+                                        "coordinates_osrm.ini")
+        with open(config_file_path, 'w') as f:
+            f.write("[parameters]\nurl = {}\n".format(self.__url))
+        return CoordinatesOSRMConfig(config_file_path)
+
+
+class SegmentPolylineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.__encoded_polyline = polyline.encode([(0, 0), (1, 0), (1, 1)],
+                                                  geojson=True)
+        self.__segment_polyline = SegmentPolyline(self.__encoded_polyline,
+                                                  [0.5, 0.5])
+
+    def test_tuple(self):
+        self.assertEqual(self.__segment_polyline,
+                         (self.__encoded_polyline, [0.5, 0.5]))
+        self.assertEqual(str(self.__segment_polyline),
+                         str((self.__encoded_polyline, [0.5, 0.5])))
+        self.assertEqual(self.__segment_polyline.coordinates.tolist(),
+                         [[0, 0], [1, 0], [1, 1]])
+        self.assertEqual(
+            self.__segment_polyline.cumulative_durations_frac.tolist(),
+            [0.5, 1])
+
+    def test_get_coordinates(self):
+        self.assertEqual(self.__segment_polyline.get_coordinates(7.5, 10),
+                         (1, 0.5))
+        self.assertEqual(self.__segment_polyline.get_coordinates(5, 10),
+                         (1, 0))
+        self.assertEqual(self.__segment_polyline.get_coordinates(10, 10),
+                         (1, 1))
+        self.assertEqual(self.__segment_polyline.get_coordinates(12, 10),
+                         (1, 1))
+
+    def test_get_coordinates_array(self):
+        other_segment_polyline = SegmentPolyline(
+            polyline.encode([(2, 2), (4, 2), (4, 4)], geojson=True),
+            [0.5, 0.5])
+        segment_polylines = [self.__segment_polyline, other_segment_polyline,
+                             self.__segment_polyline]
+        current_durations = [7.5, 3, 12]
+        total_durations = [10, 4, 10]
+
+        coordinates = SegmentPolyline.get_coordinates_array(
+            segment_polylines, current_durations, total_durations)
+
+        self.assertEqual(coordinates.tolist(), [[1, 0.5], [4, 3], [1, 1]])
+        self.assertEqual(
+            [tuple(vehicle_coordinates)
+             for vehicle_coordinates in coordinates.tolist()],
+            [segment_polyline.get_coordinates(current_duration,
+                                              total_duration)
+             for segment_polyline, current_duration, total_duration
+             in zip(segment_polylines, current_durations, total_durations)])
+
+    def test_copy(self):
+        for segment_polyline_copy in [
+                copy.deepcopy(self.__segment_polyline),
+                pickle.loads(pickle.dumps(self.__segment_polyline))]:
+            self.assertIsInstance(segment_polyline_copy, SegmentPolyline)
+            self.assertEqual(segment_polyline_copy, self.__segment_polyline)
+            self.assertEqual(segment_polyline_copy.get_coordinates(7.5, 10),
+                             (1, 0.5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from multimodalsim.optimization.fixed_line.fixed_line_dispatcher import \
+    FixedLineDispatcher
+from multimodalsim.optimization.optimization import Optimization
+from multimodalsim.optimization.splitter import OneLegSplitter
+from multimodalsim.reader.data_reader import GTFSReader
+from multimodalsim.simulator.simulation import Simulation
+from multimodalsim.state_machine.status import PassengerStatus
+
+
+class RecordingSplitter(OneLegSplitter):
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def split_batch(self, trips, state):
+        self.batches.append([trip.id for trip in trips])
+        return super().split_batch(trips, state)
+
+
+class PassengerReleaseTestCase(unittest.TestCase):
+
+    def test_trips_released_at_same_time_are_split_together(self):
+        gtfs_folder_path = "../../data/tests/fixed_line_one_leg/gtfs/"
+        requests_file_path = \
+            "../../data/tests/fixed_line_one_leg/requests_gtfs.csv"
+        data_reader = GTFSReader(gtfs_folder_path, requests_file_path)
+
+        vehicles, routes_by_vehicle_id = data_reader.get_vehicles()
+        trips = data_reader.get_trips()
+
+        splitter = RecordingSplitter()
+        opt = Optimization(FixedLineDispatcher(), splitter,
+                           freeze_interval=5)
+        Simulation(opt, trips, vehicles, routes_by_vehicle_id).simulate()
+
+        self.assertEqual(sorted(map(sorted, splitter.batches)),
+                         [["1"], ["2", "3", "4"], ["5"]])
+        for trip in trips:
+            self.assertEqual(trip.status, PassengerStatus.COMPLETE)
+            self.assertEqual(len(trip.previous_legs), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
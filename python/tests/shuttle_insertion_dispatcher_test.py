@@ -0,0 +1,87 @@
+import unittest
+
+from multimodalsim.optimization.shuttle.shuttle_insertion_dispatcher \
+    import ShuttleInsertionDispatcher
+
+from dispatcher_test_helpers import create_line_network, create_route, \
+    create_leg, check_simple_network_simulation
+
+
+class ShuttleInsertionDispatcherTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.__network = create_line_network(["A", "B", "C", "D", "E"])
+
+    def test_insert_between_stops(self):
+        route = create_route("1", [("A", 0)], 2)
+        legs = [create_leg("1", "A", "D"),
+                create_leg("2", "B", "C")]
+
+        route_plans = ShuttleInsertionDispatcher(self.__network).optimize(
+            legs, [route], 0, None)
+
+        self.assertEqual(len(route_plans), 1)
+        self.assertEqual(self.__get_stops(route_plans[0]),
+                         [("A", 0, 0, ["1"], []), ("B", 1, 1, ["2"], []),
+                          ("C", 2, 2, [], ["2"]), ("D", 3, 3, [], ["1"])])
+        self.assertEqual([leg.id for leg in route_plans[0].assigned_legs],
+                         ["1", "2"])
+
+    def test_capacity(self):
+        route = create_route("1", [("A", 0)], 1)
+        legs = [create_leg("1", "A", "D"),
+                create_leg("2", "B", "C")]
+
+        route_plans = ShuttleInsertionDispatcher(self.__network).optimize(
+            legs, [route], 0, None)
+
+        self.assertEqual(self.__get_stops(route_plans[0]),
+                         [("A", 0, 0, ["1"], []), ("D", 3, 3, [], ["1"]),
+                          ("B", 5, 5, ["2"], []), ("C", 6, 6, [], ["2"])])
+
+    def test_due_time(self):
+        routes = [create_route("1", [("A", 0)], 1),
+                  create_route("2", [("E", 0)], 1)]
+        legs = [create_leg("1", "A", "D", 0, 5),
+                create_leg("2", "B", "C", 0, 5),
+                create_leg("3", "B", "C", 0, 4)]
+
+        route_plans = ShuttleInsertionDispatcher(self.__network).optimize(
+            legs, routes, 0, None)
+
+        # The first vehicle cannot serve the second leg without making the
+        # first leg late, and the third leg cannot be served on time.
+        self.assertEqual([route_plan.route.vehicle.id
+                          for route_plan in route_plans], ["1", "2"])
+        self.assertEqual(self.__get_stops(route_plans[1]),
+                         [("B", 3, 3, ["2"], []), ("C", 4, 4, [], ["2"])])
+        self.assertEqual(legs[2].assigned_vehicle, None)
+
+    def test_existing_due_time(self):
+        route = create_route("1", [("A", 0)], 2)
+        legs = [create_leg("1", "A", "C", 0, 2)]
+        dispatcher = ShuttleInsertionDispatcher(self.__network)
+        route_plan = dispatcher.optimize(legs, [route], 0, None)[0]
+        route.next_stops = route_plan.next_stops
+
+        # A detour through D would make the first leg late.
+        legs = [create_leg("2", "B", "D")]
+        route_plans = dispatcher.optimize(legs, [route], 0, None)
+
+        self.assertEqual(self.__get_stops(route_plans[0]),
+                         [("A", 0, 0, ["1"], []), ("B", 1, 1, ["2"], []),
+                          ("C", 2, 2, [], ["1"]), ("D", 3, 3, [], ["2"])])
+
+    def test_simulate(self):
+        check_simple_network_simulation(self, ShuttleInsertionDispatcher)
+
+    @staticmethod
+    def __get_stops(route_plan):
+        return [(stop.location.label, stop.arrival_time, stop.departure_time,
+                 [trip.id for trip in stop.passengers_to_board],
+                 [trip.id for trip in stop.passengers_to_alight])
+                for stop in route_plan.next_stops]
+
+
+if __name__ == '__main__':
+    unittest.main()
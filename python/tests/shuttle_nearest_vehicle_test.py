@@ -0,0 +1,78 @@
+import unittest
+
+from multimodalsim.optimization.shuttle.shuttle_nearest_vehicle_dispatcher \
+    import ShuttleNearestVehicleDispatcher
+from multimodalsim.optimization.shuttle.spatial_grid import SpatialGrid
+
+from dispatcher_test_helpers import create_line_network, create_route, \
+    create_leg, check_simple_network_simulation
+
+
+class SpatialGridTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.__spatial_grid = SpatialGrid([0, 0.5, 3, 3, 10],
+                                          [0, 0.5, 3, 4, 10], cell_size=1)
+
+    def test_find_nearest(self):
+        self.assertEqual(self.__spatial_grid.find_nearest(0.1, 0.1), [0])
+        self.assertEqual(self.__spatial_grid.find_nearest(3, 3.5, 3),
+                         [2, 3, 1])
+        self.assertEqual(self.__spatial_grid.find_nearest(20, 20, 10),
+                         [4, 3, 2, 1, 0])
+
+    def test_remove(self):
+        self.__spatial_grid.remove(2)
+        self.assertEqual(self.__spatial_grid.nb_points, 4)
+        self.assertEqual(self.__spatial_grid.find_nearest(3, 3.1, 2), [3, 1])
+
+
+class ShuttleNearestVehicleDispatcherTestCase(unittest.TestCase):
+
+    def test_optimize(self):
+        network = create_line_network(["A", "B", "C", "D"])
+
+        routes = [create_route("1", [("A", 0)]),
+                  create_route("2", [("D", 0)]),
+                  create_route("3", [("C", 0)])]
+        legs = [create_leg("1", "D", "A"), create_leg("2", "D", "B", 5),
+                create_leg("3", "A", "B"), create_leg("4", "A", "D")]
+
+        dispatcher = ShuttleNearestVehicleDispatcher(network,
+                                                     nb_candidate_vehicles=2)
+        route_plans = dispatcher.optimize(legs, routes, 0, None)
+
+        self.assertEqual(
+            [(route_plan.route.vehicle.id, route_plan.assigned_legs[0].id,
+              [(stop.location.label, stop.arrival_time, stop.departure_time)
+               for stop in route_plan.next_stops])
+             for route_plan in route_plans],
+            [("2", "1", [("D", 0, 0), ("A", 3, 3)]),
+             ("3", "2", [("D", 1, 5), ("B", 7, 7)]),
+             ("1", "3", [("A", 0, 0), ("B", 1, 1)])])
+
+    def test_unreachable_destination(self):
+        # D cannot be reached from the other locations.
+        network = create_line_network(["A", "B", "C"])
+        network.add_node("D", lon=0.03, lat=0)
+
+        routes = [create_route("1", [("A", 0)])]
+        legs = [create_leg("1", "A", "D"), create_leg("2", "B", "C")]
+
+        dispatcher = ShuttleNearestVehicleDispatcher(network)
+        route_plans = dispatcher.optimize(legs, routes, 0, None)
+
+        self.assertEqual(
+            [(route_plan.route.vehicle.id, route_plan.assigned_legs[0].id,
+              [(stop.location.label, stop.arrival_time)
+               for stop in route_plan.next_stops])
+             for route_plan in route_plans],
+            [("1", "2", [("B", 1), ("C", 2)])])
+        self.assertIsNone(legs[0].assigned_vehicle)
+
+    def test_simulate(self):
+        check_simple_network_simulation(self, ShuttleNearestVehicleDispatcher)
+
+
+if __name__ == '__main__':
+    unittest.main()
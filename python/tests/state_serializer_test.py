@@ -0,0 +1,103 @@
+import unittest
+
+from multimodalsim.optimization.optimization import OptimizationResult
+from multimodalsim.optimization.state_serializer import StateSerializer
+from multimodalsim.simulator.environment import Environment
+from multimodalsim.simulator.request import Trip, Leg
+from multimodalsim.simulator.stop import Stop, LabelLocation, \
+    TimeCoordinatesLocation
+from multimodalsim.simulator.vehicle import Vehicle, Route
+from multimodalsim.state_machine.status import PassengerStatus, VehicleStatus
+
+
+class StateSerializerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.__serializer = StateSerializer()
+
+        env = Environment(None)
+        env.current_time = 10
+
+        start_stop = Stop(0, 5, LabelLocation("0", 1.5, 2.5))
+        next_stop = Stop(20, 25.5, LabelLocation("1"), 3.2,
+                         min_departure_time=21)
+        vehicle = Vehicle("v1", 0, start_stop, 10, 0, mode="bus")
+        vehicle.position = TimeCoordinatesLocation(10, 1.5, 2.5)
+        vehicle.state_machine.restore_current_state(VehicleStatus.IDLE)
+        route = Route(vehicle, [next_stop])
+
+        trip = Trip(1, start_stop.location, next_stop.location, 1, 0, 0, 100,
+                    name="passenger")
+        leg = Leg("1_1", trip.origin, trip.destination, 1, 0, 0, 100, trip)
+        leg.assigned_vehicle = vehicle
+        trip.assign_legs([leg])
+        trip.state_machine.restore_current_state(PassengerStatus.ASSIGNED)
+        route.assign_leg(leg)
+        route.current_stop.passengers_to_board.append(trip)
+        next_stop.passengers_to_alight.append(trip)
+
+        env.add_trip(trip)
+        env.add_assigned_trip(trip)
+        env.add_vehicle(vehicle)
+        env.add_route(route, vehicle.id)
+
+        self.__state = env.get_new_state()
+
+    def test_state_round_trip(self):
+        state = self.__serializer.deserialize_state(
+            self.__serializer.serialize_state(self.__state))
+
+        self.assertEqual(state.current_time, 10)
+        self.assertEqual([trip.id for trip in state.assigned_trips], [1])
+        self.assertIs(state.assigned_trips[0], state.trips[0])
+
+        trip = state.trips[0]
+        self.assertEqual(trip.name, "passenger")
+        self.assertEqual(trip.status, PassengerStatus.ASSIGNED)
+        leg = trip.next_legs[0]
+        self.assertIs(leg.trip, trip)
+        self.assertIs(state.next_legs[0], leg)
+
+        vehicle = state.vehicles[0]
+        self.assertIs(leg.assigned_vehicle, vehicle)
+        self.assertEqual(vehicle.status, VehicleStatus.IDLE)
+        self.assertEqual(vehicle.mode, "bus")
+        self.assertEqual(vehicle.position,
+                         TimeCoordinatesLocation(10, 1.5, 2.5))
+
+        route = state.route_by_vehicle_id["v1"]
+        self.assertIs(route.vehicle, vehicle)
+        self.assertIs(route.current_stop, vehicle.start_stop)
+        self.assertEqual(route.assigned_legs, [leg])
+        self.assertEqual(route.current_stop.passengers_to_board, [trip])
+        self.assertEqual(route.current_stop.location.lon, 1.5)
+
+        next_stop = route.next_stops[0]
+        self.assertEqual(next_stop.passengers_to_alight, [trip])
+        self.assertIsInstance(next_stop.arrival_time, int)
+        self.assertEqual(next_stop.departure_time, 25.5)
+        self.assertEqual(next_stop.min_departure_time, 21)
+        self.assertEqual(next_stop.cumulative_distance, 3.2)
+        self.assertIsNone(next_stop.location.lon)
+
+    def test_optimization_result_round_trip(self):
+        optimization_result = OptimizationResult(self.__state,
+                                                 self.__state.trips,
+                                                 self.__state.vehicles)
+        optimization_result = \
+            self.__serializer.deserialize_optimization_result(
+                self.__serializer.serialize_optimization_result(
+                    optimization_result))
+
+        state = optimization_result.state
+        self.assertIs(optimization_result.modified_requests[0],
+                      state.trips[0])
+        self.assertIs(optimization_result.modified_vehicles[0],
+                      state.vehicles[0])
+
+        self.assertIsNone(self.__serializer.deserialize_optimization_result(
+            self.__serializer.serialize_optimization_result(None)))
+
+
+if __name__ == '__main__':
+    unittest.main()
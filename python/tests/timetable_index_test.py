@@ -0,0 +1,150 @@
+import pickle
+import unittest
+from unittest import mock
+
+from multimodalsim.optimization.fixed_line.fixed_line_dispatcher import \
+    FixedLineDispatcher
+from multimodalsim.optimization.fixed_line.dense_timetable import \
+    DenseTimetable
+from multimodalsim.optimization.fixed_line.timetable_index import \
+    TimetableIndex
+from multimodalsim.simulator.request import Trip, Leg
+from multimodalsim.simulator.stop import Stop, LabelLocation
+from multimodalsim.simulator.vehicle import Vehicle, Route
+
+
+class TimetableIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # Route 1: A (100) -> B (200) -> C (300)
+        # Route 2: A (150) -> C (250)
+        # Route 3: C (50) -> A (120) -> B (180) -> A (220) -> C (320), i.e.,
+        # a loop that serves A twice.
+        # Route 4: A (100) -> C (250), at the same time as route 2.
+        self.__routes = [
+            self.__create_route("1", [("A", 100), ("B", 200), ("C", 300)]),
+            self.__create_route("2", [("A", 150), ("C", 250)]),
+            self.__create_route("3", [("C", 50), ("A", 120), ("B", 180),
+                                      ("A", 220), ("C", 320)]),
+            self.__create_route("4", [("A", 100), ("C", 250)])]
+        self.__timetable_index = TimetableIndex(self.__routes)
+
+    def test_earliest_arrival(self):
+        # Routes 2 and 4 arrive at the same time, route 2 comes first.
+        self.assertEqual(self.__find("A", "C", 0, 0, 1000), "2")
+        self.assertEqual(self.__find("A", "B", 0, 0, 1000), "3")
+        self.assertEqual(self.__find("B", "C", 0, 0, 1000), "1")
+
+    def test_time_constraints(self):
+        # The departure must be strictly after the current time.
+        self.assertEqual(self.__find("A", "C", 150, 0, 1000), "3")
+        self.assertEqual(self.__find("A", "C", 0, 151, 1000), "3")
+        self.assertEqual(self.__find("A", "C", 0, 0, 249), None)
+        self.assertEqual(self.__find("A", "C", 220, 0, 1000), None)
+
+    def test_stop_served_twice(self):
+        # The second visit of A can be used once the first one is past, but
+        # B is only served before it.
+        self.assertEqual(self.__find("A", "B", 110, 0, 1000), "3")
+        self.assertEqual(self.__find("A", "B", 120, 0, 1000), None)
+        self.assertEqual(self.__find("A", "C", 200, 0, 1000), "3")
+
+        # The first visit of C is before B, the second one is after.
+        self.assertEqual(self.__find("C", "B", 0, 0, 1000), "3")
+        self.assertEqual(self.__find("C", "B", 50, 0, 1000), None)
+
+    def test_unknown_stop(self):
+        self.assertIsNone(self.__find("D", "A", 0, 0, 1000))
+        self.assertIsNone(self.__find("A", "D", 0, 0, 1000))
+
+    def test_pickled_index(self):
+        timetable_index = pickle.loads(pickle.dumps(self.__timetable_index))
+        self.assertIsNone(timetable_index.routes)
+        self.assertEqual(timetable_index.find_earliest_arrival_route_index(
+            "A", "C", 0, 0, 1000), 1)
+
+    def test_dense_timetable(self):
+        # Route 3 serves A twice, so it is searched apart from the others.
+        leg_queries = [
+            (origin_stop_id, destination_stop_id, current_time, ready_time,
+             due_time)
+            for origin_stop_id in ["A", "B", "C", "D"]
+            for destination_stop_id in ["A", "B", "C", "D"]
+            for current_time in [0, 50, 110, 120, 150, 200, 220]
+            for ready_time in [0, 151]
+            for due_time in [249, 250, 1000]]
+        dense_timetable = DenseTimetable(self.__routes)
+        self.assertEqual(
+            dense_timetable.find_earliest_arrival_route_indexes(leg_queries),
+            self.__timetable_index.find_earliest_arrival_route_indexes(
+                leg_queries))
+
+        dense_timetable = pickle.loads(pickle.dumps(dense_timetable))
+        self.assertIsNone(dense_timetable.routes)
+        self.assertEqual(dense_timetable.find_earliest_arrival_route_indexes(
+            [("A", "C", 0, 0, 1000), ("A", "B", 0, 0, 1000)]), [1, 2])
+
+    def test_fixed_line_dispatcher(self):
+        legs = self.__create_legs()
+
+        for dispatcher in [FixedLineDispatcher(),
+                           FixedLineDispatcher(nb_processes=2, chunk_size=1),
+                           FixedLineDispatcher(backend="numpy")]:
+            optimized_route_plans = dispatcher.optimize(legs, self.__routes,
+                                                        10, None)
+
+            self.assertEqual(
+                [(optimized_route_plan.route.vehicle.id,
+                  [leg.id for leg in optimized_route_plan.assigned_legs])
+                 for optimized_route_plan in optimized_route_plans],
+                [("2", ["1"]), ("3", ["3"]), ("1", ["4"])])
+            self.assertIs(optimized_route_plans[0].route, self.__routes[1])
+
+    def test_fixed_line_dispatcher_in_daemonic_process(self):
+        legs = self.__create_legs()
+        dispatcher = FixedLineDispatcher(nb_processes=2, chunk_size=1)
+
+        # A daemonic process cannot start the pool of processes.
+        with mock.patch("multimodalsim.optimization.fixed_line."
+                        "fixed_line_dispatcher.mp.current_process") \
+                as current_process, \
+                self.assertLogs("multimodalsim.optimization.fixed_line."
+                                "fixed_line_dispatcher", "WARNING"):
+            current_process.return_value.daemon = True
+            optimized_route_plans = dispatcher.optimize(legs, self.__routes,
+                                                        10, None)
+
+        self.assertEqual([optimized_route_plan.route.vehicle.id
+                          for optimized_route_plan in optimized_route_plans],
+                         ["2", "3", "1"])
+
+    def __find(self, origin_stop_id, destination_stop_id, current_time,
+               ready_time, due_time):
+        route = self.__timetable_index.find_earliest_arrival_route(
+            origin_stop_id, destination_stop_id, current_time, ready_time,
+            due_time)
+        return route.vehicle.id if route is not None else None
+
+    @staticmethod
+    def __create_legs():
+        legs = []
+        for leg_id, origin_stop_id, destination_stop_id, ready_time in [
+                ("1", "A", "C", 0), ("2", "A", "B", 130), ("3", "C", "B", 0),
+                ("4", "B", "C", 0)]:
+            trip = Trip(leg_id, LabelLocation(origin_stop_id),
+                        LabelLocation(destination_stop_id), 1, 0, ready_time,
+                        1000)
+            legs.append(Leg(leg_id, trip.origin, trip.destination, 1, 0,
+                            ready_time, 1000, trip))
+        return legs
+
+    @staticmethod
+    def __create_route(vehicle_id, stop_times):
+        stops = [Stop(time, time, LabelLocation(stop_id))
+                 for stop_id, time in stop_times]
+        vehicle = Vehicle(vehicle_id, 0, stops[0], 10, 0)
+        return Route(vehicle, stops[1:])
+
+
+if __name__ == '__main__':
+    unittest.main()
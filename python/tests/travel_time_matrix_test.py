@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import networkx as nx
+import numpy as np
+
+from multimodalsim.optimization.shuttle.shuttle_hub_simple_network_dispatcher \
+    import ShuttleHubSimpleNetworkDispatcher
+from multimodalsim.optimization.shuttle.travel_time_matrix import \
+    TravelTimeMatrix
+from multimodalsim.simulator.request import Trip, Leg
+from multimodalsim.simulator.stop import Stop, LabelLocation
+from multimodalsim.simulator.vehicle import Vehicle, Route
+
+
+class TravelTimeMatrixTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # A -> B -> C -> A, with a shortcut A -> C that is slower than
+        # A -> B -> C. D is not connected.
+        self.__network = nx.DiGraph()
+        self.__network.add_nodes_from(["A", "B", "C", "D"], lon=0, lat=0)
+        edges = [("A", "B", 10), ("B", "C", 5), ("C", "A", 7), ("A", "C", 20)]
+        for origin, destination, length in edges:
+            self.__network.add_edge(origin, destination, length=length)
+
+    def test_from_network(self):
+        travel_time_matrix = TravelTimeMatrix.from_network(self.__network)
+
+        self.assertEqual(travel_time_matrix.labels, ["A", "B", "C", "D"])
+        self.assertEqual(travel_time_matrix.get_index("C"), 2)
+        self.assertIsNone(travel_time_matrix.get_index("E"))
+        self.assertEqual(travel_time_matrix.travel_times.dtype, np.float32)
+        self.assertEqual(travel_time_matrix.get_travel_time("A", "C"), 20)
+        self.assertEqual(travel_time_matrix.get_travel_time("B", "A"),
+                         float("inf"))
+        self.assertEqual(travel_time_matrix.get_travel_time("D", "D"), 0)
+
+    def test_from_shortest_paths(self):
+        expected_travel_times = [[0, 10, 15, np.inf], [12, 0, 5, np.inf],
+                                 [7, 17, 0, np.inf],
+                                 [np.inf, np.inf, np.inf, 0]]
+
+        # Floyd-Warshall
+        travel_time_matrix = TravelTimeMatrix.from_shortest_paths(
+            self.__network)
+        np.testing.assert_array_equal(travel_time_matrix.travel_times,
+                                      expected_travel_times)
+
+        # Dijkstra
+        with mock.patch.object(TravelTimeMatrix, "DENSE_NETWORK_RATIO", 0):
+            travel_time_matrix = TravelTimeMatrix.from_shortest_paths(
+                self.__network, dtype=np.float64)
+        self.assertEqual(travel_time_matrix.travel_times.dtype, np.float64)
+        np.testing.assert_array_equal(travel_time_matrix.travel_times,
+                                      expected_travel_times)
+
+    def test_save_load(self):
+        travel_time_matrix = TravelTimeMatrix.from_shortest_paths(
+            self.__network)
+
+        with tempfile.TemporaryDirectory() as cache_folder:
+            matrix_folder = os.path.join(cache_folder, "matrix")
+            travel_time_matrix.save(matrix_folder)
+            loaded_travel_time_matrix = TravelTimeMatrix.load(matrix_folder)
+
+            self.assertIsInstance(loaded_travel_time_matrix.travel_times,
+                                  np.memmap)
+            self.assertEqual(loaded_travel_time_matrix.labels,
+                             travel_time_matrix.labels)
+            np.testing.assert_array_equal(
+                loaded_travel_time_matrix.travel_times,
+                travel_time_matrix.travel_times)
+            del loaded_travel_time_matrix
+
+    def test_shuttle_hub_simple_network_dispatcher(self):
+        travel_time_matrix = TravelTimeMatrix.from_shortest_paths(
+            self.__network)
+        dispatcher = ShuttleHubSimpleNetworkDispatcher(
+            self.__network, hub_location="A",
+            travel_time_matrix=travel_time_matrix)
+
+        vehicle = Vehicle("1", 0, Stop(0, 0, LabelLocation("A")), 1, 0)
+        trip = Trip("1", LabelLocation("B"), LabelLocation("A"), 1, 0, 0,
+                    1000)
+        leg = Leg("1", trip.origin, trip.destination, 1, 0, 0, 1000, trip)
+
+        route_plans = dispatcher.optimize([leg], [Route(vehicle)], 100, None)
+
+        # B -> A is not an edge of the network: B -> C -> A is used.
+        self.assertEqual(
+            [(stop.location.label, stop.arrival_time)
+             for stop in route_plans[0].next_stops],
+            [("B", 110), ("A", 122), ("A", 122)])
+
+
+if __name__ == '__main__':
+    unittest.main()